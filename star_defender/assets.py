@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+资源管理
+assets/ 下的图片和音效在第一次用到时才加载：位图 convert_alpha() 一次，SVG 按需要的尺寸
+直接栅格化一次（不是先按原尺寸栅格化再缩放），音效解码一次。所有资源按键缓存，带内存上限；
+可以在后台线程预加载一批资源，避免关卡中途第一次用到时卡顿。
+
+短音效解码并重采样为混音器格式后，原始 PCM 写入磁盘缓存，之后启动直接读取，
+不再解码 MP3 / 重采样 WAV。背景音乐不走这里，由 music.py 流式播放
+"""
+
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+ASSET_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+# 音效 PCM 缓存目录（STAR_DEFENDER_CACHE 或 XDG_CACHE_HOME 下）
+PCM_CACHE_DIR = os.path.join(
+    os.environ.get("STAR_DEFENDER_CACHE") or
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                 "star_defender"),
+    "pcm")
+
+# SVG 根元素的 width / height / viewBox 属性
+SVG_TAG = re.compile(rb"<svg\b[^>]*>", re.S)
+SVG_ATTRIBUTE = rb'\s%s\s*=\s*"([^"]*)"'
+
+
+def rasterize_svg(data, size):
+    """把 SVG 数据按 size (宽, 高) 栅格化
+
+    改写根元素的 width / height（没有 viewBox 时按原尺寸补上），由 SDL_image 直接以目标尺寸栅格化，
+    矢量边缘不会因缩放变糊。无法解析尺寸时退回原尺寸栅格化后平滑缩放。
+    """
+    tag = SVG_TAG.search(data)
+    width = tag and re.search(SVG_ATTRIBUTE % b"width", tag.group())
+    height = tag and re.search(SVG_ATTRIBUTE % b"height", tag.group())
+    try:
+        original = (float(width.group(1).rstrip(b"px")), float(height.group(1).rstrip(b"px")))
+    except (AttributeError, ValueError):
+        surface = pygame.image.load(io.BytesIO(data), "image.svg")
+        return pygame.transform.smoothscale(surface, size)
+
+    root = tag.group()
+    root = root.replace(width.group(), b' width="%d"' % size[0], 1)
+    root = root.replace(height.group(), b' height="%d"' % size[1], 1)
+    if not re.search(SVG_ATTRIBUTE % b"viewBox", root):
+        root = root[:4] + b' viewBox="0 0 %g %g"' % original + root[4:]
+    data = data[:tag.start()] + root + data[tag.end():]
+    return pygame.image.load(io.BytesIO(data), "image.svg")
+
+
+class AssetManager:
+    """按需加载并缓存 assets/ 下的资源
+
+    资源名是相对 root 的路径，例如 "images/player-1.png"、"music/子弹.wav"。
+    image(name, size) 按 (名称, 尺寸) 缓存，同一张图的不同尺寸是不同的条目；
+    sound(name) 在混音器没有初始化时返回 None，游戏在没有声卡的环境下照常运行。
+
+    max_bytes 为缓存占用的内存上限，超出后淘汰最久没有使用的资源（至少保留刚加入的一个）。
+
+    preload() 在后台线程完成读文件和解码，结果放进待取区；主线程第一次用到时再做
+    convert_alpha() 并放进缓存（与显示相关的操作只在主线程进行）。
+
+    pcm_cache 为音效 PCM 缓存目录，None 时每次都从源文件解码。
+    """
+
+    def __init__(self, root=ASSET_ROOT, max_bytes=64 * 1024 * 1024, pcm_cache=PCM_CACHE_DIR):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.pcm_cache = pcm_cache
+        self.assets = OrderedDict()  # 键 -> (资源, 字节数)，按最近使用排序
+        self.bytes = 0
+
+        # 后台线程解码完成、等待主线程取用的资源
+        self.ready = {}
+        self.lock = threading.Lock()
+        self.worker = None
+
+        # 统计
+        self.hits = 0
+        self.misses = 0      # 主线程同步加载（可能造成卡顿）的次数
+        self.preloaded = 0   # 从后台预加载结果中取用的次数
+        self.evictions = 0
+        self.pcm_hits = 0    # 从 PCM 缓存读取的音效
+        self.pcm_writes = 0  # 解码后写入 PCM 缓存的音效
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __contains__(self, key):
+        return key in self.assets
+
+    def path(self, name):
+        """资源名对应的文件路径"""
+        return os.path.join(self.root, *name.split("/"))
+
+    @staticmethod
+    def image_bytes(surface):
+        """Surface 像素数据占用的字节数"""
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    @staticmethod
+    def sound_bytes(sound):
+        """解码后音效占用的字节数（按混音器格式估算，不复制数据）"""
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+    def decode_image(self, name, size):
+        """读取并解码图片（可在后台线程调用）"""
+        path = self.path(name)
+        if name.lower().endswith(".svg") and size is not None:
+            with open(path, "rb") as f:
+                return rasterize_svg(f.read(), size)
+        surface = pygame.image.load(path)
+        if size is not None and surface.get_size() != tuple(size):
+            surface = pygame.transform.smoothscale(surface, size)
+        return surface
+
+    def pcm_path(self, name):
+        """音效在 PCM 缓存中的路径
+
+        文件名包含源文件的大小、修改时间和混音器格式，源文件或混音器格式变化后自动失效。
+        """
+        source = os.stat(self.path(name))
+        frequency, size, channels = pygame.mixer.get_init()
+        key = f"{name}|{source.st_size}|{source.st_mtime_ns}|{frequency}|{size}|{channels}"
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return os.path.join(self.pcm_cache, f"{stem}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.pcm")
+
+    def decode_sound(self, name):
+        """读取并解码音效（可在后台线程调用）
+
+        有 PCM 缓存时直接按混音器格式读取；否则解码源文件，再把混音器格式的 PCM 写入缓存。
+        """
+        if self.pcm_cache is None:
+            return pygame.mixer.Sound(self.path(name))
+
+        path = self.pcm_path(name)
+        try:
+            with open(path, "rb") as f:
+                sound = pygame.mixer.Sound(buffer=f.read())
+            self.pcm_hits += 1
+            return sound
+        except FileNotFoundError:
+            pass
+
+        sound = pygame.mixer.Sound(self.path(name))
+        try:
+            os.makedirs(self.pcm_cache, exist_ok=True)
+            # 先写临时文件再改名，中途退出不会留下不完整的缓存
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(sound.get_raw())
+            os.replace(temporary, path)
+            self.pcm_writes += 1
+        except OSError:
+            pass  # 缓存目录不可写时只是下次仍需解码
+        return sound
+
+    def image(self, name, size=None):
+        """获取图片，size 为 (宽, 高) 时返回该尺寸的版本"""
+        key = ("image", name, tuple(size) if size is not None else None)
+        surface = self._lookup(key)
+        if surface is None:
+            surface = self._take(key)
+            if surface is None:
+                self.misses += 1
+                surface = self.decode_image(name, size)
+
+            # 与显示格式一致的像素格式 blit 最快；没有显示窗口时保持原样
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            self._store(key, surface, self.image_bytes(surface))
+        return surface
+
+    def sound(self, name):
+        """获取音效；混音器没有初始化时返回 None"""
+        if pygame.mixer.get_init() is None:
+            return None
+        key = ("sound", name)
+        sound = self._lookup(key)
+        if sound is None:
+            sound = self._take(key)
+            if sound is None:
+                self.misses += 1
+                sound = self.decode_sound(name)
+            self._store(key, sound, self.sound_bytes(sound))
+        return sound
+
+    def preload(self, images=(), sounds=()):
+        """在后台线程预加载资源
+
+        images 中的每一项是资源名或 (资源名, 尺寸)；sounds 为音效资源名。已缓存的跳过，
+        加载失败的也跳过（主线程用到时会重新加载并抛出真正的错误）。返回工作线程。
+        """
+        jobs = []
+        for item in images:
+            name, size = (item, None) if isinstance(item, str) else item
+            key = ("image", name, tuple(size) if size is not None else None)
+            jobs.append((key, lambda name=name, size=size: self.decode_image(name, size)))
+        if pygame.mixer.get_init() is not None:
+            jobs += [(("sound", name), lambda name=name: self.decode_sound(name)) for name in sounds]
+        jobs = [(key, decode) for key, decode in jobs if key not in self.assets]
+
+        self.wait()
+        self.worker = threading.Thread(target=self._preload, args=(jobs,), name="asset-preload", daemon=True)
+        self.worker.start()
+        return self.worker
+
+    def _preload(self, jobs):
+        """工作线程：逐个解码并放进待取区"""
+        for key, decode in jobs:
+            try:
+                asset = decode()
+            except (pygame.error, OSError):
+                continue
+            with self.lock:
+                self.ready[key] = asset
+
+    def wait(self, timeout=None):
+        """等待后台预加载完成"""
+        if self.worker is not None:
+            self.worker.join(timeout)
+
+    def _lookup(self, key):
+        """缓存命中时返回资源并标记为最近使用"""
+        entry = self.assets.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        self.assets.move_to_end(key)
+        return entry[0]
+
+    def _take(self, key):
+        """取出后台预加载好的资源"""
+        with self.lock:
+            asset = self.ready.pop(key, None)
+        if asset is not None:
+            self.preloaded += 1
+        return asset
+
+    def _store(self, key, asset, size):
+        """放进缓存并按内存上限淘汰"""
+        self.assets[key] = (asset, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.assets) > 1:
+            _, (_, evicted) = self.assets.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        """清空缓存和待取区"""
+        self.wait()
+        self.assets.clear()
+        self.ready.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "assets": len(self.assets),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "preloaded": self.preloaded,
+            "evictions": self.evictions,
+            "pcm_hits": self.pcm_hits,
+            "pcm_writes": self.pcm_writes,
+        }
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+音效混音
+固定数量的 pygame.mixer 声道组成声道池，音效事件按优先级分配声道：
+同一音效有同时发声数上限，声道用完时抢占优先级更低的声道。
+play() 只登记请求，end_frame() 每帧统一发声，同一帧内同一音效的多次请求合并为一次，
+所以自动射击、炸弹清屏时的成片爆炸不会塞满混音器；所有 Sound 在创建时一次加载好
+"""
+
+from collections import Counter, namedtuple
+
+import pygame
+
+
+# 音效事件：文件、优先级（越大越重要）、同时发声数上限、两次发声的最小间隔（毫秒）、音量
+SoundEvent = namedtuple("SoundEvent", "name priority max_voices min_interval volume")
+
+SOUND_EVENTS = {
+    "shoot": SoundEvent("music/子弹.wav", priority=1, max_voices=2, min_interval=100, volume=0.25),
+    "explosion": SoundEvent("music/爆炸1.mp3", priority=2, max_voices=3, min_interval=80, volume=0.5),
+    "bomb": SoundEvent("music/技能.wav", priority=4, max_voices=1, min_interval=0, volume=0.8),
+    "boss_defeated": SoundEvent("music/大飞机爆炸.mp3", priority=5, max_voices=1, min_interval=0, volume=1.0),
+    "game_over": SoundEvent("music/游戏结束.wav", priority=6, max_voices=1, min_interval=0, volume=1.0),
+}
+
+
+class AudioMixer:
+    """按优先级分配固定声道池的音效混音器
+
+    每帧的流程：
+        mixer.play("explosion")     # 游戏逻辑中任意次数，只登记
+        mixer.end_frame(now)        # 每帧一次，按优先级实际发声（now 为毫秒）
+
+    每帧最多新开 max_per_frame 个声音。enabled 为 False 或混音器没有初始化时
+    （无头模拟、没有声卡）所有方法直接返回。
+    """
+
+    def __init__(self, assets, events=SOUND_EVENTS, channels=12, max_per_frame=4, enabled=True):
+        self.events = events
+        self.max_per_frame = max_per_frame
+        self.enabled = enabled and pygame.mixer.get_init() is not None
+        self.pending = Counter()  # 本帧登记的请求：事件 -> 次数
+
+        # 统计
+        self.played = 0
+        self.merged = 0     # 同一帧内合并掉的重复请求
+        self.throttled = 0  # 因最小间隔或每帧上限放弃的请求
+        self.stolen = 0     # 抢占其他声音的次数
+        self.dropped = 0    # 没有可用声道而放弃的请求
+
+        if not self.enabled:
+            self.sounds = {}
+            self.channels = []
+            return
+
+        # 一次加载所有音效，之后不再创建 Sound 对象
+        self.sounds = {}
+        for key, event in events.items():
+            sound = assets.sound(event.name)
+            sound.set_volume(event.volume)
+            self.sounds[key] = sound
+
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.voices = [None] * channels  # 每个声道上的 (事件, 优先级, 开始时间)
+        self.last_played = {}
+
+    def play(self, key):
+        """登记一次音效请求（本帧末统一发声）"""
+        if self.enabled:
+            self.pending[key] += 1
+
+    def end_frame(self, now):
+        """按优先级为本帧的请求分配声道并发声"""
+        if not self.enabled or not self.pending:
+            return
+
+        started = 0
+        for key in sorted(self.pending, key=lambda key: -self.events[key].priority):
+            self.merged += self.pending[key] - 1
+            event = self.events[key]
+            last = self.last_played.get(key)
+            if started >= self.max_per_frame or (last is not None and now - last < event.min_interval):
+                self.throttled += 1
+                continue
+
+            index = self._allocate(key, event)
+            if index is None:
+                self.dropped += 1
+                continue
+
+            self.channels[index].play(self.sounds[key])
+            self.voices[index] = (key, event.priority, now)
+            self.last_played[key] = now
+            self.played += 1
+            started += 1
+        self.pending.clear()
+
+    def _allocate(self, key, event):
+        """为事件选择声道，没有可用声道时返回 None
+
+        同一音效达到同时发声数上限时重新触发其中最早的一个；否则优先使用空闲声道，
+        再抢占优先级更低（同优先级时最早开始）的声音。
+        """
+        busy = []
+        free = None
+        for index, channel in enumerate(self.channels):
+            if channel.get_busy():
+                busy.append(index)
+            elif free is None:
+                free = index
+
+        voices = self.voices
+        same = [index for index in busy if voices[index][0] == key]
+        if len(same) >= event.max_voices:
+            return min(same, key=lambda index: voices[index][2])
+        if free is not None:
+            return free
+
+        lower = [index for index in busy if voices[index][1] < event.priority]
+        if not lower:
+            return None
+        self.stolen += 1
+        return min(lower, key=lambda index: (voices[index][1], voices[index][2]))
+
+    def stop(self):
+        """停止所有音效并丢弃未发声的请求"""
+        self.pending.clear()
+        for channel in self.channels:
+            channel.stop()
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "enabled": self.enabled,
+            "played": self.played,
+            "merged": self.merged,
+            "throttled": self.throttled,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+        }
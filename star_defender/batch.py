@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+批量模拟
+把 N 局带随机种子的无头模拟分发到进程池，收集每局的分数、到达关卡、死亡次数、
+Boss 击杀用时和实体数量峰值，写入 CSV（或 Parquet），用于调节敌人生成间隔和 Boss 生命值曲线
+
+用法：
+    python batch.py --runs 1000 --output results.csv
+    python batch.py --runs 200 --boss-health-growth 1.1 1.15 1.2 --spawn-interval 800 1000 --output sweep.parquet
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from main import StarDefender, DEFAULT_BALANCE, HEADLESS_MAX_TICKS, TICK_RATE
+
+
+# 可在命令行扫描的平衡参数：参数名 -> 类型
+SWEEP_PARAMETERS = {
+    "spawn_interval": int,
+    "spawn_interval_step": int,
+    "spawn_interval_min": int,
+    "boss_base_health": int,
+    "boss_health_growth": float,
+}
+
+
+def run_one(job):
+    """在工作进程中模拟一局，返回一行结果"""
+    seed, overrides, max_ticks, max_levels = job
+    game = StarDefender(headless=True, balance=DEFAULT_BALANCE._replace(**overrides), seed=seed)
+    game.max_levels = max_levels
+    result = game.simulate(max_ticks)
+
+    row = {"seed": seed}
+    row.update(game.balance._asdict())
+    row.update({
+        "outcome": result["outcome"],
+        "score": result["score"],
+        "level": result["level"],
+        "deaths": result["deaths"],
+        "boss_kills": len(result["boss_kill_ticks"]),
+    })
+    # 每关 Boss 的击杀用时（秒），未击杀的关卡留空
+    for level in range(1, max_levels + 1):
+        kills = result["boss_kill_ticks"]
+        row[f"boss_ttk_{level}"] = kills[level - 1] / TICK_RATE if level <= len(kills) else None
+    row.update({
+        "peak_enemies": result["peak_enemies"],
+        "peak_bullets": result["peak_bullets"],
+        "peak_particles": result["peak_particles"],
+        "ticks": result["ticks"],
+        "wall_seconds": result["wall_seconds"],
+    })
+    return row
+
+
+def make_jobs(args):
+    """按参数组合 × 种子生成任务列表"""
+    swept = {name: values for name, values in
+             ((name, getattr(args, name)) for name in SWEEP_PARAMETERS) if values}
+    names = list(swept)
+    jobs = []
+    for values in itertools.product(*swept.values()):
+        overrides = dict(zip(names, values))
+        for seed in range(args.seed, args.seed + args.runs):
+            jobs.append((seed, overrides, args.max_ticks, args.max_levels))
+    return jobs
+
+
+def write_rows(path, rows):
+    """按扩展名写入 CSV 或 Parquet（Parquet 需要 pandas 和 pyarrow）"""
+    if path.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            sys.exit("写入 Parquet 需要安装 pandas 和 pyarrow（或改用 .csv 输出）")
+        pd.DataFrame(rows).to_parquet(path, index=False)
+        return
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def summarize(rows, max_levels):
+    """按参数组合汇总并打印"""
+    groups = {}
+    for row in rows:
+        key = tuple(row[name] for name in SWEEP_PARAMETERS)
+        groups.setdefault(key, []).append(row)
+
+    for key, group in groups.items():
+        config = ", ".join(f"{name}={value}" for name, value in zip(SWEEP_PARAMETERS, key))
+        wins = sum(1 for row in group if row["outcome"] == "won")
+        print(f"\n[{config}]")
+        print(f"  {len(group)} 局  胜率 {wins / len(group):.1%}  "
+              f"平均分数 {statistics.mean(row['score'] for row in group):.0f}  "
+              f"平均关卡 {statistics.mean(row['level'] for row in group):.2f}  "
+              f"平均死亡 {statistics.mean(row['deaths'] for row in group):.2f}")
+        for level in range(1, max_levels + 1):
+            times = [row[f"boss_ttk_{level}"] for row in group if row[f"boss_ttk_{level}"] is not None]
+            if times:
+                print(f"  第 {level} 关 Boss 击杀 {len(times)} 次，用时中位数 {statistics.median(times):.1f}s")
+        print(f"  实体峰值：敌人 {max(row['peak_enemies'] for row in group)}  "
+              f"子弹 {max(row['peak_bullets'] for row in group)}  "
+              f"粒子 {max(row['peak_particles'] for row in group)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="星际捍卫者批量无头模拟")
+    parser.add_argument("--runs", type=int, default=100, help="每组参数模拟的局数")
+    parser.add_argument("--seed", type=int, default=0, help="第一局的随机种子，之后依次加 1")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument("--max-ticks", type=int, default=HEADLESS_MAX_TICKS, help="单局 tick 上限")
+    parser.add_argument("--max-levels", type=int, default=5, help="关卡数")
+    parser.add_argument("--output", default="batch_results.csv", help="结果文件（.csv 或 .parquet）")
+    for name, kind in SWEEP_PARAMETERS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=kind, nargs="+",
+                            help=f"扫描的 {name} 取值（默认 {getattr(DEFAULT_BALANCE, name)}）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = make_jobs(args)
+
+    # 工作进程里 SDL 接管了 SIGTERM，pool.terminate() 无法结束它们，
+    # 所以不用 with 语句，而是 close() + join() 让工作进程正常退出
+    start = time.perf_counter()
+    pool = Pool(args.workers)
+    try:
+        rows = pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (args.workers * 4)))
+    finally:
+        pool.close()
+        pool.join()
+    seconds = time.perf_counter() - start
+
+    write_rows(args.output, rows)
+
+    ticks = sum(row["ticks"] for row in rows)
+    print(f"{len(rows)} 局，共 {ticks} tick，用时 {seconds:.1f}s（{ticks / seconds:.0f} tick/s，"
+          f"{args.workers} 个进程），结果写入 {args.output}")
+    summarize(rows, args.max_levels)
+
+
+if __name__ == "__main__":
+    main()
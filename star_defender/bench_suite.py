@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏循环基准套件
+以无头模式构建 StarDefender，运行固定种子的脚本场景，分别统计 update / check_collisions / draw
+每帧的耗时，结果写成 JSON，并可与保存的基线比较（中位数变慢超过阈值视为性能回退，退出码 1）
+
+用法:
+    python bench_suite.py                                   # 运行全部场景并打印结果
+    python bench_suite.py --output results.json             # 同时写入 JSON
+    python bench_suite.py --save-baseline                   # 写入基线 bench_baseline.json
+    python bench_suite.py --compare --threshold 0.15        # 与基线比较，变慢超过 15% 判为回退
+    python bench_suite.py --scenario bullets enemies        # 只运行部分场景
+
+基线与机器相关，应在同一台机器上生成和比较。
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# 无窗口环境下也能运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pygame
+
+from bullets import PLAYER_OWNER
+from controls import ControlState, ScriptedControls
+from enemies import BOSS, FLEET
+from main import StarDefender, SCREEN_WIDTH, SCREEN_HEIGHT, WHITE
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+METRICS = ("update", "collisions", "draw")
+
+
+def place_enemies(game, rng, count, health=None):
+    """在画面上半部随机摆放 count 架普通敌机；health 不为空时固定生命值"""
+    values = {} if health is None else {"health": health}
+    for _ in range(count):
+        game.enemies.spawn(rng.choice(FLEET), rng.randint(0, SCREEN_WIDTH - 50), rng.randint(-50, SCREEN_HEIGHT // 3),
+                           game.enemy_random, **values)
+
+
+def scene_empty(game, rng):
+    """空场：只有玩家和背景"""
+
+
+def scene_bullets(game, rng):
+    """500 发玩家子弹铺满画面"""
+    game.bullets.spawn([rng.randint(0, SCREEN_WIDTH) for _ in range(500)],
+                       [rng.randint(0, SCREEN_HEIGHT) for _ in range(500)],
+                       0, -10, 4, 8, WHITE, 1, PLAYER_OWNER)
+
+
+def scene_enemies(game, rng):
+    """200 架敌机（不会被打掉，数量在整个场景中保持稳定）"""
+    place_enemies(game, rng, 200, health=1000)
+
+
+def scene_boss_barrage(game, rng):
+    """Boss 停在画面上方持续使用攻击模式 3，先预热到弹幕铺满画面"""
+    game.spawn_boss()
+    bosses, row = game.enemies.locate(game.boss, BOSS)
+    bosses.pos[row, 1] = 40
+    bosses.vel[row, 1] = 0
+    bosses.patterns[row] = bosses.patterns[row][1:2]
+    for _ in range(240):
+        game.update()
+
+
+def scene_bomb(game, rng):
+    """60 架敌机时引爆炸弹：每架敌机一次爆炸，加上 20 处轰炸爆炸"""
+    place_enemies(game, rng, 60)
+    game.bomb_count = 1
+    game.controls = ScriptedControls([ControlState(False, game.player.x, True)])
+
+
+def scene_particle_storm(game, rng):
+    """200 处各 50 个长寿命粒子，共 10000 个"""
+    x = np.repeat([rng.randint(0, SCREEN_WIDTH) for _ in range(200)], 50)
+    y = np.repeat([rng.randint(0, SCREEN_HEIGHT) for _ in range(200)], 50)
+    game.particles.burst(x, y, len(x), (1, 4), ((100, 255), (100, 255), (100, 255)), (-2, 2), 600)
+
+
+# 场景名 -> 布置函数（按运行顺序）
+SCENARIOS = {
+    "empty": scene_empty,
+    "bullets": scene_bullets,
+    "enemies": scene_enemies,
+    "boss_barrage": scene_boss_barrage,
+    "bomb": scene_bomb,
+    "particle_storm": scene_particle_storm,
+}
+
+
+def summarize(samples):
+    """单项耗时（毫秒）的统计"""
+    values = np.array(samples)
+    return {
+        "median": float(np.median(values)),
+        "p95": float(np.percentile(values, 95)),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+
+
+def run_scenario(setup, frames=60, repeats=5, seed=0):
+    """运行一个场景，返回各项耗时的统计和场景结束时的实体数量
+
+    每次重复都用 seed + 重复序号重新布置场景，然后逐帧计时 update 和 draw；
+    check_collisions 由 update 调用，单独记录它在每帧中的耗时。
+    """
+    game = StarDefender(headless=True, controls=ScriptedControls([]), seed=seed)
+    timings = {name: [] for name in METRICS}
+
+    # 包装实例上的 check_collisions，update 内部调用时一并计时
+    check_collisions = game.check_collisions
+
+    def timed_check_collisions():
+        start = time.perf_counter()
+        check_collisions()
+        timings["collisions"].append((time.perf_counter() - start) * 1000)
+
+    game.check_collisions = timed_check_collisions
+
+    for repeat in range(repeats):
+        game.controls = ScriptedControls([])
+        game.start_game()
+        game.rng.reseed(seed + repeat)
+        warmup = len(timings["collisions"])
+        setup(game, random.Random(seed + repeat))
+        del timings["collisions"][warmup:]  # 丢弃布置场景时预热产生的记录
+
+        for _ in range(frames):
+            # 保持玩家存活，场景不会提前结束
+            game.player.lives = game.player.max_lives
+
+            start = time.perf_counter()
+            game.update()
+            middle = time.perf_counter()
+            game.draw()
+            end = time.perf_counter()
+
+            timings["update"].append((middle - start) * 1000)
+            timings["draw"].append((end - middle) * 1000)
+
+    result = {name: summarize(samples) for name, samples in timings.items()}
+    result["entities"] = game.entity_counts()
+    return result
+
+
+def run_suite(names=None, frames=60, repeats=5, seed=0):
+    """运行指定的场景（默认全部），返回可写成 JSON 的结果"""
+    names = names or list(SCENARIOS)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "frames": frames,
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "scenarios": {name: run_scenario(SCENARIOS[name], frames, repeats, seed) for name in names},
+    }
+
+
+def compare(results, baseline, threshold=0.10, min_delta=0.05):
+    """与基线比较各场景各项耗时的中位数
+
+    返回 (场景, 项目, 基线毫秒, 当前毫秒, 比值, 是否回退) 列表。变慢超过 threshold（比例）
+    且绝对差超过 min_delta 毫秒才算回退，避免亚毫秒级的项目被计时噪声误判。
+    """
+    rows = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            old = previous[metric]["median"]
+            new = current[metric]["median"]
+            ratio = new / old if old > 0 else float("inf")
+            regressed = ratio > 1 + threshold and new - old > min_delta
+            rows.append((name, metric, old, new, ratio, regressed))
+    return rows
+
+
+def print_results(results):
+    """打印结果表"""
+    print(f"== 基准场景（每场景 {results['meta']['repeats']} × {results['meta']['frames']} 帧，单位 ms）==")
+    print(f"{'场景':<16}{'update p50':>12}{'p95':>9}{'碰撞 p50':>11}{'p95':>9}{'draw p50':>11}{'p95':>9}  实体")
+    for name, result in results["scenarios"].items():
+        cells = "".join(f"{result[metric]['median']:12.3f}{result[metric]['p95']:9.3f}" for metric in METRICS)
+        counts = " ".join(f"{key} {value}" for key, value in result["entities"].items())
+        print(f"{name:<16}{cells}  {counts}")
+
+
+def print_comparison(rows, threshold):
+    """打印与基线的对比"""
+    print(f"== 与基线比较（回退阈值 +{threshold:.0%}）==")
+    for name, metric, old, new, ratio, regressed in rows:
+        mark = "回退" if regressed else ""
+        print(f"{name:<16}{metric:<12}{old:9.3f} -> {new:9.3f} ms  {ratio:6.2f}x  {mark}")
+
+
+def load_json(path):
+    """读取 JSON 文件"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    """写入 JSON 文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def parse_args(argv=None):
+    """命令行参数"""
+    parser = argparse.ArgumentParser(description="游戏循环基准套件")
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), help="只运行这些场景")
+    parser.add_argument("--frames", type=int, default=60, help="每次重复计时的帧数")
+    parser.add_argument("--repeats", type=int, default=5, help="每个场景重新布置的次数")
+    parser.add_argument("--seed", type=int, default=0, help="场景布置的随机种子")
+    parser.add_argument("--output", help="结果写入的 JSON 文件")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--compare", action="store_true", help="与基线比较，有回退时退出码为 1")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判为回退的变慢比例")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="判为回退的最小绝对差（毫秒）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """运行基准套件，返回退出码"""
+    args = parse_args(argv)
+    results = run_suite(args.scenario, args.frames, args.repeats, args.seed)
+    print_results(results)
+
+    if args.output:
+        save_json(args.output, results)
+    if args.save_baseline:
+        save_json(args.baseline, results)
+        print(f"基线已写入 {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"找不到基线 {args.baseline}，先用 --save-baseline 生成")
+            return 2
+        rows = compare(results, load_json(args.baseline), args.threshold, args.min_delta)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row[-1]]
+        if regressions:
+            print(f"{len(regressions)} 项性能回退")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+用法: python benchmark.py
+"""
+
+import math
+import os
+import sys
+import random
+import time
+
+# 无窗口环境下也能运行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from entities import EntityList
+from particles import ParticleSystem
+import numpy as np
+import pygame
+
+from bullets import PLAYER_OWNER, HOSTILE_OWNER
+from enemies import (BOSS, FLEET, MEDIUM, METEOR, METEOR_SHAPE_TABLE, SMALL, ENEMY_TYPES, EnemyWorld)
+from main import (StarDefender, Background,
+                  PowerUp, SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, RED,
+                  GAME_PLAYING, GAME_PAUSED, GAME_OVER, GAME_WON, START_MENU)
+from surfaces import SurfaceManager
+from text import TextCache
+
+
+def check_collisions_naive(game):
+    """逐对比较的碰撞检测，作为正确性与性能的参照"""
+    bullets = game.bullets
+    fleet = game.enemies.select("collider")
+    order = fleet.spawn_order()
+    rects = game.enemies.rects(fleet)
+    centers = game.enemies.centers(fleet).tolist()
+    health = fleet["health"]
+    points = fleet["points"].tolist()
+    ram_scores = fleet["ram_scores"].tolist()
+    alive = [True] * len(rects)
+    spent = []
+    for i in bullets.indices_of(PLAYER_OWNER).tolist():
+        bullet_rect = pygame.Rect(*bullets.boxes([i])[0])
+        for k in order:
+            if alive[k] and bullet_rect.colliderect(rects[k]):
+                health[k] -= bullets.damage[i]
+                spent.append(i)
+
+                if health[k] <= 0:
+                    game.create_explosion(*centers[k])
+                    game.score += points[k]
+                    alive[k] = False
+                break
+    bullets.remove(spent)
+
+    for k in order:
+        if alive[k] and game.player.rect.colliderect(rects[k]):
+            game.player.take_damage()
+            game.create_explosion(*centers[k])
+
+            if ram_scores[k]:
+                game.score += points[k]
+
+            alive[k] = False
+
+    fleet["health"] = health
+    fleet.keep(np.array(alive, dtype=bool))
+
+    for power_up in list(game.power_ups):
+        if game.player.rect.colliderect(power_up.rect):
+            if power_up.type == "bullet":
+                game.activate_bullet_power_up()
+            elif power_up.type == "bomb":
+                game.bomb_count = min(9, game.bomb_count + 1)
+
+            game.power_ups.remove(power_up)
+
+    hits = []
+    for i in bullets.indices_of(HOSTILE_OWNER).tolist():
+        left, top, width, height = bullets.boxes([i])[0]
+        if game.player.rect.colliderect((left, top, width, height)):
+            hits.append(i)
+            game.create_explosion(left, top)
+    if hits:
+        game.player.take_damage()
+        bullets.remove(hits)
+
+
+def build_collision_scene(game, bullet_count, enemy_count, seed=0, enemy_health=None):
+    """在 480×800 的画面内随机摆放子弹、敌人、敌方子弹和道具
+
+    敌人集中在画面上部（与实际波次一致），子弹分布在整个画面
+
+    enemy_health 为 None 时随机 1~5 点生命值，否则固定（用于排除爆炸粒子的耗时）
+    """
+    # 陨石尺寸和爆炸粒子使用游戏的随机数流，一并固定种子
+    rng = random.Random(seed)
+    game.reset_game()
+    game.rng.reseed(seed)
+
+    for _ in range(enemy_count):
+        kind = rng.choice(FLEET)
+        x, y = rng.randint(0, SCREEN_WIDTH - 50), rng.randint(-50, SCREEN_HEIGHT // 2)
+        health = rng.randint(1, 5) if enemy_health is None else enemy_health
+        game.enemies.spawn(kind, x, y, game.enemy_random, health=health)
+        for _ in range(rng.randint(0, 3)):
+            game.bullets.spawn(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT),
+                               0, 5, 4, 8, RED, 1, HOSTILE_OWNER)
+
+    for _ in range(bullet_count):
+        game.bullets.spawn(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT),
+                           0, -10, 4, 8, WHITE, 1, PLAYER_OWNER)
+
+    for _ in range(5):
+        game.power_ups.append(PowerUp(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT),
+                                      rng.choice(["bullet", "bomb"])))
+
+    game.player.x = rng.randint(0, SCREEN_WIDTH - game.player.width)
+    game.player.rect.topleft = (game.player.x, game.player.y)
+
+
+def collision_outcome(game):
+    """碰撞检测结果的摘要，用于比较两种实现"""
+    bullets = game.bullets
+    return (
+        game.score,
+        game.player.lives,
+        game.bomb_count,
+        len(game.particles),
+        bullets.pos[:len(bullets)].tolist(),
+        bullets.owner[:len(bullets)].tolist(),
+        game.enemies.snapshot(),
+        [(power_up.x, power_up.y) for power_up in game.power_ups],
+    )
+
+
+def time_collisions(game, check, bullet_count, enemy_count, repeats=20):
+    """返回单次碰撞检测耗时的中位数（毫秒）"""
+    samples = []
+    for seed in range(repeats):
+        build_collision_scene(game, bullet_count, enemy_count, seed, enemy_health=1000)
+        start = time.perf_counter()
+        check()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def bench_collisions(game):
+    """空间哈希与两两比较的耗时对比"""
+    print("== 碰撞检测 (子弹 / 敌人) ==")
+    for bullet_count, enemy_count in [(50, 10), (200, 30), (500, 60), (800, 100)]:
+        naive = time_collisions(game, lambda: check_collisions_naive(game), bullet_count, enemy_count)
+        grid = time_collisions(game, game.check_collisions, bullet_count, enemy_count)
+        print(f"{bullet_count:5d} / {enemy_count:4d}: 两两比较 {naive:7.3f} ms"
+              f"  空间哈希 {grid:7.3f} ms  加速 {naive / grid:5.1f}x")
+
+
+def bench_containers():
+    """list[:] 拷贝 + list.remove 与 EntityList 标记删除的对比"""
+    print("== 实体容器 (遍历并删除一半元素) ==")
+    for count in [100, 500, 1000, 5000]:
+        items = [PowerUp(0, 0, "bullet") for _ in range(count)]
+
+        start = time.perf_counter()
+        plain = list(items)
+        for i, item in enumerate(plain[:]):
+            if i % 2:
+                plain.remove(item)
+        list_time = (time.perf_counter() - start) * 1000
+
+        entity_list = EntityList()
+        for item in items:
+            entity_list.append(item)
+        start = time.perf_counter()
+        for i, item in enumerate(entity_list):
+            if i % 2:
+                entity_list.remove(item)
+        entity_list.compact()
+        entity_time = (time.perf_counter() - start) * 1000
+
+        print(f"{count:6d}: list.remove {list_time:8.3f} ms  EntityList {entity_time:7.3f} ms")
+
+
+def populate_frame_scene(game, count, seed=0):
+    """按实体总数填充一帧：1/2 玩家子弹、1/4 粒子、1/8 敌人（各带一发子弹）"""
+    rng = random.Random(seed)
+    game.start_game()
+    game.rng.reseed(seed)
+
+    for _ in range(count // 8):
+        kind = rng.choice(FLEET)
+        entity = game.enemies.spawn(kind, rng.randint(0, SCREEN_WIDTH - 50), rng.randint(-50, SCREEN_HEIGHT // 3),
+                                    game.enemy_random, health=1000)
+        enemies, row = game.enemies.locate(entity, kind)
+        (x, y), height = enemies.pos[row].tolist(), int(enemies.size[row, 1])
+        game.bullets.spawn(x, y + height, 0, 5, 4, 8, RED, 1, HOSTILE_OWNER)
+
+    for _ in range(count // 2):
+        game.bullets.spawn(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT),
+                           0, -10, 4, 8, WHITE, 1, PLAYER_OWNER)
+
+    game.particles.emit([rng.randint(0, SCREEN_WIDTH) for _ in range(count // 4)],
+                        [rng.randint(0, SCREEN_HEIGHT) for _ in range(count // 4)],
+                        3, WHITE, 1, -1, 60)
+
+
+def bench_frame(game, frames=30):
+    """单帧 update() 耗时随实体数量的变化"""
+    print("== 单帧 update (实体总数) ==")
+    for count in [100, 250, 500, 1000, 2000]:
+        populate_frame_scene(game, count)
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            game.update()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        print(f"{count:6d}: 中位数 {samples[len(samples) // 2]:7.3f} ms  最大 {samples[-1]:7.3f} ms")
+
+
+def bench_particles(frames=60):
+    """粒子系统每帧 update 耗时"""
+    print("== 粒子系统 update ==")
+    for count in [1000, 10000, 50000]:
+        particles = ParticleSystem()
+        samples = []
+        for _ in range(frames):
+            # 保持粒子总数稳定：补充上一帧死亡的粒子
+            if len(particles) < count:
+                particles.burst(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, count - len(particles),
+                                (1, 5), ((200, 255), (50, 150), (0, 0)), (-5, 5), 60)
+            start = time.perf_counter()
+            particles.update()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        print(f"{count:6d}: 中位数 {samples[len(samples) // 2]:7.3f} ms  最大 {samples[-1]:7.3f} ms")
+
+
+def bench_sprites(game, frames=30):
+    """逐帧程序化绘制与缓存精灵 blit 的绘制耗时对比"""
+    print("== 战机绘制 (屏幕上的敌人数) ==")
+    rng = random.Random(0)
+    screen = game.screen
+    for count in [200, 400, 800]:
+        ships = EnemyWorld()
+        for _ in range(count):
+            ships.spawn(rng.choice([SMALL, MEDIUM]), rng.randint(0, SCREEN_WIDTH - 50),
+                        rng.randint(0, SCREEN_HEIGHT - 40))
+        ships.spawn(BOSS, SCREEN_WIDTH // 2 - 100, 50, health=1)
+        power_ups = [PowerUp(rng.randint(0, SCREEN_WIDTH - 20), rng.randint(0, SCREEN_HEIGHT - 20),
+                             rng.choice(["bullet", "bomb"])) for _ in range(count // 10)]
+
+        def paint():
+            for table in ships.query("renderable"):
+                for x, y in table["pos"].tolist():
+                    ENEMY_TYPES[table.name].paint(screen, x, y)
+            for power_up in power_ups:
+                power_up.paint(screen, power_up.x, power_up.y)
+
+        def blit():
+            ships.draw(screen, game.sprites)
+            for power_up in power_ups:
+                power_up.draw(screen)
+
+        timings = []
+        for draw in (paint, blit):
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                draw()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        paint_time, sprite_time = timings
+        print(f"{count:6d}: 程序化绘制 {paint_time:7.3f} ms  精灵缓存 {sprite_time:7.3f} ms"
+              f"  加速 {paint_time / sprite_time:5.1f}x")
+    print(f"        缓存: {game.sprites.stats()}")
+
+
+def bench_meteors(game, frames=30):
+    """逐帧旋转绘制陨石与旋转帧图集的绘制耗时对比"""
+    print("== 陨石绘制 (屏幕上的陨石数) ==")
+    rng = random.Random(0)
+    screen = game.screen
+    for count in [100, 300, 600]:
+        meteors = EnemyWorld()
+        for _ in range(count):
+            meteors.spawn(METEOR, rng.randint(0, SCREEN_WIDTH - 45), rng.randint(0, SCREEN_HEIGHT - 45), rng,
+                          rotation=rng.uniform(-360, 360))
+        meteors.draw(screen, game.sprites)  # 预先生成图集，只比较稳定后的每帧开销
+        table = meteors[METEOR]
+
+        def paint():
+            for seed, (x, y), (width, height), rotation in zip(table["sprite"].tolist(), table["pos"].tolist(),
+                                                               table["size"].tolist(), table["rotation"].tolist()):
+                METEOR_SHAPE_TABLE[seed].paint(screen, x + width // 2, y + height // 2, rotation)
+
+        timings = []
+        for draw in (paint, lambda: meteors.draw(screen, game.sprites)):
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                draw()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        paint_time, atlas_time = timings
+        print(f"{count:6d}: 逐帧旋转 {paint_time:7.3f} ms  旋转帧图集 {atlas_time:7.3f} ms"
+              f"  加速 {paint_time / atlas_time:5.1f}x")
+
+
+def bench_text(game, frames=60):
+    """HUD 与菜单的文字绘制：每帧 font.render 与文字缓存 + HUD 图层的对比"""
+    print("== 文字绘制 (每帧) ==")
+    screens = [
+        ("开始菜单", START_MENU, game.draw_start_menu),
+        ("游戏中", GAME_PLAYING, lambda: (game.draw_ui(), game.draw_boss_health_bar())),
+        ("暂停", GAME_PAUSED, game.draw_pause_menu),
+        ("游戏结束", GAME_OVER, game.draw_game_over),
+        ("游戏胜利", GAME_WON, game.draw_game_won),
+    ]
+    game.start_game()
+    game.spawn_boss()
+
+    for name, state, draw in screens:
+        game.game_state = state
+        timings = []
+        for cached in (False, True):
+            game.text = TextCache(capacity=256 if cached else 0)
+            samples = []
+            for _ in range(frames):
+                if not cached:
+                    game.hud.invalidate()
+                start = time.perf_counter()
+                draw()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        stats = game.text.stats()
+        saved = stats["saved_ms"] / frames
+        print(f"{name:>8s}: font.render {timings[0]:7.3f} ms  缓存 {timings[1]:7.3f} ms"
+              f"  每帧节省渲染 {saved:6.3f} ms  (命中 {stats['hits']} / 未命中 {stats['misses']})")
+
+
+class AllocatingSurfaces(SurfaceManager):
+    """每次取用都新建 Surface，模拟原来逐帧分配的写法"""
+
+    def get(self, key, build):
+        self.built += 1
+        return build()
+
+    def disc(self, radius, r, g, b, alpha):
+        def build():
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (r, g, b, alpha), (radius, radius), radius)
+            return surface
+
+        return self.get(None, build)
+
+
+def bench_surfaces(game, frames=30):
+    """整帧 draw()：每次现建遮罩/发光层/圆盘与共享 Surface 的对比"""
+    print("== 临时 Surface (暂停画面下的整帧 draw) ==")
+    for count in [250, 1000, 2000]:
+        populate_frame_scene(game, count)
+        # 一半玩家子弹换成带发光层的黄色子弹
+        player_bullets = game.bullets.indices_of(PLAYER_OWNER)
+        game.bullets.color[player_bullets[::2]] = (255, 255, 0)
+        game.game_state = GAME_PAUSED
+
+        timings = []
+        for surfaces in (AllocatingSurfaces(), SurfaceManager()):
+            game.surfaces = game.bullets.surfaces = game.particles.surfaces = surfaces
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                game.draw()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        last_frame = surfaces.last_frame
+        print(f"{count:6d}: 每次新建 {timings[0]:7.3f} ms  共享 {timings[1]:7.3f} ms"
+              f"  每帧避免分配 {last_frame['avoided']:5d} 次")
+
+
+def bench_render(game, frames=60):
+    """整帧 draw()：整屏 flip 与脏矩形 display.update(rects) 的对比"""
+    print("== 渲染模式 (游戏中的整帧 draw) ==")
+    for count in [100, 250, 1000]:
+        timings = []
+        for enabled in (False, True):
+            populate_frame_scene(game, count)
+            game.renderer.enabled = enabled
+            game.renderer.invalidate()
+            partial_frames = game.renderer.partial_frames
+            samples = []
+            for _ in range(frames):
+                game.update()
+                start = time.perf_counter()
+                game.draw()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        stats = game.renderer.stats()
+        game.renderer.enabled = False
+        print(f"{count:6d}: 整屏 flip {timings[0]:7.3f} ms  脏矩形 {timings[1]:7.3f} ms"
+              f"  脏区域 {stats['last_dirty_ratio']:6.1%}  局部更新 {stats['partial_frames'] - partial_frames}/{frames} 帧")
+    print("        （dummy 视频驱动下 flip 没有实际开销，这里只反映脏矩形记录的 CPU 代价）")
+
+
+def make_star_dicts(count, rng):
+    """原来的逐颗星字典表示，作为参照"""
+    return [{"x": rng.randint(0, SCREEN_WIDTH), "y": rng.randint(0, SCREEN_HEIGHT), "size": rng.randint(1, 3),
+             "speed": rng.uniform(0.5, 2.0),
+             "color": (rng.randint(100, 255), rng.randint(100, 255), rng.randint(100, 255))}
+            for _ in range(count)]
+
+
+def step_star_dicts(stars, screen, rng):
+    """原来的逐颗星更新与绘制"""
+    screen.fill((0, 0, 20))
+    for star in stars:
+        star["y"] += star["speed"]
+        if star["y"] > SCREEN_HEIGHT:
+            star["y"] = -5
+            star["x"] = rng.randint(0, SCREEN_WIDTH)
+        pygame.draw.circle(screen, star["color"], (int(star["x"]), int(star["y"])), star["size"])
+
+
+def bench_background(game, frames=60):
+    """背景每帧 update + draw：逐颗星字典与分层星空贴图的对比"""
+    print("== 背景星空 (星星数量) ==")
+    rng = random.Random(0)
+    screen = game.screen
+    for count in [100, 1000, 5000]:
+        stars = make_star_dicts(count, rng)
+        background = Background(star_count=count)
+        background.planets = []
+
+        timings = []
+        for step in (lambda: step_star_dicts(stars, screen, rng),
+                     lambda: (background.update(), background.draw(screen)),
+                     lambda: (background.update(), background.draw(screen, track=True))):
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                step()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        print(f"{count:6d}: 逐颗绘制 {timings[0]:7.3f} ms  分层贴图 {timings[1]:7.3f} ms"
+              f"  逐颗截取(脏矩形) {timings[2]:7.3f} ms")
+
+
+def bench_motion(frames=60):
+    """逐架计算正弦路径与移动系统（按移动方式分组、正弦查表）的每 tick 耗时对比"""
+    print("== 敌机移动 (侦察机数量) ==")
+    rng = random.Random(0)
+    for count in [1, 10, 100, 1000, 10000]:
+        # 逐架：每架一个对象，每 tick 一次 math.sin（原来 SmallScout.update 的做法）
+        scouts = [{"x": 0.0, "y": 0.0, "origin": rng.uniform(0, SCREEN_WIDTH), "timer": 0} for _ in range(count)]
+
+        def step_objects():
+            for scout in scouts:
+                scout["timer"] += 1
+                scout["x"] = scout["origin"] + math.sin(scout["timer"] * 0.02) * 8
+                scout["y"] += 4
+
+        world = EnemyWorld()
+        mixed = EnemyWorld()
+        for i in range(count):
+            x = rng.uniform(0, SCREEN_WIDTH)
+            world.spawn(SMALL, x, 0)
+            mixed.spawn(SMALL, x, 0, motion=("sine", "straight", "dive", "swoop")[i % 4])
+
+        timings = []
+        for step in (step_objects, world.move, mixed.move):
+            samples = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                step()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            timings.append(samples[len(samples) // 2])
+
+        print(f"{count:6d}: 逐架计算 {timings[0]:8.3f} ms  移动系统 {timings[1]:7.3f} ms"
+              f"  四种移动混编 {timings[2]:7.3f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_game = StarDefender()
+    bench_collisions(benchmark_game)
+    bench_containers()
+    bench_frame(benchmark_game)
+    bench_particles()
+    bench_sprites(benchmark_game)
+    bench_meteors(benchmark_game)
+    bench_motion()
+    bench_text(benchmark_game)
+    bench_surfaces(benchmark_game)
+    bench_render(benchmark_game)
+    bench_background(benchmark_game)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+子弹引擎（NumPy 结构数组）
+玩家与敌方子弹统一存放在连续数组中，带 x/y 速度、伤害、归属和寿命，
+批量积分、批量剔除出界子弹，并支持对矩形的批量重叠查询
+"""
+
+import numpy as np
+
+from pools import SlotPool
+from surfaces import SurfaceManager
+
+
+# 子弹归属
+PLAYER_OWNER = 0
+HOSTILE_OWNER = 1
+
+# 默认寿命（帧），防止异常子弹永远滞留
+DEFAULT_LIFETIME = 600
+
+
+class BulletEngine:
+    """结构数组形式的子弹引擎
+
+    子弹按发射顺序存放，移除时用掩码压缩，保持剩余子弹的相对顺序。
+    max_capacity 为子弹数上限（None 为不限），超出时新发射的一排子弹整体丢弃（见 pools.py）。
+    """
+
+    FIELDS = ("pos", "vel", "size", "color", "damage", "owner", "life")
+
+    def __init__(self, capacity=1024, surfaces=None, max_capacity=None):
+        self.count = 0
+        self.pool = SlotPool(max_capacity)
+        self._allocate(self.pool.fit(capacity, 0))
+
+        # 黄色子弹的发光层由 Surface 管理器按尺寸共享
+        self.surfaces = surfaces if surfaces is not None else SurfaceManager()
+
+    def _allocate(self, capacity):
+        """按容量分配（或扩容）数组，保留已有子弹"""
+        old = [getattr(self, name) for name in self.FIELDS] if hasattr(self, "pos") else None
+
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros((capacity, 2), dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.zeros(capacity, dtype=np.uint8)
+        self.life = np.zeros(capacity, dtype=np.int32)
+
+        if old is not None:
+            n = self.count
+            for name, old_array in zip(self.FIELDS, old):
+                getattr(self, name)[:n] = old_array[:n]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """移除所有子弹"""
+        self.count = 0
+
+    def stats(self):
+        """当前子弹数、容量和槽位复用统计"""
+        return dict(self.pool.stats(), count=self.count, capacity=self.capacity)
+
+    def spawn(self, x, y, speed_x, speed_y, width, height, color, damage, owner,
+              lifetime=DEFAULT_LIFETIME):
+        """发射子弹，位置与速度可以是标量或等长数组（一次发射整排子弹）"""
+        n = max(np.size(x), np.size(y), np.size(speed_x), np.size(speed_y))
+
+        capacity = self.pool.claim(self.count, n, self.capacity)
+        if capacity is None:
+            return
+        if capacity > self.capacity:
+            self._allocate(capacity)
+
+        start = self.count
+        end = start + n
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.vel[start:end, 0] = speed_x
+        self.vel[start:end, 1] = speed_y
+        self.size[start:end] = (width, height)
+        self.color[start:end] = color
+        self.damage[start:end] = damage
+        self.owner[start:end] = owner
+        self.life[start:end] = lifetime
+        self.count = end
+
+    def _keep(self, mask):
+        """只保留 mask 为 True 的子弹"""
+        n = self.count
+        survivors = int(np.count_nonzero(mask))
+        if survivors == n:
+            return
+
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:survivors] = array[:n][mask]
+        self.count = survivors
+
+    def remove(self, indices):
+        """批量移除指定下标的子弹"""
+        if len(indices) == 0:
+            return
+        mask = np.ones(self.count, dtype=bool)
+        mask[indices] = False
+        self._keep(mask)
+
+    def remove_owner(self, owner):
+        """移除某一方的全部子弹"""
+        self._keep(self.owner[:self.count] != owner)
+
+    def update(self, width, height):
+        """积分所有子弹，剔除寿命耗尽或朝外飞出画面四边的子弹"""
+        n = self.count
+        if not n:
+            return
+
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        size = self.size[:n]
+        pos += vel
+        life = self.life[:n]
+        life -= 1
+
+        # 只剔除已完全出界且仍在远离画面的子弹，从画面外射入的子弹会保留
+        x, y = pos[:, 0], pos[:, 1]
+        vx, vy = vel[:, 0], vel[:, 1]
+        gone = ((x + size[:, 0] < 0) & (vx <= 0)) | ((x > width) & (vx >= 0)) | \
+               ((y + size[:, 1] < 0) & (vy <= 0)) | ((y > height) & (vy >= 0)) | \
+               (life <= 0)
+        if gone.any():
+            self._keep(~gone)
+
+    def indices_of(self, owner):
+        """某一方子弹的下标（按发射顺序）"""
+        return np.flatnonzero(self.owner[:self.count] == owner)
+
+    def boxes(self, indices):
+        """指定子弹的 (left, top, width, height) 整数矩形列表"""
+        left_top = self.pos[indices].astype(np.int32)
+        return np.hstack((left_top, self.size[indices])).tolist()
+
+    def overlapping(self, rect, owner):
+        """与 rect 重叠的某一方子弹下标（批量判定）"""
+        n = self.count
+        left_top = self.pos[:n].astype(np.int32)
+        size = self.size[:n]
+        left, top = left_top[:, 0], left_top[:, 1]
+        hit = (self.owner[:n] == owner) & \
+              (left < rect.right) & (left + size[:, 0] > rect.left) & \
+              (top < rect.bottom) & (top + size[:, 1] > rect.top)
+        return np.flatnonzero(hit)
+
+    def draw(self, screen, alpha=1.0):
+        """绘制所有子弹，返回绘制区域列表
+
+        alpha < 1 时按速度回退到上一 tick 与当前 tick 之间的位置绘制
+        """
+        n = self.count
+        if not n:
+            return []
+
+        pos = self.pos[:n]
+        if alpha < 1:
+            pos = pos - self.vel[:n] * (1 - alpha)
+        left_top = pos.astype(np.int32).tolist()
+        sizes = self.size[:n].tolist()
+        colors = self.color[:n].tolist()
+        glows = []
+        fill = screen.fill
+        glow = self.surfaces.glow
+
+        rects = []
+        for (x, y), (w, h), color in zip(left_top, sizes, colors):
+            rects.append(fill(color, (x, y, w, h)))
+            # 子弹发光效果
+            if color == [255, 255, 0]:
+                glows.append((glow(w, h, (255, 255, 0, 50)), (x - 3, y - 3)))
+
+        if glows:
+            rects += screen.blits(glows)
+        return rects
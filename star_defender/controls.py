@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+输入源
+玩家每个 tick 从输入源读取一次操作（是否按下、目标 x、是否使用炸弹）。
+窗口模式读取鼠标；无头模式可注入脚本或自动驾驶输入，不依赖显示器
+"""
+
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from bullets import HOSTILE_OWNER
+from waves import BOSS
+
+
+# 一个 tick 的操作：fire 对应鼠标左键按下（同时移动到 x），bomb 为使用全屏轰炸
+ControlState = namedtuple("ControlState", "fire x bomb")
+
+IDLE = ControlState(False, 0, False)
+
+
+class Controls(ABC):
+    """输入源基类：游戏每个 tick 调用一次 poll(game)，得到这个 tick 的 ControlState"""
+
+    @abstractmethod
+    def poll(self, game):
+        """读取当前 tick 的操作"""
+
+    def request_bomb(self):
+        """键盘或点击请求使用炸弹（默认忽略：脚本和回放输入不受实时事件干扰）"""
+
+
+class MouseControls(Controls):
+    """读取鼠标的输入源（窗口模式的默认输入）
+
+    炸弹由键盘和点击事件触发（见 StarDefender.handle_events），在下一个 tick 生效，
+    因此和鼠标一样会被录进回放。
+    """
+
+    def __init__(self):
+        self.bomb_requested = False
+
+    def request_bomb(self):
+        self.bomb_requested = True
+
+    def poll(self, game):
+        """读取当前 tick 的操作"""
+        fire = pygame.mouse.get_pressed()[0]
+        mouse_x, _ = pygame.mouse.get_pos()
+        bomb = self.bomb_requested
+        self.bomb_requested = False
+        return ControlState(fire, mouse_x, bomb)
+
+
+class ScriptedControls(Controls):
+    """按预先录制的序列逐 tick 回放操作
+
+    script 为 ControlState（或 (fire, x, bomb) 元组）的序列，回放完后保持空闲。
+    """
+
+    def __init__(self, script):
+        self.script = [ControlState(*state) for state in script]
+        self.position = 0
+
+    def poll(self, game):
+        """读取当前 tick 的操作"""
+        if self.position >= len(self.script):
+            return IDLE
+        state = self.script[self.position]
+        self.position += 1
+        return state
+
+
+class AutoPilot(Controls):
+    """简单的自动驾驶：对准最靠下的敌人（或 Boss），在不会被击中的位置里选离目标最近的一个；
+    Boss 只受炸弹伤害，出现后有炸弹就用
+
+    只读取游戏状态、不使用随机数，同样的游戏过程得到同样的操作。
+    """
+
+    def __init__(self, lookahead=45, step=10, margin=6):
+        self.lookahead = lookahead  # 预测多少 tick 内到达玩家高度的子弹和敌人
+        self.step = step            # 候选位置的间隔（像素）
+        self.margin = margin        # 与威胁保持的额外水平距离
+
+    def poll(self, game):
+        """根据当前游戏状态决定这个 tick 的操作"""
+        player = game.player
+        half = player.width // 2
+        center = player.x + half
+
+        # 目标：玩家上方最靠下的敌人（同样高时取靠前的），没有时对准 Boss
+        fleet = game.enemies.select("collider")
+        enemy_pos = fleet["pos"]
+        enemy_size = fleet["size"]
+        enemy_speed = fleet["vel"][:, 1]
+        above = enemy_pos[:, 1] + enemy_size[:, 1] < player.y
+        if above.any():
+            target = int(np.argmax(np.where(above, enemy_pos[:, 1], -np.inf)))
+            desired = enemy_pos[target, 0] + enemy_size[target, 0] // 2
+        elif game.boss is not None and game.boss_spawned:
+            desired = game.enemies.center(game.boss, BOSS)[0]
+        else:
+            desired = center
+
+        # 威胁：lookahead 个 tick 内到达玩家高度时占据的水平区间，以及到达所需的 tick 数
+        lefts = []
+        rights = []
+        arrivals = []
+        bullets = game.bullets
+        hostile = bullets.indices_of(HOSTILE_OWNER)
+        if len(hostile):
+            pos = bullets.pos[hostile]
+            vel = bullets.vel[hostile]
+            width = bullets.size[hostile, 0]
+            ticks = np.maximum(player.y - pos[:, 1], 0) / np.maximum(vel[:, 1], 1e-3)
+            soon = (vel[:, 1] > 0) & (ticks < self.lookahead) & (pos[:, 1] < player.y + player.height)
+            x = pos[soon, 0] + vel[soon, 0] * ticks[soon]
+            lefts += x.tolist()
+            rights += (x + width[soon]).tolist()
+            arrivals += ticks[soon].tolist()
+        gap = player.y - (enemy_pos[:, 1] + enemy_size[:, 1])
+        near = (gap < enemy_speed * self.lookahead) & (enemy_pos[:, 1] < player.y + player.height)
+        lefts += enemy_pos[near, 0].tolist()
+        rights += (enemy_pos[near, 0] + enemy_size[near, 0]).tolist()
+        arrivals += (np.maximum(gap[near], 0) / np.maximum(enemy_speed[near], 1)).tolist()
+
+        # 候选位置：终点或移动途中会被威胁覆盖的位置代价很高，其余按与目标的距离排序
+        candidates = np.arange(half, game.screen.get_width() - half + 1, self.step)
+        cost = np.abs(candidates - desired).astype(np.float64)
+        if lefts:
+            lefts = np.array(lefts)
+            rights = np.array(rights)
+            reach = half + self.margin
+            at_end = (candidates[:, None] + reach > lefts) & (candidates[:, None] - reach < rights)
+            low = np.minimum(candidates, center)[:, None] - reach
+            high = np.maximum(candidates, center)[:, None] + reach
+            travel = np.abs(candidates - center)[:, None] / player.speed
+            on_way = (high > lefts) & (low < rights) & (np.array(arrivals) <= travel + 2)
+            cost += (at_end | on_way).sum(axis=1) * 10000
+        best = int(np.argmin(cost))
+
+        # Boss 在场或无处可躲时使用炸弹
+        boss = game.boss is not None and game.boss_spawned
+        bomb = game.bomb_count > 0 and (boss or bool(cost[best] >= 10000))
+
+        return ControlState(True, int(candidates[best]), bomb)
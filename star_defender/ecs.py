@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+实体组件系统（ECS）核心
+组件是一组命名的列；组件组合相同的实体（同一原型）存放在一张表里，每列一个连续数组。
+系统按组件查询到若干张表，对整列做向量化运算，不按实体逐个调用方法。
+表的行就是复用的槽位，取代了原来按对象取出、归还的敌机对象池；容量上限与复用统计由 pools.SlotPool 提供
+"""
+
+import bisect
+
+import numpy as np
+
+from pools import SlotPool
+
+
+class Archetype:
+    """一种原型的实体表
+
+    columns 为 {列名: (dtype, 每行元素数)}，元素数为 0 的是一维列；每列以同名属性存放（与子弹引擎一致），
+    另有 entity 列记录全局唯一的实体编号。行按生成顺序存放，移除时用掩码压缩，保持剩余行的相对顺序；
+    容量不够时按倍数扩容，但不超过 max_capacity（None 为不限），超出上限的一批生成整体丢弃（见 pools.py）。
+    """
+
+    def __init__(self, name, components, columns, capacity=64, max_capacity=None):
+        self.name = name
+        self.components = frozenset(components)
+        self.columns = dict(columns, entity=(np.int64, 0))
+        self.objects = [name for name, (dtype, _) in self.columns.items() if np.dtype(dtype) == object]
+        self.count = 0
+        self.capacity = 0
+        self.resizes = 0  # 扩容次数
+        self.pool = SlotPool(max_capacity)
+        self._allocate(self.pool.fit(capacity, 0))
+
+    def _allocate(self, capacity):
+        """按容量分配（或扩容）各列，保留已有的行"""
+        n = self.count
+        for name, (dtype, width) in self.columns.items():
+            array = np.zeros((capacity, width) if width else capacity, dtype=dtype)
+            if self.capacity:
+                array[:n] = getattr(self, name)[:n]
+            setattr(self, name, array)
+        if self.capacity:
+            self.resizes += 1
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, column):
+        """某一列当前所有行的视图"""
+        return getattr(self, column)[:self.count]
+
+    def has(self, *components):
+        """是否具有全部 components"""
+        return self.components.issuperset(components)
+
+    def reserve(self, count):
+        """保证还能追加 count 行而不扩容（不超过容量上限），返回是否扩容"""
+        capacity = self.pool.fit(self.capacity, self.count + count)
+        if capacity <= self.capacity:
+            return False
+        self._allocate(capacity)
+        return True
+
+    def append(self, count=1, **values):
+        """追加 count 行，返回新行的切片；超过容量上限时整批丢弃，返回 None
+
+        values 为列名 -> 标量或逐行的值，未给出的列为 0；对象列的值原样放进每一新行（不按序列展开）。
+        """
+        capacity = self.pool.claim(self.count, count, self.capacity)
+        if capacity is None:
+            return None
+        if capacity > self.capacity:
+            self._allocate(capacity)
+        start = self.count
+        end = start + count
+        for name in self.columns:
+            array = getattr(self, name)
+            value = values.get(name, 0 if name not in self.objects else None)
+            if name in self.objects:
+                for row in range(start, end):
+                    array[row] = value
+            else:
+                array[start:end] = value
+        self.count = end
+        return slice(start, end)
+
+    def keep(self, mask):
+        """只保留 mask 为 True 的行"""
+        n = self.count
+        survivors = int(np.count_nonzero(mask))
+        if survivors == n:
+            return
+
+        for name in self.columns:
+            array = getattr(self, name)
+            array[:survivors] = array[:n][mask]
+        # 对象列压缩后清空尾部，不再引用被移除行的对象
+        for name in self.objects:
+            getattr(self, name)[survivors:n] = None
+        self.count = survivors
+
+    def remove(self, rows):
+        """批量移除指定下标的行"""
+        if len(rows) == 0:
+            return
+        mask = np.ones(self.count, dtype=bool)
+        mask[rows] = False
+        self.keep(mask)
+
+    def clear(self):
+        """移除所有行"""
+        self.keep(np.zeros(self.count, dtype=bool))
+
+    def row(self, entity):
+        """实体所在的行，不在表中时返回 -1
+
+        实体编号按追加顺序递增，压缩又保持行的相对顺序，所以 entity 列有序，可以二分查找。
+        """
+        entities = self.entity[:self.count]
+        row = int(np.searchsorted(entities, entity))
+        return row if row < self.count and entities[row] == entity else -1
+
+
+class Selection:
+    """具有某些组件的所有表按表顺序拼接成的整体
+
+    下标按表顺序连续编号；读取一列得到拼接后的连续数组（拷贝），
+    修改后整体写回。只在两次结构变化（追加、移除）之间有效。
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.starts = [0]  # 各表第一行的整体下标，最后一项为总数
+        for table in tables:
+            self.starts.append(self.starts[-1] + table.count)
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def __getitem__(self, column):
+        parts = [getattr(table, column)[:table.count] for table in self.tables]
+        if len(parts) == 1:
+            return parts[0].copy()
+        return np.concatenate(parts)
+
+    def __setitem__(self, column, values):
+        for table, start, end in zip(self.tables, self.starts, self.starts[1:]):
+            table[column][:] = values[start:end]
+
+    def locate(self, index):
+        """整体下标对应的 (表, 行)"""
+        k = bisect.bisect_right(self.starts, index) - 1
+        return self.tables[k], index - self.starts[k]
+
+    def spawn_order(self):
+        """按生成顺序（实体编号升序）排列的整体下标列表"""
+        return np.argsort(self["entity"]).tolist()
+
+    def keep(self, mask):
+        """只保留 mask 为 True 的实体"""
+        for table, start, end in zip(self.tables, self.starts, self.starts[1:]):
+            table.keep(mask[start:end])
+
+    def remove(self, indices):
+        """批量移除指定整体下标的实体"""
+        if len(indices) == 0:
+            return
+        mask = np.ones(len(self), dtype=bool)
+        mask[indices] = False
+        self.keep(mask)
+
+    def clear(self):
+        """移除所有实体"""
+        for table in self.tables:
+            table.clear()
+
+
+class World:
+    """按原型管理实体表
+
+    components 为 {组件名: {列名: (dtype, 每行元素数)}}；add_archetype() 按组件名列表建表，
+    表的列为这些组件的列的并集。实体编号从 1 开始递增，不复用。
+    """
+
+    def __init__(self, components):
+        self.components = components
+        self.archetypes = {}
+        self.matches = {}  # 组件组合 -> 具有这些组件的表（建表后失效）
+        self.next_entity = 1
+
+    def add_archetype(self, name, components, capacity=64, max_capacity=None):
+        """按组件组合创建一张表（max_capacity 为这张表的实体数上限）"""
+        columns = {}
+        for component in components:
+            columns.update(self.components[component])
+        table = self.archetypes[name] = Archetype(name, components, columns, capacity, max_capacity)
+        self.matches.clear()
+        return table
+
+    def __len__(self):
+        return sum(len(table) for table in self.archetypes.values())
+
+    def __getitem__(self, name):
+        return self.archetypes[name]
+
+    def spawn(self, name, count=1, **values):
+        """在名为 name 的表中生成 count 个实体，返回实体编号数组（超过表的容量上限时为空数组）"""
+        entities = np.arange(self.next_entity, self.next_entity + count, dtype=np.int64)
+        if self.archetypes[name].append(count, entity=entities, **values) is None:
+            return entities[:0]
+        self.next_entity += count
+        return entities
+
+    def matching(self, *components):
+        """具有全部 components 的表（按创建顺序，包括空表）"""
+        tables = self.matches.get(components)
+        if tables is None:
+            tables = self.matches[components] = [table for table in self.archetypes.values()
+                                                 if table.has(*components)]
+        return tables
+
+    def query(self, *components):
+        """具有全部 components 的表（按创建顺序，跳过空表）"""
+        return [table for table in self.matching(*components) if table.count]
+
+    def select(self, *components):
+        """具有全部 components 的实体整体（包括空表，拼接出的列保持各列的形状和类型）"""
+        return Selection(self.matching(*components))
+
+    def locate(self, entity, name=None):
+        """实体所在的 (表, 行)，不存在时返回 (None, -1)；name 不为空时只在这张表中查找"""
+        tables = self.archetypes.values() if name is None else (self.archetypes[name],)
+        for table in tables:
+            row = table.row(entity) if table.count else -1
+            if row >= 0:
+                return table, row
+        return None, -1
+
+    def clear(self):
+        """移除所有实体"""
+        for table in self.archetypes.values():
+            table.clear()
+
+    def stats(self):
+        """各表的实体数、容量、扩容次数和槽位复用统计"""
+        return {name: dict(table.pool.stats(), count=table.count, capacity=table.capacity, resizes=table.resizes)
+                for name, table in self.archetypes.items()}
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+敌机原型
+小型侦察机、中型护卫舰、陨石和 Boss 是 ecs.World 中的四种原型：位置、速度、正弦路径、生命、碰撞、
+射击、外观和 Boss 弹幕作为组件按列存放。移动、射击、出界剔除和绘制由系统对整张表批量完成，
+敌机再多也只是每种类型几次数组运算，不再逐架调用 update()/draw()
+"""
+
+import math
+import random
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from bullets import HOSTILE_OWNER
+from ecs import World
+from motion import MOTION_IDS, MOTIONS, STRAIGHT, SWAY, advance
+from waves import BOSS
+
+
+RED = (255, 0, 0)
+
+# 原型名（与 levels.json 中的敌机类型一致）
+SMALL = "small"
+MEDIUM = "medium"
+METEOR = "meteor"
+
+# 普通敌机：参与碰撞，会飞出画面底部；Boss 只受炸弹伤害，直到被击败才移除
+FLEET = (SMALL, MEDIUM, METEOR)
+
+# 陨石外观：形状种子的数量，以及每个形状预渲染的旋转帧数
+METEOR_SHAPES = 16
+METEOR_FRAMES = 36
+
+# 组件 -> 列：{列名: (dtype, 每行元素数)}
+COMPONENTS = {
+    # 左上角、上一 tick 的左上角（插值绘制用）、宽高
+    "position": {"pos": (np.float64, 2), "prev": (np.float64, 2), "size": (np.int32, 2)},
+    "velocity": {"vel": (np.float64, 2)},
+    # 移动方式（motion.py 中的编号）及其参数、出场后的 tick 数、出生点
+    "motion": {"motion": (np.int32, 0), "params": (np.float64, 4), "phase": (np.int32, 0),
+               "origin": (np.float64, 2)},
+    "health": {"health": (np.int32, 0), "max_health": (np.int32, 0), "points": (np.int32, 0)},
+    # 与玩家子弹、玩家碰撞；ram_scores 为玩家撞毁时是否得分
+    "collider": {"ram_scores": (np.bool_, 0)},
+    # 冷却结束后发射（毫秒，模拟时钟）
+    "shooter": {"shoot_timer": (np.int64, 0), "shoot_interval": (np.int32, 0)},
+    # 外观编号（陨石为形状种子）、旋转角及每 tick 的旋转速度（度）
+    "renderable": {"sprite": (np.int32, 0), "rotation": (np.float64, 0), "spin": (np.float64, 0)},
+    # Boss 弹幕：攻击模式列表、当前模式及其开始时间、上次发射时间、本模式已发射的轮数
+    "barrage": {"patterns": (object, 0), "attack": (np.int32, 0), "attack_timer": (np.int64, 0),
+                "fire_timer": (np.int64, 0), "volley": (np.int32, 0)},
+}
+
+# 一种敌机：
+#   components  组件组合
+#   values      生成时各列的值；roll(rng) 返回每架不同的随机列值（没有时为 None）
+#   sprite      精灵缓存的键名；margin 为画布相对碰撞矩形的 (偏移x, 偏移y, 额外宽, 额外高)；
+#               paint(surface, x, y) 以 (x, y) 为左上角绘制；frames 不为 0 时按旋转角取图集中的帧
+#   shoot_chance / muzzles / bullet_speed  每 tick 尝试射击的概率、各发子弹相对炮口的横向偏移、子弹速度
+EnemyType = namedtuple("EnemyType", "components values roll sprite margin paint frames "
+                                    "shoot_chance muzzles bullet_speed")
+
+
+def paint_small_scout(screen, x, y, width=30, height=25):
+    """绘制侦察机"""
+    # 主体
+    pygame.draw.polygon(screen, (255, 50, 50), [
+        (x + width // 2, y),
+        (x, y + height),
+        (x + width, y + height)
+    ])
+
+    # 机翼
+    pygame.draw.line(screen, (200, 50, 50),
+                    (x, y + 10), (x - 10, y + 15), 2)
+    pygame.draw.line(screen, (200, 50, 50),
+                    (x + width, y + 10), (x + width + 10, y + 15), 2)
+
+    # 驾驶舱
+    pygame.draw.circle(screen, (255, 255, 255),
+                      (x + width // 2, y + 8), 3)
+
+
+def paint_medium_frigate(screen, x, y, width=50, height=40):
+    """绘制护卫舰"""
+    # 主体
+    pygame.draw.rect(screen, (50, 100, 255),
+                   (x, y, width, height))
+
+    # 船头
+    pygame.draw.polygon(screen, (50, 100, 255), [
+        (x + width // 2, y),
+        (x + 10, y + 10),
+        (x + width - 10, y + 10)
+    ])
+
+    # 武器
+    pygame.draw.rect(screen, (100, 100, 100),
+                   (x + 10, y + 20, 8, 15))
+    pygame.draw.rect(screen, (100, 100, 100),
+                   (x + width - 18, y + 20, 8, 15))
+
+    # 装甲板
+    pygame.draw.rect(screen, (80, 80, 80),
+                   (x + 5, y + 5, width - 10, 5))
+    pygame.draw.rect(screen, (80, 80, 80),
+                   (x + 5, y + 15, width - 10, 5))
+
+
+def paint_boss(screen, x, y, width=200, height=150):
+    """绘制Boss"""
+    # Boss主体
+    pygame.draw.rect(screen, (150, 50, 255),
+                   (x, y, width, height))
+
+    # 头部
+    pygame.draw.rect(screen, (200, 100, 255),
+                   (x + 30, y, width - 60, 40))
+
+    # 武器炮台
+    pygame.draw.rect(screen, (100, 100, 100),
+                   (x + 50, y + 60, 20, 30))
+    pygame.draw.rect(screen, (100, 100, 100),
+                   (x + width - 70, y + 60, 20, 30))
+    pygame.draw.rect(screen, (100, 100, 100),
+                   (x + width // 2 - 10, y + 80, 20, 40))
+
+    # 发光核心
+    pygame.draw.circle(screen, (255, 100, 100),
+                      (x + width // 2, y + height // 2), 20)
+    pygame.draw.circle(screen, (255, 200, 200),
+                      (x + width // 2, y + height // 2), 10)
+
+    # 装饰
+    for i in range(5):
+        pygame.draw.rect(screen, (100, 50, 200),
+                       (x + 10 + i * 38, y + 30, 20, 5))
+
+
+class MeteorShape:
+    """一个形状种子对应的陨石外观：尺寸、多边形顶点和陨坑纹理（坐标相对中心）
+
+    同一种子的陨石共用一套旋转帧图集。
+    """
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.seed = seed
+        self.width = rng.randint(25, 45)
+        self.height = rng.randint(25, 45)
+        self.points = self.generate_random_shape(rng)
+        self.craters = self.generate_craters(rng)
+        self.frame_size = 2 * self.frame_radius() + 1
+
+    def generate_random_shape(self, rng):
+        """生成随机形状（顶点相对中心）"""
+        points = []
+        sides = rng.randint(5, 8)
+
+        for i in range(sides):
+            angle = (i / sides) * math.pi * 2
+            radius = rng.randint(self.width // 2 - 5, self.width // 2 + 5)
+            x = radius * math.cos(angle)
+            y = radius * math.sin(angle)
+            points.append((x, y))
+
+        return points
+
+    def generate_craters(self, rng):
+        """生成陨坑纹理 (中心x, 中心y, 半径)，坐标相对中心，随陨石一起旋转"""
+        craters = []
+        for _ in range(3):
+            tx = rng.randint(5, self.width - 10) - self.width // 2
+            ty = rng.randint(5, self.height - 10) - self.height // 2
+            craters.append((tx, ty, rng.randint(2, 5)))
+        return craters
+
+    def frame_radius(self):
+        """旋转帧画布的半径（能容纳任意角度的形状和陨坑）"""
+        extent = max(math.hypot(px, py) for px, py in self.points)
+        for tx, ty, radius in self.craters:
+            extent = max(extent, math.hypot(tx, ty) + radius)
+        return int(math.ceil(extent)) + 1
+
+    def paint_atlas(self, surface, x, y):
+        """把所有旋转帧横向排列绘制到图集上"""
+        size = surface.get_height()
+        for frame in range(METEOR_FRAMES):
+            self.paint(surface, x + frame * size + size // 2, y + size // 2, frame * 360 / METEOR_FRAMES)
+
+    def paint(self, screen, center_x, center_y, rotation):
+        """以 (center_x, center_y) 为中心、按 rotation 度旋转绘制陨石"""
+        cos_r = math.cos(math.radians(rotation))
+        sin_r = math.sin(math.radians(rotation))
+
+        # 旋转并绘制多边形
+        rotated_points = [(center_x + px * cos_r - py * sin_r, center_y + px * sin_r + py * cos_r)
+                          for px, py in self.points]
+        pygame.draw.polygon(screen, (100, 100, 100), rotated_points)
+
+        # 陨坑纹理
+        for tx, ty, radius in self.craters:
+            pygame.draw.circle(screen, (80, 80, 80),
+                              (center_x + tx * cos_r - ty * sin_r, center_y + tx * sin_r + ty * cos_r), radius)
+
+
+METEOR_SHAPE_TABLE = [MeteorShape(seed) for seed in range(METEOR_SHAPES)]
+
+
+def roll_meteor(rng):
+    """陨石的随机外观、下落速度和旋转速度"""
+    shape = METEOR_SHAPE_TABLE[rng.randrange(METEOR_SHAPES)]
+    speed = rng.uniform(1, 3)
+    return {"sprite": shape.seed, "size": (shape.width, shape.height), "vel": (0, speed),
+            "spin": rng.uniform(-1, 1)}
+
+
+ENEMY_TYPES = {
+    SMALL: EnemyType(
+        ("position", "velocity", "motion", "health", "collider", "shooter", "renderable"),
+        {"size": (30, 25), "vel": (0, 4), "motion": SWAY, "params": MOTIONS[SWAY].params, "health": 1, "points": 100,
+         "ram_scores": True, "shoot_interval": 1500},
+        None, "SmallScout", (-11, 0, 23, 1), paint_small_scout, 0, 0.01, (0,), 5),
+    MEDIUM: EnemyType(
+        ("position", "velocity", "motion", "health", "collider", "shooter", "renderable"),
+        {"size": (50, 40), "vel": (0, 2), "motion": STRAIGHT, "health": 3, "points": 300, "ram_scores": True,
+         "shoot_interval": 800},
+        None, "MediumFrigate", (0, 0, 1, 1), paint_medium_frigate, 0, 1.0, (-10, 0, 10), 6),
+    METEOR: EnemyType(
+        ("position", "velocity", "motion", "health", "collider", "renderable"),
+        {"motion": STRAIGHT, "health": 1, "points": 150, "ram_scores": False},
+        roll_meteor, "Meteor", None, None, METEOR_FRAMES, 0.0, (), 0),
+    BOSS: EnemyType(
+        ("position", "velocity", "motion", "health", "renderable", "barrage"),
+        {"size": (200, 150), "vel": (0, 2), "motion": SWAY, "params": (0.01, 50, 0, 0), "points": 1000},
+        None, "Boss", (0, 0, 1, 1), paint_boss, 0, 0.0, (), 0),
+}
+
+
+class EnemyWorld(World):
+    """所有敌机（含 Boss）的实体表与系统
+
+    每个 tick 依次调用 move()、shoot()、barrage()、cull()；碰撞检测通过 select("collider")
+    取得参与碰撞的全部敌机，读写拼接后的列。limits 为 {类型名: 同时存在的数量上限}，未列出的类型不限。
+    """
+
+    def __init__(self, types=ENEMY_TYPES, capacity=16, limits=None):
+        super().__init__(COMPONENTS)
+        self.types = types
+        self.mixed = set()  # 可能混有多种移动方式的表（移动时才分组）
+        limits = limits or {}
+        for name, kind in types.items():
+            self.add_archetype(name, kind.components, capacity, limits.get(name))
+
+    def spawn(self, name, x, y, rng=random, **values):
+        """在 (x, y) 生成一架 name 类型的敌机，返回实体编号（该类型已达数量上限时不生成，返回 None）
+
+        rng 为陨石外观等随机属性使用的随机数流，values 覆盖类型给出的列值；
+        motion 可以给移动方式的名字（None 为类型的默认移动），没有同时给出 params 时使用该方式的默认参数。
+        """
+        kind = self.types[name]
+        columns = dict(kind.values)
+        if kind.roll is not None:
+            columns.update(kind.roll(rng))
+        if values.get("motion", 0) is None:
+            del values["motion"]
+        elif isinstance(values.get("motion"), str):
+            values["motion"] = MOTION_IDS[values["motion"]]
+            values.setdefault("params", MOTIONS[values["motion"]].params)
+        columns.update(values)
+        columns.setdefault("max_health", columns.get("health", 0))
+        table = self.archetypes[name]
+        if table.has("motion") and table.count and table.motion[0] != columns["motion"]:
+            self.mixed.add(name)
+        entities = super().spawn(name, pos=(x, y), prev=(x, y), origin=(x, y), **columns)
+        return int(entities[0]) if len(entities) else None
+
+    def move(self):
+        """移动系统：记录上一 tick 的位置，按各实体的移动方式分组推进（见 motion.py），并推进旋转角"""
+        for table in self.query("position", "velocity"):
+            table["prev"][:] = table["pos"]
+            if table.has("motion"):
+                if not advance(table, table.name in self.mixed):
+                    self.mixed.discard(table.name)
+            else:
+                table["pos"][:] += table["vel"]
+            if table.has("renderable"):
+                table["rotation"][:] += table["spin"]
+
+    def shoot(self, now, bullets, rng):
+        """射击系统：冷却结束（并按概率决定开火）的敌机发射一排子弹，每种类型一次写进子弹引擎
+
+        rng 为 numpy 随机数生成器，每个 tick 为每架按概率射击的敌机抽一个数。
+        """
+        for table in self.query("shooter"):
+            kind = self.types[table.name]
+            ready = now - table["shoot_timer"] > table["shoot_interval"]
+            if kind.shoot_chance < 1:
+                ready &= rng.random(len(table)) < kind.shoot_chance
+            rows = np.flatnonzero(ready)
+            if not len(rows):
+                continue
+
+            table.shoot_timer[rows] = now
+            pos = table.pos[rows]
+            size = table.size[rows]
+            muzzles = np.asarray(kind.muzzles)
+            x = (pos[:, 0] + size[:, 0] // 2 - 2)[:, None] + muzzles
+            y = np.repeat(pos[:, 1] + size[:, 1], len(muzzles))
+            bullets.spawn(x.ravel(), y, 0, kind.bullet_speed, 4, 8, RED, 1, HOSTILE_OWNER)
+
+    def barrage(self, now, bullets, target):
+        """Boss 弹幕系统：按当前攻击模式的间隔发射一整轮
+
+        target 为玩家中心，自机狙朝它瞄准。Boss 通常只有一架，这里逐行处理。
+        """
+        table = self.archetypes[BOSS]
+        for row in range(len(table)):
+            pattern = table.patterns[row][table.attack[row]]
+            if now - table.fire_timer[row] > pattern.interval:
+                (left, top), (width, height) = table.pos[row].tolist(), table.size[row].tolist()
+                x = left + width // 2 - 2
+                y = top + height
+                aim = math.atan2(target[0] - x, target[1] - y) if pattern.emitter.aimed else 0.0
+                pattern.emitter.fire(bullets, x, y, int(table.volley[row]), pattern, aim)
+                table.volley[row] += 1
+                table.fire_timer[row] = now
+
+    def attack_pattern(self, entity):
+        """Boss 当前的攻击模式"""
+        table, row = self.locate(entity, BOSS)
+        return table.patterns[row][table.attack[row]]
+
+    def rotate_attack(self, entity, now):
+        """Boss 轮换到下一种攻击模式（每种持续 pattern.duration 毫秒，由游戏的定时器调用），返回新模式"""
+        table, row = self.locate(entity, BOSS)
+        table.attack[row] = (table.attack[row] + 1) % len(table.patterns[row])
+        table.attack_timer[row] = now
+        table.volley[row] = 0
+        return table.patterns[row][table.attack[row]]
+
+    def cull(self, bottom):
+        """剔除系统：移除飞出画面底部的普通敌机"""
+        for table in self.query("collider"):
+            table.keep(table["pos"][:, 1] <= bottom)
+
+    def draw(self, screen, sprites, alpha=1.0, names=None):
+        """绘制系统：每种类型取一次精灵（陨石按形状和旋转帧取图集区域），一次 blits() 画完
+
+        names 为要绘制的类型（默认全部）；返回绘制区域列表。
+        """
+        rects = []
+        for table in self.query("renderable"):
+            if names is not None and table.name not in names:
+                continue
+            kind = self.types[table.name]
+            pos = table["pos"]
+            if alpha < 1:
+                prev = table["prev"]
+                pos = prev + (pos - prev) * alpha
+
+            if not kind.frames:
+                offset_x, offset_y, pad_w, pad_h = kind.margin
+                width, height = kind.values["size"]
+                surface, offset = sprites.get((kind.sprite,), (width + pad_w, height + pad_h), (offset_x, offset_y),
+                                              kind.paint)
+                rects += screen.blits([(surface, dest) for dest in (pos + offset).tolist()])
+                continue
+
+            frames = np.round(table["rotation"] * kind.frames / 360).astype(np.int64) % kind.frames
+            blits = []
+            for seed, frame, (x, y), (width, height) in zip(table["sprite"].tolist(), frames.tolist(),
+                                                            pos.tolist(), table["size"].tolist()):
+                shape = METEOR_SHAPE_TABLE[seed]
+                size = shape.frame_size
+                atlas, _ = sprites.get((kind.sprite, seed), (size * kind.frames, size), (0, 0), shape.paint_atlas,
+                                       opaque=True)
+                blits.append((atlas, (x + width // 2 - size // 2, y + height // 2 - size // 2),
+                               (frame * size, 0, size, size)))
+            rects += screen.blits(blits)
+        return rects
+
+    @staticmethod
+    def rects(fleet):
+        """整体中各实体的碰撞矩形（pygame.Rect 列表，下标与整体一致）"""
+        boxes = np.hstack((fleet["pos"].astype(np.int32), fleet["size"])).tolist()
+        return [pygame.Rect(box) for box in boxes]
+
+    @staticmethod
+    def centers(fleet):
+        """整体中各实体的中心（爆炸位置）"""
+        return fleet["pos"] + fleet["size"] // 2
+
+    @staticmethod
+    def center_of(table, row):
+        """表中某一行的中心 [x, y]"""
+        return (table.pos[row] + table.size[row] // 2).tolist()
+
+    def center(self, entity, name=None):
+        """某个实体的中心 [x, y]"""
+        return self.center_of(*self.locate(entity, name))
+
+    def snapshot(self):
+        """各敌机的 (类型, x, y, 生命值)，按表顺序（比较两局是否一致用）"""
+        return [(table.name, x, y, health) for table in self.query("position")
+                for (x, y), health in zip(table["pos"].tolist(), table["health"].tolist())]
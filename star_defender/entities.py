@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+实体容器
+替代 list[:] 拷贝 + list.remove 的写法：删除只做标记（O(1)），
+统一在帧末压缩，迭代过程中可以安全地删除任意元素
+"""
+
+
+class EntityList:
+    """标记删除、帧末压缩的实体容器
+
+    - remove() 只把元素所在槽位标记为失效，不移动其他元素，保持原有顺序
+    - 迭代时跳过已失效的元素；迭代中新追加的元素不会在本轮被访问
+    - compact() 一次性清理失效槽位，由游戏在每帧末调用
+
+    元素在容器中的槽位记录在其 _entity_slot 属性上，
+    因此同一对象同一时刻只能位于一个 EntityList 中。
+    """
+
+    def __init__(self):
+        self.items = []
+        self.alive = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        items = self.items
+        alive = self.alive
+        for i in range(len(items)):
+            if alive[i]:
+                yield items[i]
+
+    def append(self, obj):
+        """追加元素"""
+        obj._entity_slot = len(self.items)
+        self.items.append(obj)
+        self.alive.append(True)
+        self.count += 1
+
+    def remove(self, obj):
+        """标记删除（O(1)），重复删除会被忽略"""
+        slot = obj._entity_slot
+        if slot < len(self.items) and self.items[slot] is obj and self.alive[slot]:
+            self.alive[slot] = False
+            self.count -= 1
+
+    def clear(self):
+        """清空容器"""
+        self.items.clear()
+        self.alive.clear()
+        self.count = 0
+
+    def compact(self):
+        """清理失效槽位"""
+        if self.count == len(self.items):
+            return
+
+        items = [obj for obj, alive in zip(self.items, self.alive) if alive]
+        for slot, obj in enumerate(items):
+            obj._entity_slot = slot
+        self.items = items
+        self.alive = [True] * len(items)
+
+    def live(self):
+        """压缩后返回内部列表（只读），下标可配合 remove() 使用直到下次压缩"""
+        self.compact()
+        return self.items
@@ -8,10 +8,36 @@
 
 import pygame
 import sys
+import time
 import random
 import math
+from collections import namedtuple
 
-# 初始化Pygame
+import numpy as np
+
+from assets import AssetManager
+from audio import AudioMixer
+from bullets import BulletEngine, PLAYER_OWNER, HOSTILE_OWNER
+from controls import AutoPilot, MouseControls, IDLE
+from enemies import FLEET, EnemyWorld
+from entities import EntityList
+from music import MusicPlayer
+from particles import ParticleSystem
+from profiler import FrameProfiler
+from render import DirtyRectRenderer
+from replay import Replay
+from rng import RandomStreams
+from spatial_hash import SpatialHash
+from starfield import Starfield
+from sprites import SpriteCache
+from surfaces import SurfaceManager
+from text import HudLayer, TextCache
+from timers import TimerQueue
+from timestep import FixedTimestep
+from waves import BOSS, WaveScheduler, load_levels
+
+# 初始化Pygame（较小的混音缓冲区降低音效延迟）
+pygame.mixer.pre_init(44100, -16, 2, 512)
 pygame.init()
 
 # 游戏常量
@@ -19,6 +45,26 @@ SCREEN_WIDTH = 480
 SCREEN_HEIGHT = 800
 FPS = 60
 
+# 模拟频率（tick/秒），与渲染帧率无关。
+# 所有速度以“像素/tick”为单位，计时器使用模拟时钟 game.get_ticks()
+TICK_RATE = 60
+MAX_TICKS_PER_FRAME = 5  # 渲染跟不上时单帧最多补跑的 tick 数
+
+# 数值平衡参数：敌人生成间隔（毫秒）随关卡递减到下限，Boss 生命值按关卡指数增长
+Balance = namedtuple("Balance", "spawn_interval spawn_interval_step spawn_interval_min "
+                                "boss_base_health boss_health_growth")
+DEFAULT_BALANCE = Balance(spawn_interval=1000, spawn_interval_step=100, spawn_interval_min=300,
+                          boss_base_health=40, boss_health_growth=1.15)
+
+# 道具生成：类型 -> (最小间隔毫秒, 间隔过后每 tick 的生成概率)，按此顺序抽取随机数
+POWER_UP_SPAWNS = {
+    "bullet": (5000, 0.02),  # 子弹增强
+    "bomb": (7000, 0.01),    # 全屏轰炸
+}
+
+# 无头模拟单局的默认 tick 上限（1 小时模拟时间），防止无法结束的对局一直运行
+HEADLESS_MAX_TICKS = TICK_RATE * 3600
+
 # 颜色定义
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -29,6 +75,13 @@ YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 CYAN = (0, 255, 255)
 
+# 背景底色
+BACKGROUND_COLOR = (0, 0, 20)
+
+# 背景星星数量与视差层数（星星预渲染进各层贴图，数量不影响每帧开销）
+STAR_COUNT = 100
+STAR_LAYERS = 3
+
 # 游戏状态
 START_MENU = 0
 GAME_PLAYING = 1
@@ -36,15 +89,79 @@ GAME_PAUSED = 2
 GAME_OVER = 3
 GAME_WON = 4
 
+# 子弹碰撞矩形的最大宽高，用于空间哈希的单格查询
+BULLET_REACH = (8, 16)
+
+# 各类实体同时存在的数量上限（超出时新生成的一批直接丢弃，见 pools.py）；Boss 不限
+POOL_LIMITS = {"bullets": 8192, "particles": 16384, **dict.fromkeys(FLEET, 1024)}
+
+# 预渲染精灵缓存（所有游戏实例共享）
+SPRITE_CACHE = SpriteCache()
+
+# 遮罩、发光层、粒子圆盘等共享 Surface（所有游戏实例共享）
+SURFACES = SurfaceManager()
+
+def lerp(previous, current, alpha):
+    """插值绘制位置，alpha 为 1 时直接使用当前位置"""
+    if alpha >= 1:
+        return current
+    return previous + (current - previous) * alpha
+
+
 class StarDefender:
     """游戏主类"""
     
-    def __init__(self):
-        # 设置屏幕
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("星际捍卫者于闻言")
+    def __init__(self, dirty_rects=False, interpolate=False, headless=False, controls=None,
+                 time_source=time.perf_counter, balance=DEFAULT_BALANCE, seed=None, record_path=None,
+                 profile=False, trace_path=None, levels=None):
+        # 设置屏幕（无头模式不打开窗口，画到离屏 Surface 上）
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("星际捍卫者于闻言")
         self.clock = pygame.time.Clock()
         
+        # 固定步长模拟：sim_ticks 为已运行的 tick 数，get_ticks() 由它换算
+        self.timestep = FixedTimestep(TICK_RATE, MAX_TICKS_PER_FRAME)
+        self.sim_ticks = 0
+        self.timers = TimerQueue()  # 按模拟时钟触发的回调（射击冷却、无敌、道具、Boss 攻击轮换）
+        self.interpolate = interpolate  # 渲染时在上一 tick 与当前 tick 之间插值
+        self.time_source = time_source  # run() 读取真实时间（秒）的时钟，可注入
+        
+        # 输入源：窗口模式读取鼠标，无头模式默认自动驾驶；每个 tick 读取一次
+        self.controls = controls or (AutoPilot() if headless else MouseControls())
+        self.control = IDLE
+        
+        # 数值平衡参数（批量模拟时按配置替换）
+        self.balance = balance
+        
+        # 随机数：由游戏种子派生、按子系统拆分的随机数流；每局开始时重新播种（见 reset_game）
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.round_seeds = random.Random(self.seed)  # 重新开始时为新一局派生种子
+        self.round_seed = None
+        self.rng = RandomStreams(self.seed)
+        self.spawn_random = self.rng.stream("spawn")    # 敌人和道具的生成
+        self.enemy_random = self.rng.stream("enemies")  # 陨石外观
+        self.enemy_generator = self.rng.generator("enemies")  # 敌机射击（每 tick 按表批量抽取）
+        
+        # 输入录制：record_path 不为空时记录每局的逐 tick 输入，结束时写入回放文件
+        self.record_path = record_path
+        self.replay = None
+        
+        # 资源、音效与背景音乐（无头模式不发声）
+        self.assets = AssetManager()
+        self.audio = AudioMixer(self.assets, enabled=not headless)
+        self.music = MusicPlayer(self.assets, enabled=not headless)
+        
+        # 帧分析器：按阶段计时，F3 开关性能浮层；trace_path 不为空时退出时导出 Chrome trace
+        self.profiler = FrameProfiler(enabled=profile or bool(trace_path), trace_path=trace_path)
+        
+        # 渲染器（dirty_rects=True 时只推送变化的区域；无头模式只画到离屏 Surface，不推送）
+        self.renderer = DirtyRectRenderer(self.screen, BACKGROUND_COLOR, enabled=dirty_rects, present=not headless)
+        self.drawn_state = None
+        
         # 游戏状态
         self.game_state = START_MENU
         self.score = 0
@@ -54,30 +171,39 @@ class StarDefender:
         # 玩家
         self.player = Player(self)
         
+        # 共享 Surface（遮罩、发光层、粒子圆盘）
+        self.surfaces = SURFACES
+        
         # 游戏对象列表
-        self.bullets = []
-        self.enemies = []
-        self.particles = []
-        self.power_ups = []
+        self.bullets = BulletEngine(surfaces=self.surfaces, max_capacity=POOL_LIMITS["bullets"])  # 玩家与敌方子弹
+        self.enemies = EnemyWorld(limits=POOL_LIMITS)  # 普通敌机与 Boss（ECS 原型表）
+        self.particles = ParticleSystem(rng=self.rng.generator("effects"), surfaces=self.surfaces,
+                                        max_capacity=POOL_LIMITS["particles"])
+        self.power_ups = EntityList()
         
-        # 对象池
-        self.bullet_pool = []
-        self.enemy_pool = []
+        # 波次调度：关卡定义（默认读取 levels.json）每关编译成出场时间线
+        self.waves = WaveScheduler(levels or load_levels(), self.enemies, TICK_RATE, SCREEN_WIDTH)
         
-        # 道具系统
+        # 精灵缓存
+        self.sprites = SPRITE_CACHE
+        
+        # 碰撞检测用的空间哈希
+        self.enemy_grid = SpatialHash()
+        
+        # 道具系统（power_up_ready 为各类道具的最小生成间隔是否已过，由定时器置位）
         self.bomb_count = 3
-        self.last_bullet_power_up = 0
-        self.last_bomb_power_up = 0
+        self.power_up_ready = dict.fromkeys(POWER_UP_SPAWNS, False)
         self.bullet_power_up_active = False
         self.bullet_power_up_time = 0
         self.bullet_power_up_duration = 5000  # 5秒
+        self.bullet_power_up_timer = None
         
-        # Boss相关
+        # Boss相关（boss 为 Boss 的实体编号）
         self.boss = None
         self.boss_spawned = False
         
         # 背景
-        self.background = Background()
+        self.background = Background(rng=self.rng.stream("background"))
         
         # 字体 - 使用系统自带的中文字体
         try:
@@ -99,30 +225,134 @@ class StarDefender:
                 self.font_medium = pygame.font.Font(None, 36)
                 self.font_large = pygame.font.Font(None, 48)
         
+        # 文字渲染缓存与 HUD 图层
+        self.text = TextCache()
+        self.hud = HudLayer((SCREEN_WIDTH, 110), self.paint_hud)
+        
         # 游戏计时器
-        self.game_timer = pygame.time.get_ticks()
-        self.enemy_spawn_timer = 0
-        self.enemy_spawn_interval = 1000  # 初始1秒生成一个敌人
+        self.game_timer = self.get_ticks()
+        
+        # Boss 击杀用时（tick），供批量模拟统计
+        self.boss_spawn_tick = 0
+        self.boss_kill_ticks = []
+    
+    def spawn_interval(self, level):
+        """某一关的敌人生成间隔（毫秒）"""
+        balance = self.balance
+        return max(balance.spawn_interval_min, balance.spawn_interval - (level - 1) * balance.spawn_interval_step)
+    
+    def start_level(self, level):
+        """编译第 level 关的出场时间线，从当前 tick 开始"""
+        self.waves.start_level(level, self.sim_ticks, self.spawn_random, self.spawn_interval(level))
+    
+    def get_ticks(self):
+        """模拟时钟（毫秒），只随 update() 推进，暂停期间不走"""
+        return self.sim_ticks * 1000 // TICK_RATE
+    
+    def advance(self, elapsed):
+        """按经过的真实时间（秒）运行相应数量的模拟 tick，返回绘制用的插值比例"""
+        for _ in range(self.timestep.advance(elapsed)):
+            if self.game_state == GAME_PLAYING:
+                self.update()
+        
+        return self.timestep.alpha if self.interpolate else 1.0
+    
+    @classmethod
+    def from_replay(cls, replay, **options):
+        """按回放记录创建并开始一局：同样的种子、起始 tick 和逐 tick 输入"""
+        game = cls(seed=replay.seed, controls=replay.controls(), **options)
+        game.sim_ticks = replay.start_tick
+        game.start_game()
+        return game
+    
+    def entity_counts(self):
+        """当前各类实体的数量（性能浮层和 trace 使用）"""
+        return {"enemies": len(self.enemies), "bullets": len(self.bullets),
+                "particles": len(self.particles), "power_ups": len(self.power_ups)}
+    
+    def quit(self):
+        """保存回放和性能 trace 后退出"""
+        self.save_replay()
+        self.profiler.save_trace()
+        pygame.quit()
+        sys.exit()
+    
+    def save_replay(self):
+        """把当前一局的输入写入回放文件（未开启录制时什么都不做）"""
+        if self.record_path and self.replay is not None:
+            self.replay.save(self.record_path)
     
     def run(self):
-        """游戏主循环"""
+        """游戏主循环：模拟按固定步长推进，渲染按实际帧率进行"""
+        profiler = self.profiler
+        previous = self.time_source()
         while True:
+            profiler.begin_frame()
             self.handle_events()
+            profiler.lap("events")
             
-            if self.game_state == GAME_PLAYING:
-                self.update()
+            now = self.time_source()
+            alpha = self.advance(now - previous)
+            previous = now
             
-            self.draw()
+            self.audio.end_frame(self.get_ticks())
+            profiler.lap("audio")
+            
+            self.draw(alpha)
             self.clock.tick(FPS)
+            profiler.lap("idle")
+            profiler.end_frame(self.entity_counts)
+    
+    def simulate(self, max_ticks=HEADLESS_MAX_TICKS):
+        """无头模拟：不处理事件也不绘制，连续运行 tick 直到游戏结束、胜利或达到 max_ticks
+
+        返回这一局的结果统计
+        """
+        if self.game_state != GAME_PLAYING:
+            self.start_game()
+        
+        start_ticks = self.sim_ticks
+        peak_enemies = peak_bullets = peak_particles = 0
+        profiler = self.profiler
+        start = time.perf_counter()
+        while self.game_state == GAME_PLAYING and self.sim_ticks - start_ticks < max_ticks:
+            profiler.begin_frame()
+            self.update()
+            profiler.end_frame(self.entity_counts)
+            peak_enemies = max(peak_enemies, len(self.enemies))
+            peak_bullets = max(peak_bullets, len(self.bullets))
+            peak_particles = max(peak_particles, len(self.particles))
+        wall_seconds = time.perf_counter() - start
+        
+        ticks = self.sim_ticks - start_ticks
+        outcome = {GAME_WON: "won", GAME_OVER: "over"}.get(self.game_state, "timeout")
+        return {
+            "outcome": outcome,
+            "score": self.score,
+            "level": self.level,
+            "lives": self.player.lives,
+            "deaths": self.player.max_lives - self.player.lives,
+            "boss_kill_ticks": list(self.boss_kill_ticks),
+            "peak_enemies": peak_enemies,
+            "peak_bullets": peak_bullets,
+            "peak_particles": peak_particles,
+            "ticks": ticks,
+            "sim_seconds": ticks / TICK_RATE,
+            "wall_seconds": wall_seconds,
+            "ticks_per_second": ticks / wall_seconds if wall_seconds else 0.0,
+        }
     
     def handle_events(self):
         """处理事件"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
             
             if event.type == pygame.KEYDOWN:
+                # 任何状态下 F3 开关性能浮层（导出 trace 时不影响记录）
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                
                 # 游戏菜单
                 if self.game_state == START_MENU:
                     if event.key == pygame.K_SPACE:
@@ -133,7 +363,7 @@ class StarDefender:
                     if event.key == pygame.K_p or event.key == pygame.K_ESCAPE:
                         self.pause_game()
                     elif event.key == pygame.K_b:
-                        self.use_bomb()
+                        self.controls.request_bomb()
                 
                 # 暂停菜单
                 elif self.game_state == GAME_PAUSED:
@@ -147,8 +377,7 @@ class StarDefender:
                     if event.key == pygame.K_r:
                         self.restart_game()
                     elif event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit()
             
             # 鼠标事件（用于触屏）
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -159,7 +388,7 @@ class StarDefender:
                     # 检查是否点击了炸弹按钮
                     bomb_rect = pygame.Rect(SCREEN_WIDTH - 60, 10, 50, 50)
                     if bomb_rect.collidepoint(mouse_pos):
-                        self.use_bomb()
+                        self.controls.request_bomb()
     
     def start_game(self):
         """开始游戏"""
@@ -181,126 +410,169 @@ class StarDefender:
     
     def reset_game(self):
         """重置游戏状态"""
+        # 重新播种：第一局沿用游戏种子，之后每局派生新种子；回放只需记录本局种子和起始 tick
+        if self.round_seed is None:
+            self.round_seed = self.seed
+        else:
+            self.round_seed = self.round_seeds.randrange(2 ** 32)
+            self.rng.reseed(self.round_seed)
+        if self.record_path:
+            self.replay = Replay(self.round_seed, self.sim_ticks)
+        
         self.score = 0
         self.level = 1
+        self.timers.reset(self.get_ticks())  # 丢弃上一局的定时器
+        self.timestep.reset()  # 不把上一局剩余的累加时间带进新一局
         self.player.reset()
         
-        # 清空对象
+        # 清空对象（包括Boss）
         self.bullets.clear()
         self.enemies.clear()
         self.particles.clear()
         self.power_ups.clear()
         
-        # 重置道具
+        # 重置道具（生成间隔从时钟 0 起算）
         self.bomb_count = 3
         self.bullet_power_up_active = False
         self.bullet_power_up_time = 0
-        self.last_bullet_power_up = 0
-        self.last_bomb_power_up = 0
+        self.bullet_power_up_timer = None
+        for power_type, (interval, _) in POWER_UP_SPAWNS.items():
+            self.power_up_ready[power_type] = False
+            self.timers.at(interval, self.allow_power_up, power_type)
         
         # 重置Boss
         self.boss = None
         self.boss_spawned = False
         
-        # 重置计时器
-        self.game_timer = pygame.time.get_ticks()
-        self.enemy_spawn_timer = 0
-        self.enemy_spawn_interval = 1000
+        # 重置计时器和第一关的时间线
+        self.game_timer = self.get_ticks()
+        self.boss_kill_ticks = []
+        self.start_level(1)
     
     def update(self):
-        """更新游戏状态"""
-        current_time = pygame.time.get_ticks()
+        """推进一个 tick"""
+        self.sim_ticks += 1
+        current_time = self.get_ticks()
+        
+        lap = self.profiler.lap
+        
+        # 触发到期的定时器
+        self.timers.advance(current_time)
+        lap("timers")
         
         # 更新背景
         self.background.update()
+        lap("background")
+        
+        # 读取这个 tick 的输入
+        self.control = self.controls.poll(self)
+        if self.replay is not None:
+            self.replay.append(self.control)
+        if self.control.bomb:
+            self.use_bomb()
+        lap("input")
         
         # 更新玩家
+        self.player.prev_x = self.player.x
         self.player.update()
         
         # 检查玩家是否死亡
         if self.player.lives <= 0:
             self.game_over()
+        lap("player")
         
         # 更新子弹
-        for bullet in self.bullets[:]:
-            bullet.update()
-            if bullet.y < 0:
-                self.bullets.remove(bullet)
+        self.bullets.update(SCREEN_WIDTH, SCREEN_HEIGHT)
+        lap("bullets")
         
-        # 更新敌人
-        for enemy in self.enemies[:]:
-            enemy.update()
-            if enemy.y > SCREEN_HEIGHT:
-                self.enemies.remove(enemy)
+        # 更新敌人（各系统按组件整表处理，Boss 也在这里移动）
+        enemies = self.enemies
+        enemies.move()
+        enemies.shoot(current_time, self.bullets, self.enemy_generator)
+        enemies.cull(SCREEN_HEIGHT)
+        lap("enemies")
         
         # 更新粒子效果
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
+        self.particles.update()
+        lap("particles")
         
         # 更新道具
-        for power_up in self.power_ups[:]:
+        for power_up in self.power_ups:
+            power_up.prev_y = power_up.y
             power_up.update()
             if power_up.y > SCREEN_HEIGHT:
                 self.power_ups.remove(power_up)
+        lap("power_ups")
         
-        # 生成敌人
+        # 按时间线生成敌人和Boss
         self.spawn_enemies()
         
         # 生成道具
         self.spawn_power_ups()
+        lap("spawns")
         
         # 检查碰撞
         self.check_collisions()
+        lap("collisions")
         
-        # 检查Boss生成条件
-        if not self.boss_spawned and self.enemy_spawn_timer > 30000:  # 30秒后生成Boss
-            self.spawn_boss()
-        
-        # 更新Boss
+        # Boss弹幕
         if self.boss and self.boss_spawned:
-            self.boss.update()
-            if self.boss.health <= 0:
+            player = self.player
+            enemies.barrage(current_time, self.bullets,
+                            (player.x + player.width / 2, player.y + player.height / 2))
+            bosses, row = enemies.locate(self.boss, BOSS)
+            if bosses.health[row] <= 0:
                 self.boss_defeated()
+        lap("boss")
         
-        # 更新子弹增强效果
-        if self.bullet_power_up_active:
-            if current_time - self.bullet_power_up_time > self.bullet_power_up_duration:
-                self.bullet_power_up_active = False
+        # 帧末统一清理已删除的实体
+        self.compact_entities()
+        lap("cleanup")
+    
+    def compact_entities(self):
+        """压缩所有实体容器（敌机表移除时即时压缩）"""
+        self.power_ups.compact()
     
-    def draw(self):
-        """绘制游戏画面"""
-        self.background.draw(self.screen)
+    def draw(self, alpha=1.0):
+        """绘制游戏画面
+
+        alpha 为插值比例：实体绘制在上一 tick 与当前 tick 的位置之间，1 表示当前位置
+        """
+        # 菜单遮罩覆盖整屏：非游戏中状态以及切换状态后的第一帧整屏重绘
+        if self.game_state != GAME_PLAYING or self.game_state != self.drawn_state:
+            self.renderer.invalidate()
+        self.drawn_state = self.game_state
+        
+        # 每次绘制返回的矩形登记到渲染器，脏矩形模式下只推送这些区域
+        full = self.renderer.begin_frame()
+        dirty = self.renderer.add
+        dirty(self.background.draw(self.screen, clear=full, track=self.renderer.enabled, alpha=alpha))
         
         # 绘制游戏元素
         if self.game_state in [GAME_PLAYING, GAME_PAUSED]:
             # 绘制玩家
-            self.player.draw(self.screen)
+            dirty(self.player.draw(self.screen, alpha))
             
             # 绘制子弹
-            for bullet in self.bullets:
-                bullet.draw(self.screen)
+            dirty(self.bullets.draw(self.screen, alpha))
             
             # 绘制敌人
-            for enemy in self.enemies:
-                enemy.draw(self.screen)
+            dirty(self.enemies.draw(self.screen, self.sprites, alpha, FLEET))
             
             # 绘制粒子效果
-            for particle in self.particles:
-                particle.draw(self.screen)
+            dirty(self.particles.draw(self.screen, alpha))
             
             # 绘制道具
             for power_up in self.power_ups:
-                power_up.draw(self.screen)
+                dirty(power_up.draw(self.screen, alpha))
             
             # 绘制Boss
             if self.boss and self.boss_spawned:
-                self.boss.draw(self.screen)
-                self.draw_boss_health_bar()
+                dirty(self.enemies.draw(self.screen, self.sprites, alpha, (BOSS,)))
+                dirty(self.draw_boss_health_bar())
             
             # 绘制UI
-            self.draw_ui()
+            dirty(self.draw_ui())
         
         # 绘制菜单
         if self.game_state == START_MENU:
@@ -311,80 +583,96 @@ class StarDefender:
             self.draw_game_over()
         elif self.game_state == GAME_WON:
             self.draw_game_won()
+        self.profiler.lap("draw")
+        
+        # 性能浮层（F3）
+        dirty(self.profiler.draw(self.screen))
+        self.profiler.lap("overlay")
+        
+        # 统计本帧复用的共享 Surface
+        self.surfaces.end_frame()
         
-        pygame.display.flip()
+        self.renderer.end_frame()
+        self.profiler.lap("present")
     
     def start_game(self):
         """开始游戏"""
         self.game_state = GAME_PLAYING
         self.reset_game()
+        self.music.play()
     
     def game_over(self):
         """游戏结束"""
         self.game_state = GAME_OVER
+        self.music.stop()
+        self.audio.play("game_over")
+        self.save_replay()
     
     def game_won(self):
         """游戏胜利"""
         self.game_state = GAME_WON
+        self.music.stop()
+        self.save_replay()
     
     def pause_game(self):
         """暂停游戏"""
         self.game_state = GAME_PAUSED
+        self.music.pause()
     
     def resume_game(self):
         """恢复游戏"""
         self.game_state = GAME_PLAYING
+        self.timestep.reset()
+        self.music.resume()
     
     def restart_game(self):
         """重新开始游戏"""
         self.reset_game()
         self.game_state = GAME_PLAYING
+        self.music.play()
     
     def spawn_enemies(self):
-        """生成敌人"""
-        current_time = pygame.time.get_ticks()
-        
-        if self.boss_spawned:
-            return  # Boss出现后不再生成普通敌人
-        
-        if current_time - self.enemy_spawn_timer > self.enemy_spawn_interval:
-            enemy_type = random.choice(["small", "medium", "meteor"])
-            
-            if enemy_type == "small":
-                enemy = SmallScout(random.randint(50, SCREEN_WIDTH - 50), -50)
-            elif enemy_type == "medium":
-                enemy = MediumFrigate(random.randint(60, SCREEN_WIDTH - 60), -60)
-            elif enemy_type == "meteor":
-                enemy = Meteor(random.randint(50, SCREEN_WIDTH - 50), -50)
-            
-            self.enemies.append(enemy)
-            self.enemy_spawn_timer = current_time
-            
-            # 随着关卡提升，减少生成间隔（最低300毫秒）
-            self.enemy_spawn_interval = max(300, 1000 - (self.level - 1) * 100)
+        """按时间线生成本 tick 出场的敌人和Boss，并为即将出场的敌机预留表容量"""
+        waves = self.waves
+        for event in waves.due(self.sim_ticks):
+            if event.kind == BOSS:
+                if not self.boss_spawned:
+                    self.spawn_boss()
+            elif not self.boss_spawned:  # Boss出现后不再生成普通敌人
+                self.enemies.spawn(event.kind, event.x, event.y, self.enemy_random, motion=event.motion)
+        waves.prefetch(self.sim_ticks)
     
     def spawn_power_ups(self):
-        """生成道具"""
-        current_time = pygame.time.get_ticks()
+        """生成道具：间隔已过的每类道具每 tick 按概率生成，生成后重新等待最小间隔"""
+        rng = self.spawn_random
         
-        # 子弹增强道具（最小间隔5秒）
-        if current_time - self.last_bullet_power_up > 5000:
-            if random.random() < 0.02:  # 2%概率生成
-                power_up = PowerUp(random.randint(50, SCREEN_WIDTH - 50), -50, "bullet")
+        for power_type, (interval, chance) in POWER_UP_SPAWNS.items():
+            if self.power_up_ready[power_type] and rng.random() < chance:
+                power_up = PowerUp(rng.randint(50, SCREEN_WIDTH - 50), -50, power_type)
                 self.power_ups.append(power_up)
-                self.last_bullet_power_up = current_time
-        
-        # 全屏轰炸道具（最小间隔7秒）
-        if current_time - self.last_bomb_power_up > 7000:
-            if random.random() < 0.01:  # 1%概率生成
-                power_up = PowerUp(random.randint(50, SCREEN_WIDTH - 50), -50, "bomb")
-                self.power_ups.append(power_up)
-                self.last_bomb_power_up = current_time
+                self.power_up_ready[power_type] = False
+                self.timers.after(interval, self.allow_power_up, power_type)
+    
+    def allow_power_up(self, power_type):
+        """定时器回调：power_type 类道具的最小生成间隔已过"""
+        self.power_up_ready[power_type] = True
     
     def spawn_boss(self):
-        """生成Boss"""
-        self.boss = Boss(SCREEN_WIDTH // 2 - 100, -200, self.level)
+        """生成Boss：生命值按关卡增长，攻击模式由本关定义"""
+        balance = self.balance
+        health = int(balance.boss_base_health * (balance.boss_health_growth ** (self.level - 1)))
+        self.boss = self.enemies.spawn(BOSS, SCREEN_WIDTH // 2 - 100, -200, health=health,
+                                       patterns=self.waves.boss_patterns(self.level), attack_timer=self.get_ticks())
         self.boss_spawned = True
+        self.boss_spawn_tick = self.sim_ticks
+        self.timers.after(self.enemies.attack_pattern(self.boss).duration, self.rotate_boss_attack, self.boss)
+    
+    def rotate_boss_attack(self, boss):
+        """定时器回调：Boss 当前的攻击模式到时，轮换到下一种并登记下一次轮换"""
+        if boss != self.boss:  # Boss 已被击败
+            return
+        pattern = self.enemies.rotate_attack(boss, self.get_ticks())
+        self.timers.after(pattern.duration, self.rotate_boss_attack, boss)
     
     def use_bomb(self):
         """使用全屏轰炸"""
@@ -392,139 +680,173 @@ class StarDefender:
             self.bomb_count -= 1
             
             # 清除所有普通敌机和子弹
-            for enemy in self.enemies[:]:
-                if not isinstance(enemy, Boss):
-                    self.create_explosion(enemy.x + enemy.width // 2, enemy.y + enemy.height // 2)
-                    self.score += enemy.points
-                    self.enemies.remove(enemy)
+            fleet = self.enemies.select("collider")
+            for x, y in self.enemies.centers(fleet).tolist():
+                self.create_explosion(x, y)
+            self.score += int(fleet["points"].sum())
+            fleet.clear()
             
-            for bullet in self.bullets[:]:
-                self.bullets.remove(bullet)
+            self.bullets.clear()
             
             # 对Boss造成固定伤害
             if self.boss and self.boss_spawned:
-                self.boss.take_damage(13)  # 相当于13发普通子弹的伤害
-                self.create_explosion(self.boss.x + self.boss.width // 2, self.boss.y + self.boss.height // 2)
+                bosses, row = self.enemies.locate(self.boss, BOSS)
+                bosses.health[row] -= 13  # 相当于13发普通子弹的伤害
+                self.create_explosion(*self.enemies.center_of(bosses, row))
             
             # 创建爆炸效果
             self.create_bomb_explosion()
+            self.audio.play("bomb")
     
     def create_explosion(self, x, y):
         """创建爆炸效果"""
-        for _ in range(8):
-            particle = Particle(x, y, random.randint(1, 5), 
-                               (random.randint(200, 255), random.randint(50, 150), 0), 
-                               random.randint(-5, 5), random.randint(-5, 5), 60)
-            self.particles.append(particle)
+        self.particles.burst(x, y, 8, (1, 5), ((200, 255), (50, 150), (0, 0)), (-5, 5), 60)
+        self.audio.play("explosion")
     
     def create_bomb_explosion(self):
         """创建轰炸爆炸效果"""
-        for _ in range(20):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            particle = Particle(x, y, random.randint(3, 8), 
-                               (random.randint(150, 255), random.randint(50, 200), random.randint(50, 255)), 
-                               random.randint(-3, 3), random.randint(-3, 3), 120)
-            self.particles.append(particle)
+        rng = self.particles.rng
+        x = rng.integers(0, SCREEN_WIDTH + 1, 20)
+        y = rng.integers(0, SCREEN_HEIGHT + 1, 20)
+        self.particles.burst(x, y, 20, (3, 8), ((150, 255), (50, 200), (50, 255)), (-3, 3), 120)
     
     def check_collisions(self):
-        """检查碰撞"""
-        # 玩家子弹与敌人
-        for bullet in self.bullets[:]:
-            for enemy in self.enemies[:]:
-                if bullet.rect.colliderect(enemy.rect):
-                    enemy.take_damage(bullet.damage)
-                    self.bullets.remove(bullet)
-                    
-                    if enemy.health <= 0:
-                        self.create_explosion(enemy.x + enemy.width // 2, enemy.y + enemy.height // 2)
-                        self.score += enemy.points
-                        self.enemies.remove(enemy)
-                    break
+        """检查碰撞（空间哈希粗筛 + Rect精确检测）"""
+        player_rect = self.player.rect
+        
+        # 玩家子弹与敌人：每发子弹命中最早出场的敌人（网格按出场顺序编号，order 换回整体下标）
+        fleet = self.enemies.select("collider")
+        order = fleet.spawn_order()
+        rects = self.enemies.rects(fleet)
+        enemy_grid = self.enemy_grid
+        enemy_grid.rebuild([rects[i] for i in order], reach=BULLET_REACH)
+        dead_enemies = []
+        player_bullets = self.bullets.indices_of(PLAYER_OWNER)
+        damage = self.bullets.damage
+        spent_bullets = []
+        
+        for bullet_index, slot in enemy_grid.iter_first_hits(self.bullets.boxes(player_bullets)):
+            bullet = player_bullets[bullet_index]
+            spent_bullets.append(bullet)
+            
+            target = order[slot]
+            enemies, row = fleet.locate(target)
+            enemies.health[row] -= damage[bullet]
+            
+            if enemies.health[row] <= 0:
+                self.create_explosion(*self.enemies.center_of(enemies, row))
+                self.score += int(enemies.points[row])
+                dead_enemies.append(target)
+                enemy_grid.remove(slot)
+        
+        self.bullets.remove(spent_bullets)
         
         # 玩家与敌人
-        for enemy in self.enemies[:]:
-            if self.player.rect.colliderect(enemy.rect):
-                self.player.take_damage()
-                self.create_explosion(enemy.x + enemy.width // 2, enemy.y + enemy.height // 2)
-                
-                if not isinstance(enemy, Meteor):
-                    self.score += enemy.points
-                
-                self.enemies.remove(enemy)
-        
-        # 玩家与道具
-        for power_up in self.power_ups[:]:
-            if self.player.rect.colliderect(power_up.rect):
-                if power_up.type == "bullet":
-                    self.activate_bullet_power_up()
-                elif power_up.type == "bomb":
-                    self.bomb_count = min(9, self.bomb_count + 1)  # 最多9个
-                
-                self.power_ups.remove(power_up)
+        for slot in enemy_grid.query_colliding(player_rect):
+            i = order[slot]
+            enemies, row = fleet.locate(i)
+            self.player.take_damage()
+            self.create_explosion(*self.enemies.center_of(enemies, row))
+            
+            if enemies.ram_scores[row]:
+                self.score += int(enemies.points[row])
+            
+            dead_enemies.append(i)
+        
+        fleet.remove(dead_enemies)
+        
+        # 玩家与道具（单个查询矩形，直接在C层线性扫描比建网格更快）
+        power_ups = self.power_ups.live()
+        collected = player_rect.collidelistall([power_up.rect for power_up in power_ups])
+        for i in collected:
+            power_up = power_ups[i]
+            if power_up.type == "bullet":
+                self.activate_bullet_power_up()
+            elif power_up.type == "bomb":
+                self.bomb_count = min(9, self.bomb_count + 1)  # 最多9个
+            
+            self.power_ups.remove(power_up)
         
-        # 敌人子弹与玩家
-        for enemy in self.enemies:
-            for bullet in enemy.bullets[:]:
-                if self.player.rect.colliderect(bullet.rect):
-                    self.player.take_damage()
-                    self.create_explosion(bullet.x, bullet.y)
-                    enemy.bullets.remove(bullet)
-                    break
+        # 敌方子弹与玩家（批量判定）：命中的子弹全部消耗
+        hits = self.bullets.overlapping(player_rect, HOSTILE_OWNER)
+        if len(hits):
+            self.player.take_damage()
+            for x, y in self.bullets.pos[hits].astype(np.int32).tolist():
+                self.create_explosion(x, y)
+            self.bullets.remove(hits)
     
     def activate_bullet_power_up(self):
         """激活子弹增强"""
         self.bullet_power_up_active = True
-        self.bullet_power_up_time = pygame.time.get_ticks()
+        self.bullet_power_up_time = self.get_ticks()
+        # 持续期间再次拾取时重新计时
+        self.timers.cancel(self.bullet_power_up_timer)
+        self.bullet_power_up_timer = self.timers.after(self.bullet_power_up_duration, self.expire_bullet_power_up)
+    
+    def expire_bullet_power_up(self):
+        """定时器回调：子弹增强结束"""
+        self.bullet_power_up_active = False
+        self.bullet_power_up_timer = None
     
     def boss_defeated(self):
         """Boss被击败"""
-        self.create_explosion(self.boss.x + self.boss.width // 2, self.boss.y + self.boss.height // 2)
+        bosses, row = self.enemies.locate(self.boss, BOSS)
+        self.create_explosion(*self.enemies.center_of(bosses, row))
         self.score += 1000  # Boss奖励分数
+        self.audio.play("boss_defeated")
+        self.boss_kill_ticks.append(self.sim_ticks - self.boss_spawn_tick)
+        bosses.remove([row])
+        self.boss = None
         self.boss_spawned = False
         
         if self.level < self.max_levels:
             # 进入下一关
             self.level += 1
             self.boss_spawned = False
-            self.enemy_spawn_timer = 0
-            # 增加敌人生成速度
-            self.enemy_spawn_interval = max(300, 1000 - (self.level - 1) * 100)
+            self.start_level(self.level)
         else:
             # 游戏胜利
+            self.waves.clear()
             self.game_won()
     
     def draw_ui(self):
         """绘制UI"""
+        # 分数、生命、关卡和炸弹数变化时才重新绘制 HUD 图层
+        rects = [self.hud.draw(self.screen, (self.score, self.player.lives, self.level, self.bomb_count))]
+        
+        # 子弹增强状态
+        if self.bullet_power_up_active:
+            power_up_time = (self.bullet_power_up_duration - 
+                           (self.get_ticks() - self.bullet_power_up_time)) // 1000
+            power_up_text = self.text.render(self.font_small, f"子弹增强: {power_up_time}s", YELLOW)
+            rects.append(self.screen.blit(power_up_text, (10, SCREEN_HEIGHT - 30)))
+        
+        return rects
+    
+    def paint_hud(self, surface, score, lives, level, bomb_count):
+        """绘制 HUD 图层（分数、生命、关卡、炸弹）"""
         # 分数
-        score_text = self.font_medium.render(f"分数: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        score_text = self.text.render(self.font_medium, f"分数: {score}", WHITE)
+        surface.blit(score_text, (10, 10))
         
         # 生命值
-        lives_text = self.font_medium.render(f"生命: {'❤️' * self.player.lives}", True, WHITE)
-        self.screen.blit(lives_text, (10, 40))
+        lives_text = self.text.render(self.font_medium, f"生命: {'❤️' * lives}", WHITE)
+        surface.blit(lives_text, (10, 40))
         
         # 关卡
-        level_text = self.font_medium.render(f"关卡: {self.level}", True, WHITE)
-        self.screen.blit(level_text, (10, 70))
+        level_text = self.text.render(self.font_medium, f"关卡: {level}", WHITE)
+        surface.blit(level_text, (10, 70))
         
         # 炸弹数量
-        bomb_text = self.font_medium.render(f"BOMB: {self.bomb_count}", True, WHITE)
-        self.screen.blit(bomb_text, (SCREEN_WIDTH - 120, 10))
+        bomb_text = self.text.render(self.font_medium, f"BOMB: {bomb_count}", WHITE)
+        surface.blit(bomb_text, (SCREEN_WIDTH - 120, 10))
         
         # 炸弹按钮
         bomb_rect = pygame.Rect(SCREEN_WIDTH - 60, 10, 50, 50)
-        pygame.draw.rect(self.screen, (100, 100, 100), bomb_rect)
-        pygame.draw.rect(self.screen, WHITE, bomb_rect, 2)
-        bomb_icon = self.font_medium.render("B", True, WHITE)
-        self.screen.blit(bomb_icon, (SCREEN_WIDTH - 40, 20))
-        
-        # 子弹增强状态
-        if self.bullet_power_up_active:
-            power_up_time = (self.bullet_power_up_duration - 
-                           (pygame.time.get_ticks() - self.bullet_power_up_time)) // 1000
-            power_up_text = self.font_small.render(f"子弹增强: {power_up_time}s", True, YELLOW)
-            self.screen.blit(power_up_text, (10, SCREEN_HEIGHT - 30))
+        pygame.draw.rect(surface, (100, 100, 100), bomb_rect)
+        pygame.draw.rect(surface, WHITE, bomb_rect, 2)
+        bomb_icon = self.text.render(self.font_medium, "B", WHITE)
+        surface.blit(bomb_icon, (SCREEN_WIDTH - 40, 20))
     
     def draw_boss_health_bar(self):
         """绘制Boss血条"""
@@ -537,10 +859,11 @@ class StarDefender:
         y = 20
         
         # 背景
-        pygame.draw.rect(self.screen, BLACK, (x - 2, y - 2, bar_width + 4, bar_height + 4))
+        bar_rect = pygame.draw.rect(self.screen, BLACK, (x - 2, y - 2, bar_width + 4, bar_height + 4))
         
         # 血条
-        health_percentage = self.boss.health / self.boss.max_health
+        bosses, row = self.enemies.locate(self.boss, BOSS)
+        health_percentage = bosses.health[row] / bosses.max_health[row]
         health_width = int(bar_width * health_percentage)
         
         # 根据血量显示不同颜色
@@ -557,30 +880,27 @@ class StarDefender:
         pygame.draw.rect(self.screen, WHITE, (x, y, bar_width, bar_height), 2)
         
         # 文字
-        boss_text = self.font_medium.render(f"BOSS LEVEL {self.level}", True, WHITE)
+        boss_text = self.text.render(self.font_medium, f"BOSS LEVEL {self.level}", WHITE)
         text_rect = boss_text.get_rect(center=(SCREEN_WIDTH // 2, y + bar_height // 2))
-        self.screen.blit(boss_text, text_rect)
+        return bar_rect.union(self.screen.blit(boss_text, text_rect))
     
     def draw_start_menu(self):
         """绘制开始菜单"""
         # 半透明背景
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill(BLACK)
-        overlay.set_alpha(180)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.surfaces.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), BLACK, 180), (0, 0))
         
         # 标题
-        title = self.font_large.render("星际捍卫者于闻言", True, WHITE)
+        title = self.text.render(self.font_large, "星际捍卫者于闻言", WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
         self.screen.blit(title, title_rect)
         
         # 副标题
-        subtitle = self.font_medium.render("Star Defender", True, CYAN)
+        subtitle = self.text.render(self.font_medium, "Star Defender", CYAN)
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(subtitle, subtitle_rect)
         
         # 提示
-        hint = self.font_small.render("按空格键开始游戏", True, WHITE)
+        hint = self.text.render(self.font_small, "按空格键开始游戏", WHITE)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
         self.screen.blit(hint, hint_rect)
         
@@ -594,89 +914,80 @@ class StarDefender:
         ]
         
         for i, line in enumerate(controls):
-            text = self.font_small.render(line, True, WHITE)
+            text = self.text.render(self.font_small, line, WHITE)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100 + i * 25))
             self.screen.blit(text, text_rect)
     
     def draw_pause_menu(self):
         """绘制暂停菜单"""
         # 半透明背景
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill(BLACK)
-        overlay.set_alpha(200)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.surfaces.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), BLACK, 200), (0, 0))
         
         # 标题
-        title = self.font_large.render("游戏暂停", True, WHITE)
+        title = self.text.render(self.font_large, "游戏暂停", WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(title, title_rect)
         
         # 提示
-        hint1 = self.font_medium.render("按P键或ESC键继续", True, WHITE)
+        hint1 = self.text.render(self.font_medium, "按P键或ESC键继续", WHITE)
         hint1_rect = hint1.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
         self.screen.blit(hint1, hint1_rect)
         
-        hint2 = self.font_medium.render("按R键重新开始", True, WHITE)
+        hint2 = self.text.render(self.font_medium, "按R键重新开始", WHITE)
         hint2_rect = hint2.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
         self.screen.blit(hint2, hint2_rect)
     
     def draw_game_over(self):
         """绘制游戏结束界面"""
         # 半透明背景
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill(BLACK)
-        overlay.set_alpha(200)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.surfaces.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), BLACK, 200), (0, 0))
         
         # 标题
-        title = self.font_large.render("游戏结束", True, RED)
+        title = self.text.render(self.font_large, "游戏结束", RED)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
         self.screen.blit(title, title_rect)
         
         # 分数
-        score_text = self.font_medium.render(f"最终分数: {self.score}", True, WHITE)
+        score_text = self.text.render(self.font_medium, f"最终分数: {self.score}", WHITE)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30))
         self.screen.blit(score_text, score_rect)
         
         # 关卡
-        level_text = self.font_medium.render(f"到达关卡: {self.level}", True, WHITE)
+        level_text = self.text.render(self.font_medium, f"到达关卡: {self.level}", WHITE)
         level_rect = level_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
         self.screen.blit(level_text, level_rect)
         
         # 提示
-        hint1 = self.font_medium.render("按R键重新开始", True, WHITE)
+        hint1 = self.text.render(self.font_medium, "按R键重新开始", WHITE)
         hint1_rect = hint1.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
         self.screen.blit(hint1, hint1_rect)
         
-        hint2 = self.font_medium.render("按ESC键退出", True, WHITE)
+        hint2 = self.text.render(self.font_medium, "按ESC键退出", WHITE)
         hint2_rect = hint2.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 110))
         self.screen.blit(hint2, hint2_rect)
     
     def draw_game_won(self):
         """绘制游戏胜利界面"""
         # 半透明背景
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill(BLACK)
-        overlay.set_alpha(200)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.surfaces.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), BLACK, 200), (0, 0))
         
         # 标题
-        title = self.font_large.render("游戏胜利!", True, GREEN)
+        title = self.text.render(self.font_large, "游戏胜利!", GREEN)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
         self.screen.blit(title, title_rect)
         
         # 恭喜
-        congrats = self.font_medium.render("恭喜你击败了所有Boss!", True, YELLOW)
+        congrats = self.text.render(self.font_medium, "恭喜你击败了所有Boss!", YELLOW)
         congrats_rect = congrats.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(congrats, congrats_rect)
         
         # 分数
-        score_text = self.font_medium.render(f"最终分数: {self.score}", True, WHITE)
+        score_text = self.text.render(self.font_medium, f"最终分数: {self.score}", WHITE)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
         self.screen.blit(score_text, score_rect)
         
         # 提示
-        hint = self.font_medium.render("按R键重新开始", True, WHITE)
+        hint = self.text.render(self.font_medium, "按R键重新开始", WHITE)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
         self.screen.blit(hint, hint_rect)
 
@@ -690,14 +1001,16 @@ class Player:
         self.height = 60
         self.x = SCREEN_WIDTH // 2 - self.width // 2
         self.y = SCREEN_HEIGHT - 100
+        self.prev_x = self.x  # 上一 tick 的位置（插值绘制用）
         self.speed = 8
-        self.lives = 3
+        self.max_lives = 3
+        self.lives = self.max_lives
         self.invulnerable = False
-        self.invulnerable_time = 0
         self.invulnerable_duration = 1000  # 1秒无敌时间
+        self.invulnerability_timer = None
         
-        # 子弹相关
-        self.shoot_timer = 0
+        # 子弹相关（loaded 为射击冷却已结束，由定时器置位）
+        self.loaded = False
         self.shoot_interval = 200  # 200毫秒发射一次
         
         # 碰撞矩形
@@ -708,27 +1021,29 @@ class Player:
         self.target_x = self.x
         
         # 自动射击相关
-        self.game_start_time = 0
         self.auto_shoot_enabled = False
     
     def reset(self):
-        """重置玩家状态"""
+        """重置玩家状态（在游戏清空定时器之后调用）"""
+        timers = self.game.timers
         self.x = SCREEN_WIDTH // 2 - self.width // 2
         self.y = SCREEN_HEIGHT - 100
-        self.lives = 3
+        self.lives = self.max_lives
         self.invulnerable = False
-        self.invulnerable_time = 0
-        self.shoot_timer = 0
+        self.invulnerability_timer = None
         self.target_x = self.x
+        self.prev_x = self.x
         self.rect.topleft = (self.x, self.y)
-        self.game_start_time = pygame.time.get_ticks()
+        
+        # 射击冷却从时钟 0 起算；1秒后启用自动射击
+        self.loaded = False
+        timers.at(self.shoot_interval, self.reload)
         self.auto_shoot_enabled = False
+        timers.after(1000, self.enable_auto_shoot)
     
     def update(self):
         """更新玩家状态"""
-        current_time = pygame.time.get_ticks()
-        
-        # 鼠标控制
+        # 鼠标（或注入的输入源）控制
         self.handle_mouse_control()
         
         # 移动
@@ -744,441 +1059,103 @@ class Player:
         # 更新碰撞矩形
         self.rect.topleft = (self.x, self.y)
         
-        # 自动射击控制
-        current_time = pygame.time.get_ticks()
-        if not self.auto_shoot_enabled:
-            if current_time - self.game_start_time > 1000:  # 1秒后启用自动射击
-                self.auto_shoot_enabled = True
-        
         # 自动射击
         if self.mouse_down or self.auto_shoot_enabled:
             self.shoot()
-        
-        # 更新无敌状态
-        if self.invulnerable:
-            if current_time - self.invulnerable_time > self.invulnerable_duration:
-                self.invulnerable = False
+    
+    def enable_auto_shoot(self):
+        """定时器回调：启用自动射击"""
+        self.auto_shoot_enabled = True
+    
+    def reload(self):
+        """定时器回调：射击冷却结束"""
+        self.loaded = True
+    
+    def end_invulnerability(self):
+        """定时器回调：无敌时间结束"""
+        self.invulnerable = False
+        self.invulnerability_timer = None
     
     def handle_mouse_control(self):
-        """处理鼠标控制"""
-        mouse_buttons = pygame.mouse.get_pressed()
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        """处理鼠标控制（读取游戏本 tick 的输入）"""
+        control = self.game.control
         
         # 鼠标按下
-        if mouse_buttons[0]:
+        if control.fire:
             self.mouse_down = True
-            self.target_x = mouse_x - self.width // 2
+            self.target_x = control.x - self.width // 2
         else:
             self.mouse_down = False
     
     def shoot(self):
         """射击"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > self.shoot_interval:
+        if self.loaded:
+            bullets = self.game.bullets
+            
             # 创建子弹
-            self.game.bullets.append(Bullet(self.x + self.width // 2 - 2, self.y, -10, 4, 8, WHITE, 1))
+            bullets.spawn(self.x + self.width // 2 - 2, self.y, 0, -10, 4, 8, WHITE, 1, PLAYER_OWNER)
             
             # 增强子弹模式
             if self.game.bullet_power_up_active:
                 # 散射子弹
-                self.game.bullets.append(Bullet(self.x + self.width // 2 - 15, self.y, -10, 4, 8, YELLOW, 1))
-                self.game.bullets.append(Bullet(self.x + self.width // 2 + 11, self.y, -10, 4, 8, YELLOW, 1))
+                bullets.spawn((self.x + self.width // 2 - 15, self.x + self.width // 2 + 11), self.y,
+                              0, -10, 4, 8, YELLOW, 1, PLAYER_OWNER)
             
-            self.shoot_timer = current_time
+            self.game.audio.play("shoot")
+            self.loaded = False
+            self.game.timers.after(self.shoot_interval, self.reload)
     
     def take_damage(self):
         """受到伤害"""
         if not self.invulnerable:
             self.lives -= 1
             self.invulnerable = True
-            self.invulnerable_time = pygame.time.get_ticks()
+            timers = self.game.timers
+            timers.cancel(self.invulnerability_timer)
+            self.invulnerability_timer = timers.after(self.invulnerable_duration, self.end_invulnerability)
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         """绘制玩家战机"""
         # 闪烁效果（无敌时）
-        if not self.invulnerable or pygame.time.get_ticks() % 200 < 100:
-            # 绘制战机（手绘画风）
-            # 主体
-            pygame.draw.polygon(screen, (0, 150, 255), [
-                (self.x + self.width // 2, self.y),
-                (self.x, self.y + self.height),
-                (self.x + self.width, self.y + self.height)
-            ])
-            
-            # 驾驶舱
-            pygame.draw.circle(screen, (255, 255, 200), 
-                              (self.x + self.width // 2, self.y + 20), 8)
-            
-            # 引擎
-            pygame.draw.rect(screen, (200, 100, 0), 
-                           (self.x + 10, self.y + self.height - 10, 8, 15))
-            pygame.draw.rect(screen, (200, 100, 0), 
-                           (self.x + self.width - 18, self.y + self.height - 10, 8, 15))
-            
-            # 引擎火焰
-            pygame.draw.polygon(screen, (255, 150, 0), [
-                (self.x + 14, self.y + self.height),
-                (self.x + 10, self.y + self.height + 20),
-                (self.x + 18, self.y + self.height + 20)
-            ])
-            pygame.draw.polygon(screen, (255, 150, 0), [
-                (self.x + self.width - 14, self.y + self.height),
-                (self.x + self.width - 22, self.y + self.height + 20),
-                (self.x + self.width - 14, self.y + self.height + 20)
-            ])
-            
-            # 武器
-            pygame.draw.rect(screen, (100, 100, 100), 
-                           (self.x + self.width // 2 - 2, self.y - 10, 4, 15))
-
-
-class Bullet:
-    """子弹类"""
-    
-    def __init__(self, x, y, speed, width, height, color, damage):
-        self.x = x
-        self.y = y
-        self.speed = speed
-        self.width = width
-        self.height = height
-        self.color = color
-        self.damage = damage
-        
-        # 碰撞矩形
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-    
-    def update(self):
-        """更新子弹位置"""
-        self.y += self.speed
-        self.rect.topleft = (self.x, self.y)
-    
-    def draw(self, screen):
-        """绘制子弹"""
-        pygame.draw.rect(screen, self.color, self.rect)
-        
-        # 子弹发光效果
-        if self.color == YELLOW:
-            glow_surface = pygame.Surface((self.width + 6, self.height + 6), pygame.SRCALPHA)
-            pygame.draw.rect(glow_surface, (255, 255, 0, 50), (3, 3, self.width, self.height))
-            screen.blit(glow_surface, (self.x - 3, self.y - 3))
-
-
-class Enemy:
-    """敌机基类"""
-    
-    def __init__(self, x, y, width, height, speed, health, points):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.speed = speed
-        self.health = health
-        self.max_health = health
-        self.points = points
-        self.bullets = []
-        self.shoot_timer = 0
-        self.shoot_interval = 1000
-        
-        # 碰撞矩形
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-    
-    def update(self):
-        """更新敌机状态"""
-        self.y += self.speed
-        self.rect.topleft = (self.x, self.y)
-        
-        # 更新子弹
-        for bullet in self.bullets[:]:
-            bullet.update()
-            if bullet.y > SCREEN_HEIGHT:
-                self.bullets.remove(bullet)
-    
-    def take_damage(self, damage):
-        """受到伤害"""
-        self.health -= damage
-    
-    def draw(self, screen):
-        """绘制敌机"""
-        pass
-    
-    def shoot(self):
-        """射击"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > self.shoot_interval:
-            bullet = Bullet(self.x + self.width // 2 - 2, self.y + self.height, 5, 4, 8, RED, 1)
-            self.bullets.append(bullet)
-            self.shoot_timer = current_time
-
-
-class SmallScout(Enemy):
-    """小型侦察机"""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, 30, 25, 4, 1, 100)
-        self.shoot_interval = 1500
-        self.move_pattern = "sin"
-        self.move_timer = 0
-        self.amplitude = 2  # 正弦波幅度
-        self.frequency = 0.02  # 正弦波频率
-        self.original_x = x
+        if not self.invulnerable or self.game.get_ticks() % 200 < 100:
+            # 武器向上、引擎火焰向下超出碰撞矩形
+            return SPRITE_CACHE.blit(screen, ("Player",), lerp(self.prev_x, self.x, alpha), self.y,
+                                     (self.width + 1, self.height + 31), (0, -10), self.paint)
     
-    def update(self):
-        """更新侦察机状态"""
-        self.move_timer += 1
-        
-        # 正弦波移动
-        if self.move_pattern == "sin":
-            self.x = self.original_x + math.sin(self.move_timer * self.frequency) * self.amplitude * self.speed
-        
-        super().update()
-        
-        # 随机射击
-        if random.random() < 0.01:
-            self.shoot()
-    
-    def draw(self, screen):
-        """绘制侦察机"""
+    def paint(self, screen, x, y):
+        """以 (x, y) 为左上角绘制战机（手绘画风）"""
         # 主体
-        pygame.draw.polygon(screen, (255, 50, 50), [
-            (self.x + self.width // 2, self.y),
-            (self.x, self.y + self.height),
-            (self.x + self.width, self.y + self.height)
+        pygame.draw.polygon(screen, (0, 150, 255), [
+            (x + self.width // 2, y),
+            (x, y + self.height),
+            (x + self.width, y + self.height)
         ])
         
-        # 机翼
-        pygame.draw.line(screen, (200, 50, 50), 
-                        (self.x, self.y + 10), (self.x - 10, self.y + 15), 2)
-        pygame.draw.line(screen, (200, 50, 50), 
-                        (self.x + self.width, self.y + 10), (self.x + self.width + 10, self.y + 15), 2)
-        
         # 驾驶舱
-        pygame.draw.circle(screen, (255, 255, 255), 
-                          (self.x + self.width // 2, self.y + 8), 3)
-
-
-class MediumFrigate(Enemy):
-    """中型护卫舰"""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, 50, 40, 2, 3, 300)
-        self.shoot_interval = 800
-        self.move_pattern = "straight"
-    
-    def update(self):
-        """更新护卫舰状态"""
-        super().update()
-        
-        # 定期射击
-        self.shoot()
-    
-    def shoot(self):
-        """射击（小型弹幕）"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > self.shoot_interval:
-            # 发射三发子弹
-            for i in range(-1, 2):
-                bullet = Bullet(self.x + self.width // 2 - 2 + i * 10, self.y + self.height, 6, 4, 8, RED, 1)
-                self.bullets.append(bullet)
-            self.shoot_timer = current_time
-    
-    def draw(self, screen):
-        """绘制护卫舰"""
-        # 主体
-        pygame.draw.rect(screen, (50, 100, 255), 
-                       (self.x, self.y, self.width, self.height))
-        
-        # 船头
-        pygame.draw.polygon(screen, (50, 100, 255), [
-            (self.x + self.width // 2, self.y),
-            (self.x + 10, self.y + 10),
-            (self.x + self.width - 10, self.y + 10)
+        pygame.draw.circle(screen, (255, 255, 200), 
+                          (x + self.width // 2, y + 20), 8)
+        
+        # 引擎
+        pygame.draw.rect(screen, (200, 100, 0), 
+                       (x + 10, y + self.height - 10, 8, 15))
+        pygame.draw.rect(screen, (200, 100, 0), 
+                       (x + self.width - 18, y + self.height - 10, 8, 15))
+        
+        # 引擎火焰
+        pygame.draw.polygon(screen, (255, 150, 0), [
+            (x + 14, y + self.height),
+            (x + 10, y + self.height + 20),
+            (x + 18, y + self.height + 20)
+        ])
+        pygame.draw.polygon(screen, (255, 150, 0), [
+            (x + self.width - 14, y + self.height),
+            (x + self.width - 22, y + self.height + 20),
+            (x + self.width - 14, y + self.height + 20)
         ])
         
         # 武器
         pygame.draw.rect(screen, (100, 100, 100), 
-                       (self.x + 10, self.y + 20, 8, 15))
-        pygame.draw.rect(screen, (100, 100, 100), 
-                       (self.x + self.width - 18, self.y + 20, 8, 15))
-        
-        # 装甲板
-        pygame.draw.rect(screen, (80, 80, 80), 
-                       (self.x + 5, self.y + 5, self.width - 10, 5))
-        pygame.draw.rect(screen, (80, 80, 80), 
-                       (self.x + 5, self.y + 15, self.width - 10, 5))
-
-
-class Meteor(Enemy):
-    """太空陨石"""
-    
-    def __init__(self, x, y):
-        super().__init__(x, y, random.randint(25, 45), random.randint(25, 45), 
-                        random.uniform(1, 3), 1, 150)
-        self.rotation = 0
-        self.rotation_speed = random.uniform(-1, 1)
-        self.shape = self.generate_random_shape()
-    
-    def generate_random_shape(self):
-        """生成随机形状"""
-        points = []
-        sides = random.randint(5, 8)
-        
-        for i in range(sides):
-            angle = (i / sides) * math.pi * 2
-            radius = random.randint(self.width // 2 - 5, self.width // 2 + 5)
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            points.append((x, y))
-        
-        return points
-    
-    def update(self):
-        """更新陨石状态"""
-        super().update()
-        self.rotation += self.rotation_speed
-    
-    def draw(self, screen):
-        """绘制陨石"""
-        # 旋转并绘制多边形
-        rotated_points = []
-        center_x = self.x + self.width // 2
-        center_y = self.y + self.height // 2
-        
-        for px, py in self.shape:
-            # 旋转点
-            new_px = px * math.cos(math.radians(self.rotation)) - py * math.sin(math.radians(self.rotation))
-            new_py = px * math.sin(math.radians(self.rotation)) + py * math.cos(math.radians(self.rotation))
-            
-            # 平移到屏幕位置
-            rotated_points.append((center_x + new_px, center_y + new_py))
-        
-        # 绘制陨石
-        pygame.draw.polygon(screen, (100, 100, 100), rotated_points)
-        
-        # 添加纹理
-        for _ in range(3):
-            tx = self.x + random.randint(5, self.width - 10)
-            ty = self.y + random.randint(5, self.height - 10)
-            pygame.draw.circle(screen, (80, 80, 80), (tx, ty), random.randint(2, 5))
-
-
-class Boss(Enemy):
-    """关卡Boss"""
-    
-    def __init__(self, x, y, level):
-        # 根据关卡计算生命值
-        base_health = 40
-        health = int(base_health * (1.15 ** (level - 1)))
-        
-        super().__init__(x, y, 200, 150, 2, health, 1000)
-        self.level = level
-        self.shoot_interval = 500
-        self.phase = 1
-        self.move_timer = 0
-        self.move_pattern = "sin"
-        self.original_x = x
-        
-        # 多阶段攻击模式
-        self.attack_patterns = [
-            self.attack_pattern_1,
-            self.attack_pattern_2,
-            self.attack_pattern_3
-        ]
-        self.current_attack = 0
-        self.attack_timer = 0
-        self.attack_duration = 3000  # 每个攻击模式持续3秒
-    
-    def update(self):
-        """更新Boss状态"""
-        self.move_timer += 1
-        current_time = pygame.time.get_ticks()
-        
-        # Boss移动
-        if self.move_pattern == "sin":
-            self.x = self.original_x + math.sin(self.move_timer * 0.01) * 50
-        
-        super().update()
-        
-        # 攻击模式切换
-        if current_time - self.attack_timer > self.attack_duration:
-            self.current_attack = (self.current_attack + 1) % len(self.attack_patterns)
-            self.attack_timer = current_time
-        
-        # 执行当前攻击模式
-        self.attack_patterns[self.current_attack]()
-    
-    def attack_pattern_1(self):
-        """攻击模式1：直线射击"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > self.shoot_interval:
-            # 中间发射
-            bullet = Bullet(self.x + self.width // 2 - 2, self.y + self.height, 6, 4, 10, RED, 1)
-            self.bullets.append(bullet)
-            
-            self.shoot_timer = current_time
-    
-    def attack_pattern_2(self):
-        """攻击模式2：扇形射击"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > self.shoot_interval:
-            angle_step = 15
-            for angle in range(-45, 46, angle_step):
-                rad = math.radians(angle)
-                speed = 6
-                bullet_speed_x = math.sin(rad) * speed
-                bullet_speed_y = math.cos(rad) * speed
-                
-                bullet = Bullet(self.x + self.width // 2 - 2, self.y + self.height, 
-                              bullet_speed_y, 4, 8, RED, 1)
-                bullet.x_speed = bullet_speed_x
-                self.bullets.append(bullet)
-            
-            self.shoot_timer = current_time
-    
-    def attack_pattern_3(self):
-        """攻击模式3：弹幕射击"""
-        current_time = pygame.time.get_ticks()
-        
-        if current_time - self.shoot_timer > 300:
-            # 三方向射击
-            for offset in [-40, 0, 40]:
-                bullet = Bullet(self.x + self.width // 2 - 2 + offset, self.y + self.height, 5, 4, 8, RED, 1)
-                self.bullets.append(bullet)
-            
-            self.shoot_timer = current_time
-    
-    def draw(self, screen):
-        """绘制Boss"""
-        # Boss主体
-        pygame.draw.rect(screen, (150, 50, 255), 
-                       (self.x, self.y, self.width, self.height))
-        
-        # 头部
-        pygame.draw.rect(screen, (200, 100, 255), 
-                       (self.x + 30, self.y, self.width - 60, 40))
-        
-        # 武器炮台
-        pygame.draw.rect(screen, (100, 100, 100), 
-                       (self.x + 50, self.y + 60, 20, 30))
-        pygame.draw.rect(screen, (100, 100, 100), 
-                       (self.x + self.width - 70, self.y + 60, 20, 30))
-        pygame.draw.rect(screen, (100, 100, 100), 
-                       (self.x + self.width // 2 - 10, self.y + 80, 20, 40))
-        
-        # 发光核心
-        pygame.draw.circle(screen, (255, 100, 100), 
-                          (self.x + self.width // 2, self.y + self.height // 2), 20)
-        pygame.draw.circle(screen, (255, 200, 200), 
-                          (self.x + self.width // 2, self.y + self.height // 2), 10)
-        
-        # 装饰
-        for i in range(5):
-            pygame.draw.rect(screen, (100, 50, 200), 
-                           (self.x + 10 + i * 38, self.y + 30, 20, 5))
+                       (x + self.width // 2 - 2, y - 10, 4, 15))
 
 
 class PowerUp:
@@ -1192,6 +1169,7 @@ class PowerUp:
         self.speed = 3
         self.type = power_type
         self.animation_timer = 0
+        self.prev_y = y  # 上一 tick 的位置（插值绘制用）
         
         # 碰撞矩形
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
@@ -1208,120 +1186,78 @@ class PowerUp:
         self.animation_timer += 1
         self.rect.topleft = (self.x, self.y)
     
-    def draw(self, screen):
-        """绘制道具"""
+    def draw(self, screen, alpha=1.0):
+        """绘制道具（每个闪烁相位一张缓存精灵）"""
+        blink = self.animation_timer % 100 >= 50
+        return SPRITE_CACHE.blit(screen, ("PowerUp", self.type, blink), self.x, lerp(self.prev_y, self.y, alpha),
+                                 (self.width + 12, self.height + 12), (-6, -6),
+                                 lambda surface, x, y: self.paint(surface, x, y, blink))
+    
+    def paint(self, screen, x, y, blink=False):
+        """以 (x, y) 为左上角绘制道具"""
         color = self.colors.get(self.type, WHITE)
         
         # 闪烁效果
-        alpha = 255 if self.animation_timer % 100 < 50 else 150
+        alpha = 150 if blink else 255
         
         # 绘制道具
         if self.type == "bullet":
             # 子弹增强道具：发光的能量核心
             pygame.draw.circle(screen, color, 
-                              (self.x + self.width // 2, self.y + self.height // 2), 
+                              (x + self.width // 2, y + self.height // 2), 
                               self.width // 2)
             
             # 能量光环
             glow_radius = self.width // 2 + 5
             pygame.draw.circle(screen, (color[0], color[1], color[2], alpha), 
-                              (self.x + self.width // 2, self.y + self.height // 2), 
+                              (x + self.width // 2, y + self.height // 2), 
                               glow_radius, 2)
         
         elif self.type == "bomb":
             # 全屏轰炸道具：核弹图标
             pygame.draw.rect(screen, color, 
-                           (self.x, self.y, self.width, self.height))
+                           (x, y, self.width, self.height))
             
             # 核弹标志
             pygame.draw.line(screen, BLACK, 
-                           (self.x + 5, self.y + 5), 
-                           (self.x + self.width - 5, self.y + self.height - 5), 2)
+                           (x + 5, y + 5), 
+                           (x + self.width - 5, y + self.height - 5), 2)
             pygame.draw.line(screen, BLACK, 
-                           (self.x + self.width - 5, self.y + 5), 
-                           (self.x + 5, self.y + self.height - 5), 2)
-
-
-class Particle:
-    """粒子效果类"""
-    
-    def __init__(self, x, y, size, color, speed_x, speed_y, life):
-        self.x = x
-        self.y = y
-        self.size = size
-        self.color = color
-        self.speed_x = speed_x
-        self.speed_y = speed_y
-        self.life = life
-        self.max_life = life
-        
-        # 重力
-        self.gravity = 0.1
-    
-    def update(self):
-        """更新粒子状态"""
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.speed_y += self.gravity
-        self.life -= 1
-    
-    def draw(self, screen):
-        """绘制粒子"""
-        if self.life > 0:
-            alpha = int(255 * (self.life / self.max_life))
-            color = (self.color[0], self.color[1], self.color[2], alpha)
-            
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.size)
+                           (x + self.width - 5, y + 5), 
+                           (x + 5, y + self.height - 5), 2)
 
 
 class Background:
     """游戏背景类"""
     
-    def __init__(self):
-        self.stars = []
+    def __init__(self, star_count=STAR_COUNT, star_layers=STAR_LAYERS, rng=random):
         self.planets = []
         self.speed = 1
+        self.rng = rng
         
-        # 创建星星
-        self.create_stars(100)
+        # 创建星星（按速度分层预渲染的视差星空）
+        self.starfield = Starfield(SCREEN_WIDTH, SCREEN_HEIGHT, star_count, star_layers, rng=rng)
         
         # 创建行星
         self.create_planets(3)
     
-    def create_stars(self, count):
-        """创建星星"""
-        for _ in range(count):
-            star = {
-                "x": random.randint(0, SCREEN_WIDTH),
-                "y": random.randint(0, SCREEN_HEIGHT),
-                "size": random.randint(1, 3),
-                "speed": random.uniform(0.5, 2.0),
-                "color": (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
-            }
-            self.stars.append(star)
-    
     def create_planets(self, count):
         """创建行星"""
+        rng = self.rng
         for _ in range(count):
             planet = {
-                "x": random.randint(0, SCREEN_WIDTH),
-                "y": random.randint(-200, -50),
-                "size": random.randint(20, 50),
-                "speed": random.uniform(0.1, 0.3),
-                "color": (random.randint(100, 200), random.randint(100, 200), random.randint(100, 200))
+                "x": rng.randint(0, SCREEN_WIDTH),
+                "y": rng.randint(-200, -50),
+                "size": rng.randint(20, 50),
+                "speed": rng.uniform(0.1, 0.3),
+                "color": (rng.randint(100, 200), rng.randint(100, 200), rng.randint(100, 200))
             }
             self.planets.append(planet)
     
     def update(self):
         """更新背景"""
-        # 更新星星
-        for star in self.stars:
-            star["y"] += star["speed"]
-            
-            # 星星移出屏幕底部，重新从顶部生成
-            if star["y"] > SCREEN_HEIGHT:
-                star["y"] = -5
-                star["x"] = random.randint(0, SCREEN_WIDTH)
+        # 滚动星空
+        self.starfield.update()
         
         # 更新行星
         for planet in self.planets:
@@ -1330,67 +1266,92 @@ class Background:
             # 行星移出屏幕底部，重新从顶部生成
             if planet["y"] > SCREEN_HEIGHT + 100:
                 planet["y"] = -100
-                planet["x"] = random.randint(0, SCREEN_WIDTH)
-                planet["size"] = random.randint(20, 50)
+                planet["x"] = self.rng.randint(0, SCREEN_WIDTH)
+                planet["size"] = self.rng.randint(20, 50)
     
-    def draw(self, screen):
-        """绘制背景"""
+    def draw(self, screen, clear=True, track=False, alpha=1.0):
+        """绘制背景，返回星星和行星占用的矩形
+
+        clear=False 时不填充底色（脏矩形模式下底色由渲染器按矩形恢复）；
+        track=True 时星星逐颗绘制，返回每颗星的矩形而不是整个屏幕
+        """
         # 深黑色背景
-        screen.fill((0, 0, 20))
+        if clear:
+            screen.fill(BACKGROUND_COLOR)
         
         # 绘制星星
-        for star in self.stars:
-            pygame.draw.circle(screen, star["color"], 
-                              (int(star["x"]), int(star["y"])), 
-                              star["size"])
+        rects = self.starfield.draw(screen, track, alpha)
         
-        # 绘制行星
+        # 绘制行星（每种尺寸和颜色一张缓存精灵）
         for planet in self.planets:
-            # 行星本体
-            pygame.draw.circle(screen, planet["color"], 
-                              (int(planet["x"]), int(planet["y"])), 
-                              planet["size"])
-            
-            # 行星光晕
             glow_radius = planet["size"] + 10
-            pygame.draw.circle(screen, (planet["color"][0], planet["color"][1], planet["color"][2], 50), 
-                              (int(planet["x"]), int(planet["y"])), 
-                              glow_radius, 2)
+            y = planet["y"] - planet["speed"] * (1 - alpha)
+            rects.append(SPRITE_CACHE.blit(screen, ("Planet", planet["size"], planet["color"]),
+                                           int(planet["x"]), int(y),
+                                           (glow_radius * 2 + 1, glow_radius * 2 + 1), (-glow_radius, -glow_radius),
+                                           lambda surface, x, y: self.paint_planet(surface, x, y, planet),
+                                           opaque=True))
+        
+        return rects
+    
+    def paint_planet(self, screen, x, y, planet):
+        """以 (x, y) 为圆心绘制行星"""
+        # 行星本体
+        pygame.draw.circle(screen, planet["color"], (x, y), planet["size"])
+        
+        # 行星光晕
+        glow_radius = planet["size"] + 10
+        pygame.draw.circle(screen, (planet["color"][0], planet["color"][1], planet["color"][2], 50), 
+                          (x, y), glow_radius, 2)
 
 
-class Particle:
-    """粒子效果类"""
-    
-    def __init__(self, x, y, size, color, speed_x, speed_y, life):
-        self.x = x
-        self.y = y
-        self.size = size
-        self.color = color
-        self.speed_x = speed_x
-        self.speed_y = speed_y
-        self.life = life
-        self.max_life = life
-        self.gravity = 0.1
-    
-    def update(self):
-        """更新粒子状态"""
-        self.x += self.speed_x
-        self.y += self.speed_y
-        self.speed_y += self.gravity
-        self.life -= 1
-    
-    def draw(self, screen):
-        """绘制粒子"""
-        if self.life > 0:
-            alpha = int(255 * (self.life / self.max_life))
-            color = (self.color[0], self.color[1], self.color[2], alpha)
-            
-            # 创建半透明表面
-            surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(surf, color, (self.size, self.size), self.size)
-            screen.blit(surf, (self.x - self.size, self.y - self.size))
+def cli_option(name, default=None):
+    """读取命令行中 name 后面的值，没有该选项时返回 default"""
+    if name in sys.argv:
+        index = sys.argv.index(name) + 1
+        if index < len(sys.argv):
+            return sys.argv[index]
+    return default
+
+
+def print_result(result):
+    """输出无头模拟的结果"""
+    print(f"结果: {result['outcome']}  分数: {result['score']}  关卡: {result['level']}  "
+          f"生命: {result['lives']}")
+    print(f"模拟 {result['sim_seconds']:.0f}s 用时 {result['wall_seconds']:.2f}s "
+          f"（{result['ticks_per_second']:.0f} tick/s）")
 
 
 if __name__ == "__main__":
-    game = StarDefender()
-    game.run()
\ No newline at end of file
+    # python main.py --dirty-rects 启用脏矩形渲染（适合低性能设备）
+    # python main.py --interpolate 在两个模拟 tick 之间插值绘制（高刷新率显示器更平滑）
+    # python main.py --headless 不打开窗口，由自动驾驶以最快速度模拟一整局并输出结果
+    # python main.py --seed 42 固定随机种子；--record run.sdr 录制输入，一局结束时写入回放文件
+    # python main.py --replay run.sdr [--speed 4] 按倍速回放（加 --headless 则以最快速度重新模拟）
+    # python main.py --profile 启动时打开性能浮层（游戏中 F3 开关）；--trace frames.json 退出时导出 Chrome trace
+    headless = "--headless" in sys.argv
+    seed = cli_option("--seed")
+    seed = int(seed) if seed is not None else None
+    trace_path = cli_option("--trace")
+    options = {"dirty_rects": "--dirty-rects" in sys.argv, "interpolate": "--interpolate" in sys.argv,
+               "profile": "--profile" in sys.argv, "trace_path": trace_path}
+    replay_path = cli_option("--replay")
+    
+    if replay_path:
+        replay = Replay.load(replay_path)
+        if headless:
+            game = StarDefender.from_replay(replay, headless=True, trace_path=trace_path)
+            print_result(game.simulate(len(replay)))
+            game.profiler.save_trace()
+        else:
+            speed = float(cli_option("--speed", 1))
+            game = StarDefender.from_replay(replay, time_source=lambda: time.perf_counter() * speed, **options)
+            game.timestep.max_ticks_per_frame = max(MAX_TICKS_PER_FRAME, math.ceil(speed * TICK_RATE / FPS) + 1)
+            game.run()
+    elif headless:
+        game = StarDefender(headless=True, seed=seed, trace_path=trace_path)
+        print_result(game.simulate())
+        game.profiler.save_trace()
+    else:
+        game = StarDefender(seed=seed, record_path=cli_option("--record"), **options)
+        game.run()
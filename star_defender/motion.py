@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+敌机移动
+每个实体的 motion 列记录它的移动方式（直线、正弦、俯冲、参数化路径），params 列为该方式的参数。
+移动系统按移动方式把一张表的行分组，每组一次数组运算推进一个 tick；同一表的行通常移动方式相同，
+这时直接按整表切片处理，一大队侦察机与一架的开销几乎一样。
+
+正弦查预先算好的表；参数化路径在注册时按 tick 采样成偏移表，每 tick 只按相位取表。
+新的移动方式用 register_motion() 注册，参数化路径用 parametric() 由曲线函数构造。
+"""
+
+import math
+
+import numpy as np
+
+
+# 正弦表：大小为 2 的幂，下标按位与回绕；取最近的表项，误差不超过 π/4096 弧度
+SINE_TABLE_SIZE = 4096
+SINE_TABLE = np.sin(np.arange(SINE_TABLE_SIZE) * (2 * math.pi / SINE_TABLE_SIZE))
+SINE_SCALE = SINE_TABLE_SIZE / (2 * math.pi)
+
+
+def sine(angles):
+    """查表求正弦（angles 为弧度数组）"""
+    index = np.rint(np.multiply(angles, SINE_SCALE)).astype(np.int64)
+    return SINE_TABLE.take(index & (SINE_TABLE_SIZE - 1))
+
+
+class Motion:
+    """一种移动方式
+
+    step(table, rows) 把表中 rows（切片或下标数组）这些行推进一个 tick：此时 prev 已记录上一 tick
+    的位置，phase 已加一（出场后第一个 tick 为 1）。params 为生成时未给出参数时使用的默认值
+    （最多 4 个，对应 params 列）。
+    """
+
+    def __init__(self, step, params=()):
+        self.step = step
+        self.params = tuple(params) + (0.0,) * (4 - len(params))
+
+
+def straight(table, rows):
+    """直线：按速度移动"""
+    table.pos[rows] += table.vel[rows]
+
+
+def sway(table, rows):
+    """正弦：x 绕出生点按 sin(phase × params[0]) × params[1] 摆动，y 按速度下落"""
+    params = table.params[rows]
+    table.pos[rows, 0] = table.origin[rows, 0] + sine(table.phase[rows] * params[:, 0]) * params[:, 1]
+    table.pos[rows, 1] += table.vel[rows, 1]
+
+
+def dive(table, rows):
+    """俯冲：出场 params[0] 个 tick 后竖直速度每 tick 增加 params[1]，不超过 params[2]"""
+    params = table.params[rows]
+    vel = table.vel[rows]
+    diving = table.phase[rows] > params[:, 0]
+    vel[:, 1] = np.where(diving, np.minimum(vel[:, 1] + params[:, 1], params[:, 2]), vel[:, 1])
+    table.vel[rows] = vel
+    table.pos[rows] += vel
+
+
+def parametric(curve, duration):
+    """参数化路径：curve(t) 对 t ∈ [0, 1] 的数组返回相对出生点的 (dx, dy)，在 duration 个 tick 内走完
+
+    注册时按 tick 采样成偏移表；走完后沿最后一段的方向匀速离开。速度列同步为实际的位移，
+    供自动驾驶等按速度预测的逻辑使用。
+    """
+    dx, dy = curve(np.linspace(0.0, 1.0, duration + 1))
+    offsets = np.column_stack((np.broadcast_to(dx, duration + 1), np.broadcast_to(dy, duration + 1)))
+    exit_velocity = offsets[-1] - offsets[-2]
+
+    def follow(table, rows):
+        phase = table.phase[rows]
+        overrun = np.maximum(phase - duration, 0)[:, None]
+        pos = table.origin[rows] + offsets[np.minimum(phase, duration)] + overrun * exit_velocity
+        table.vel[rows] = pos - table.prev[rows]
+        table.pos[rows] = pos
+
+    return Motion(follow)
+
+
+def swoop_curve(t):
+    """S 形下冲：左右各摆出一次，3 秒下降 600 像素"""
+    return 120 * np.sin(2 * math.pi * t), 600 * t
+
+
+# 移动方式编号 -> Motion；名字 -> 编号（motion 列存编号）
+MOTIONS = []
+MOTION_IDS = {}
+
+
+def register_motion(name, motion):
+    """注册一种移动方式，返回编号（同名重复注册时替换）"""
+    if name in MOTION_IDS:
+        MOTIONS[MOTION_IDS[name]] = motion
+    else:
+        MOTION_IDS[name] = len(MOTIONS)
+        MOTIONS.append(motion)
+    return MOTION_IDS[name]
+
+
+STRAIGHT = register_motion("straight", Motion(straight))
+SWAY = register_motion("sine", Motion(sway, (0.02, 8)))
+DIVE = register_motion("dive", Motion(dive, (40, 0.15, 9)))
+SWOOP = register_motion("swoop", parametric(swoop_curve, 180))
+
+
+def advance(table, grouped=True):
+    """把表中所有行按各自的移动方式推进一个 tick（按移动方式分组，每组一次）
+
+    grouped 为 False 时调用方保证整表是同一种移动方式，直接按整表切片推进。
+    返回表中是否混有多种移动方式。
+    """
+    n = table.count
+    table.phase[:n] += 1
+    motion = table.motion[:n]
+    if not grouped or (motion == motion[0]).all():
+        MOTIONS[motion[0]].step(table, slice(0, n))
+        return False
+    for motion_id in np.unique(motion).tolist():
+        MOTIONS[motion_id].step(table, np.flatnonzero(motion == motion_id))
+    return True
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+背景音乐
+背景音乐通过 pygame.mixer.music 边解码边播放，不像音效那样整首解码进内存
+（背景音乐.mp3 整首解码后约 8 MB）
+"""
+
+import pygame
+
+
+BACKGROUND_MUSIC = "music/背景音乐.mp3"
+
+
+class MusicPlayer:
+    """流式播放的背景音乐
+
+    同一时间只有一首曲目；enabled 为 False 或混音器没有初始化时所有方法直接返回。
+    """
+
+    def __init__(self, assets, volume=0.4, fade_ms=800, enabled=True):
+        self.assets = assets
+        self.volume = volume
+        self.fade_ms = fade_ms
+        self.enabled = enabled and pygame.mixer.get_init() is not None
+        self.current = None
+
+    def play(self, name=BACKGROUND_MUSIC, loops=-1):
+        """淡入播放曲目（默认循环）；已在播放同一曲目时继续播放"""
+        if not self.enabled:
+            return
+        if name == self.current and pygame.mixer.music.get_busy():
+            pygame.mixer.music.unpause()
+            return
+        pygame.mixer.music.load(self.assets.path(name))
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops, fade_ms=self.fade_ms)
+        self.current = name
+
+    def pause(self):
+        """暂停"""
+        if self.enabled:
+            pygame.mixer.music.pause()
+
+    def resume(self):
+        """从暂停处继续"""
+        if self.enabled:
+            pygame.mixer.music.unpause()
+
+    def stop(self):
+        """淡出停止（不阻塞）"""
+        if self.enabled and self.current is not None:
+            pygame.mixer.music.fadeout(self.fade_ms)
+            self.current = None
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+粒子系统（NumPy 结构数组）
+位置、速度、尺寸、颜色、寿命分别存放在连续数组中，
+每帧一次向量化积分重力与寿命衰减，并用掩码剔除死亡粒子
+"""
+
+import numpy as np
+
+from pools import SlotPool
+from surfaces import SurfaceManager
+
+
+class ParticleSystem:
+    """结构数组形式的粒子系统
+
+    与原来的 Particle 对象行为一致：
+    每帧 x += vx, y += vy, vy += gravity, life -= 1，寿命耗尽即移除；
+    绘制时透明度按 life / max_life 线性衰减。
+    max_capacity 为粒子数上限（None 为不限），超出时新发射的一批粒子整体丢弃（见 pools.py）。
+    """
+
+    def __init__(self, capacity=1024, gravity=0.1, rng=None, surfaces=None, max_capacity=None):
+        self.gravity = gravity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        self.pool = SlotPool(max_capacity)
+        self._allocate(self.pool.fit(capacity, 0))
+
+        # 半透明圆盘由 Surface 管理器按 (半径, r, g, b, alpha) 的量化值共享
+        self.surfaces = surfaces if surfaces is not None else SurfaceManager()
+
+    def _allocate(self, capacity):
+        """按容量分配（或扩容）数组，保留已有粒子"""
+        old = None
+        if hasattr(self, "pos"):
+            old = (self.pos, self.vel, self.size, self.color, self.life, self.max_life)
+
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+
+        if old is not None:
+            n = self.count
+            for new_array, old_array in zip(
+                    (self.pos, self.vel, self.size, self.color, self.life, self.max_life), old):
+                new_array[:n] = old_array[:n]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """移除所有粒子"""
+        self.count = 0
+
+    def stats(self):
+        """当前粒子数、容量和槽位复用统计"""
+        return dict(self.pool.stats(), count=self.count, capacity=self.capacity)
+
+    def emit(self, x, y, size, color, speed_x, speed_y, life):
+        """批量发射粒子
+
+        参数可以是标量或长度相同的数组，color 为 (r, g, b) 或 N×3 数组。
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float32))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float32))
+        n = max(len(x), len(y), np.size(size), np.size(speed_x), np.size(speed_y), np.size(life),
+                np.size(color) // 3)
+
+        capacity = self.pool.claim(self.count, n, self.capacity)
+        if capacity is None:
+            return
+        if capacity > self.capacity:
+            self._allocate(capacity)
+
+        start = self.count
+        end = start + n
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.vel[start:end, 0] = speed_x
+        self.vel[start:end, 1] = speed_y
+        self.size[start:end] = size
+        self.color[start:end] = color
+        self.life[start:end] = life
+        self.max_life[start:end] = life
+        self.count = end
+
+    def burst(self, x, y, count, size_range, color_ranges, speed_range, life):
+        """以随机尺寸、颜色和速度发射一批粒子
+
+        各 range 为闭区间 (最小值, 最大值)，color_ranges 为三个通道各自的区间；
+        x、y 可以是标量（同一点爆炸）或长度为 count 的数组。
+        """
+        rng = self.rng
+        low, high = speed_range
+        colors = np.empty((count, 3), dtype=np.uint8)
+        for channel, (channel_low, channel_high) in enumerate(color_ranges):
+            colors[:, channel] = rng.integers(channel_low, channel_high + 1, count)
+
+        self.emit(x, y,
+                  rng.integers(size_range[0], size_range[1] + 1, count),
+                  colors,
+                  rng.integers(low, high + 1, count),
+                  rng.integers(low, high + 1, count),
+                  life)
+
+    def update(self):
+        """一次向量化步进所有粒子，并剔除寿命耗尽的粒子"""
+        n = self.count
+        if not n:
+            return
+
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        pos += vel
+        vel[:, 1] += self.gravity
+        life = self.life[:n]
+        life -= 1
+
+        alive = life > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors == n:
+            return
+
+        for array in (self.pos, self.vel, self.size, self.color, self.life, self.max_life):
+            array[:survivors] = array[:n][alive]
+        self.count = survivors
+
+    def draw(self, screen, alpha=1.0):
+        """绘制所有粒子（透明度与颜色量化后复用缓存的圆盘），返回绘制区域列表
+
+        alpha < 1 时按速度回退到上一 tick 与当前 tick 之间的位置绘制
+        """
+        n = self.count
+        if not n:
+            return []
+
+        opacity = (255 * self.life[:n] / self.max_life[:n]).astype(np.int32)
+        opacity = (opacity & 0xF0) | 0x0F         # 16 级透明度
+        color = (self.color[:n] & 0xE0) | 0x10    # 每通道 8 级颜色
+        size = self.size[:n]
+        pos = self.pos[:n]
+        if alpha < 1:
+            pos = pos - self.vel[:n] * (1 - alpha)
+        left = (pos[:, 0] - size).astype(np.int32)
+        top = (pos[:, 1] - size).astype(np.int32)
+
+        get_disc = self.surfaces.disc
+        return screen.blits([
+            (get_disc(radius, r, g, b, a), (px, py))
+            for radius, (r, g, b), a, px, py in zip(
+                size.tolist(), color.tolist(), opacity.tolist(), left.tolist(), top.tolist())
+            if radius > 0
+        ])
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+弹幕模式
+发射器用声明式参数描述（环形、扇形、螺旋、自机狙、摆动扇形、平行直线），构造时预先算好
+整轮子弹的方向表；每轮发射只做一次整体旋转，再一次调用写进子弹引擎，不按子弹逐个循环。
+
+角度单位为度，0 度竖直向下，正角度偏向 +x（与 sin/cos 分别给出 vx/vy 的约定一致）。
+关卡的 Boss 弹幕在 levels.json 中按 {"emitter": 类型, 发射器参数..., "interval": 发射间隔,
+"duration": 持续时间, "size": [宽, 高], "color": [r, g, b], "damage": 伤害} 描述，
+省略时使用 DEFAULT_PATTERNS（第一关的三种攻击模式）
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from bullets import HOSTILE_OWNER
+
+
+# 一种攻击模式：发射器、发射间隔与持续时间（毫秒）、子弹样式
+Pattern = namedtuple("Pattern", "emitter interval duration size color damage")
+
+DEFAULT_STYLE = {"interval": 500, "duration": 3000, "size": (4, 8), "color": (255, 0, 0), "damage": 1}
+
+# 第一关：扇形射击、三路平行弹幕、直线射击（Boss 出场后按此顺序轮换）
+DEFAULT_PATTERNS = [
+    {"emitter": "fan", "count": 7, "spread": 90, "speed": 6},
+    {"emitter": "line", "count": 3, "spacing": 40, "speed": 5, "interval": 300},
+    {"emitter": "fan", "count": 1, "spread": 0, "speed": 6, "size": [4, 10]},
+]
+
+
+class Emitter:
+    """预计算方向表的发射器
+
+    angles 为整轮子弹相对发射方向的角度，offsets 为各子弹发射点的横向偏移（像素）。
+    每轮的整体旋转 = spin × 轮次 + sweep × sin(2π × 轮次 / period) + 瞄准角（aimed 时）。
+    """
+
+    def __init__(self, angles, speed, offsets=None, spin=0.0, sweep=0.0, period=1, aimed=False):
+        angles = np.radians(np.asarray(angles, dtype=np.float64))
+        self.velocity = (np.column_stack((np.sin(angles), np.cos(angles))) * speed).astype(np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.float32) if offsets is not None else 0
+        self.spin = math.radians(spin)
+        self.sweep = math.radians(sweep)
+        self.period = period
+        self.aimed = aimed
+
+    def __len__(self):
+        return len(self.velocity)
+
+    def rotation(self, volley, aim=0.0):
+        """第 volley 轮的整体旋转角（弧度）"""
+        angle = self.spin * volley
+        if self.sweep:
+            angle += self.sweep * math.sin(2 * math.pi * volley / self.period)
+        if self.aimed:
+            angle += aim
+        return angle
+
+    def velocities(self, volley, aim=0.0):
+        """第 volley 轮各子弹的速度 (vx, vy)"""
+        angle = self.rotation(volley, aim)
+        vx, vy = self.velocity[:, 0], self.velocity[:, 1]
+        if not angle:
+            return vx, vy
+        c, s = math.cos(angle), math.sin(angle)
+        return vx * c + vy * s, vy * c - vx * s
+
+    def fire(self, bullets, x, y, volley, pattern, aim=0.0):
+        """把一整轮子弹写进子弹引擎"""
+        vx, vy = self.velocities(volley, aim)
+        bullets.spawn(x + self.offsets, y, vx, vy, *pattern.size, pattern.color, pattern.damage, HOSTILE_OWNER)
+
+
+def spread_angles(count, spread):
+    """count 发子弹均匀分布在 spread 度的扇面内"""
+    if count == 1:
+        return [0.0]
+    return np.linspace(-spread / 2, spread / 2, count)
+
+
+def fan(count, spread, speed, spin=0.0):
+    """扇形：以正下方为中心"""
+    return Emitter(spread_angles(count, spread), speed, spin=spin)
+
+
+def ring(count, speed, spin=0.0):
+    """环形：一圈均匀分布，spin 为每轮的旋转角"""
+    return Emitter(np.arange(count) * (360 / count), speed, spin=spin)
+
+
+def spiral(arms, speed, spin):
+    """螺旋：arms 条旋臂，每轮旋转 spin 度"""
+    return ring(arms, speed, spin)
+
+
+def aimed(count, spread, speed):
+    """自机狙：以玩家方向为中心的扇形"""
+    return Emitter(spread_angles(count, spread), speed, aimed=True)
+
+
+def wave(count, spread, speed, sweep, period):
+    """摆动扇形：扇形中心以 period 轮为周期左右摆动 sweep 度"""
+    return Emitter(spread_angles(count, spread), speed, sweep=sweep, period=period)
+
+
+def line(count, spacing, speed):
+    """平行直线：count 发子弹横向间隔 spacing 像素一起向下"""
+    return Emitter(np.zeros(count), speed, offsets=(np.arange(count) - (count - 1) / 2) * spacing)
+
+
+EMITTERS = {"fan": fan, "ring": ring, "spiral": spiral, "aimed": aimed, "wave": wave, "line": line}
+
+
+def build_pattern(spec):
+    """由声明式描述构造攻击模式"""
+    spec = dict(spec)
+    kind = spec.pop("emitter")
+    if kind not in EMITTERS:
+        raise ValueError(f"弹幕发射器类型 {kind!r} 不存在")
+    style = {key: spec.pop(key, default) for key, default in DEFAULT_STYLE.items()}
+    return Pattern(EMITTERS[kind](**spec), style["interval"], style["duration"], tuple(style["size"]),
+                   tuple(style["color"]), style["damage"])
+
+
+def build_patterns(specs=None):
+    """由描述列表构造一组攻击模式（省略时为默认的三种）"""
+    return [build_pattern(spec) for spec in (specs or DEFAULT_PATTERNS)]
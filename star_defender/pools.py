@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+槽位池
+子弹引擎、粒子系统和 ECS 原型表都把实体存放在预先分配的连续数组里：移除的行压缩到尾部，
+之后的生成原地复用这些槽位，不再为每个实体分配对象和 pygame.Rect。
+SlotPool 为这些数组提供按类型的容量上限和复用统计（复用、新分配、丢弃与峰值）
+"""
+
+
+class SlotPool:
+    """一种实体的槽位分配策略与统计
+
+    容量不足时按倍数扩容，但不超过 max_capacity（None 为不限）；一批生成会超过上限时整批丢弃，
+    不扩容，也不挤掉已有实体。
+    """
+
+    def __init__(self, max_capacity=None):
+        self.max_capacity = max_capacity
+
+        # 统计（按行计）
+        self.hits = 0        # 复用已分配的槽位
+        self.misses = 0      # 需要扩容才放得下
+        self.dropped = 0     # 超过上限被丢弃
+        self.high_water = 0  # 同时存在的实体数的峰值
+
+    def fit(self, capacity, end):
+        """容纳 end 行所需的容量：从 capacity 起按倍数增长，不超过上限"""
+        capacity = max(capacity, 1)
+        while capacity < end:
+            capacity *= 2
+        if self.max_capacity is not None:
+            capacity = min(capacity, self.max_capacity)
+        return capacity
+
+    def claim(self, count, n, capacity):
+        """登记在已有 count 行之后追加 n 行（当前容量为 capacity）
+
+        返回追加后需要的容量：大于 capacity 时调用方按它扩容；超过上限时返回 None，这一批整体丢弃。
+        """
+        end = count + n
+        if self.max_capacity is not None and end > self.max_capacity:
+            self.dropped += n
+            return None
+
+        reused = max(min(end, capacity) - count, 0)
+        self.hits += reused
+        self.misses += n - reused
+        self.high_water = max(self.high_water, end)
+        return capacity if end <= capacity else self.fit(capacity, end)
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "dropped": self.dropped,
+            "high_water": self.high_water,
+            "max_capacity": self.max_capacity,
+        }
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+帧分析器
+按阶段累计每帧耗时（lap() 只记录两次计时之间的差，关闭时几乎没有开销），
+保留最近若干帧用于滚动 p50/p95/p99 和屏幕浮层曲线，并可导出 Chrome trace-event JSON
+（chrome://tracing 或 https://ui.perfetto.dev 打开）
+"""
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+
+# 帧阶段（显示顺序）；idle 为 clock.tick 等待下一帧的时间，不计入帧耗时
+PHASES = (
+    "events", "timers", "input", "background", "player", "bullets", "enemies", "particles", "power_ups",
+    "spawns", "collisions", "boss", "cleanup", "audio", "draw", "overlay", "present", "idle",
+)
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    """每帧按阶段计时的分析器
+
+    每帧的流程：
+        profiler.begin_frame()
+        ...profiler.lap("events")...    # 记录自上一次 lap 以来的耗时，同一帧内可重复累加
+        profiler.end_frame(counts)      # counts 为返回实体数量字典的函数
+
+    enabled 为 False 时所有方法直接返回。trace_path 不为空时保留最近 trace_frames 帧的
+    逐段计时，save_trace() 写成 Chrome trace-event JSON。visible 控制屏幕浮层（默认与 enabled 相同），
+    只影响 draw()：关闭浮层时若仍在导出 trace，计时照常进行。
+    """
+
+    def __init__(self, phases=PHASES, history=300, enabled=False, trace_path=None, trace_frames=3600,
+                 refresh_frames=10, visible=None):
+        self.phases = tuple(phases)
+        self.index = {name: i for i, name in enumerate(self.phases)}
+        self.enabled = enabled
+        self.visible = enabled if visible is None else visible
+        self.refresh_frames = refresh_frames  # 浮层每隔多少帧重新统计和绘制
+
+        # 最近 history 帧各阶段的耗时（毫秒），按帧循环写入
+        self.history = np.zeros((history, len(self.phases)), dtype=np.float32)
+        self.frames = 0
+
+        # 当前帧
+        self.current = [0] * len(self.phases)
+        self.frame_start = 0
+        self.last = 0
+        self.counts = {}
+
+        # Chrome trace：每帧一个 (开始时间, [(阶段, 开始, 时长)...], 实体数量) 记录
+        self.trace_path = trace_path
+        self.trace = deque(maxlen=trace_frames)
+        self.spans = []
+
+        # 浮层
+        self.font = None
+        self.panel = None
+
+    def toggle(self):
+        """开关屏幕浮层；浮层显示时计时，隐藏后只在导出 trace 时继续计时"""
+        self.visible = not self.visible
+        recording = self.enabled
+        self.enabled = self.visible or bool(self.trace_path)
+        if self.enabled and not recording:
+            self.begin_frame()
+
+    def begin_frame(self):
+        """开始一帧"""
+        if not self.enabled:
+            return
+        self.current = [0] * len(self.phases)
+        self.spans = []
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def lap(self, name):
+        """把自上一次 lap（或帧开始）以来的耗时记到阶段 name 上"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        index = self.index[name]
+        self.current[index] += now - self.last
+        if self.trace_path:
+            self.spans.append((index, self.last, now - self.last))
+        self.last = now
+
+    def end_frame(self, counts=None):
+        """结束一帧，写入历史；counts 为返回实体数量字典的函数（只在开启时调用）"""
+        if not self.enabled:
+            return
+        self.history[self.frames % len(self.history)] = np.array(self.current, dtype=np.float32) / 1e6
+        self.frames += 1
+        self.counts = counts() if counts is not None else {}
+        if self.trace_path:
+            self.trace.append((self.frame_start, self.spans, self.counts))
+
+    def recent(self):
+        """最近记录的各帧（按时间顺序），形状为 (帧数, 阶段数)"""
+        size = len(self.history)
+        if self.frames < size:
+            return self.history[:self.frames]
+        return np.roll(self.history, -(self.frames % size), axis=0)
+
+    def percentiles(self):
+        """各阶段以及整帧（不含 idle）耗时的 (p50, p95, p99)，单位毫秒"""
+        recent = self.recent()
+        if not len(recent):
+            return {}
+        work = recent.sum(axis=1) - recent[:, self.index["idle"]]
+        columns = {"frame": work}
+        columns.update({name: recent[:, i] for i, name in enumerate(self.phases)})
+        return {name: tuple(np.percentile(values, (50, 95, 99)).tolist()) for name, values in columns.items()}
+
+    def draw(self, screen, pos=(8, 120)):
+        """绘制性能浮层：整帧耗时曲线、各阶段百分位和实体数量，返回绘制区域"""
+        if not (self.enabled and self.visible):
+            return None
+        if self.panel is None or self.frames % self.refresh_frames == 0:
+            self.paint_panel()
+        return screen.blit(self.panel, pos)
+
+    def paint_panel(self):
+        """重新统计并绘制浮层"""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        stats = self.percentiles()
+        shown = [name for name in self.phases if name in stats and stats[name][2] >= 0.01]
+        width, graph_height, line_height = 240, 60, 14
+        height = graph_height + line_height * (len(shown) + 3) + 12
+
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+
+        # 最近各帧的整帧耗时曲线，纵轴 0 ~ 2 倍帧预算，黄线为 60fps 预算
+        scale = graph_height / (FRAME_BUDGET_MS * 2)
+        budget_y = 4 + graph_height - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(panel, (255, 220, 0), (4, budget_y), (width - 4, budget_y))
+        recent = self.recent()[-(width - 8):]
+        if len(recent) > 1:
+            work = np.minimum(recent.sum(axis=1) - recent[:, self.index["idle"]], FRAME_BUDGET_MS * 2)
+            points = [(4 + i, 4 + graph_height - int(ms * scale)) for i, ms in enumerate(work.tolist())]
+            pygame.draw.lines(panel, (0, 255, 120), False, points)
+
+        lines = []
+        if "frame" in stats:
+            lines.append(("frame  p50 %.2f  p95 %.2f  p99 %.2f ms" % stats["frame"], (255, 255, 255)))
+        lines += [("%-10s %6.2f %6.2f %6.2f" % ((name,) + stats[name]), (200, 200, 200)) for name in shown]
+        lines.append((" ".join(f"{name} {count}" for name, count in self.counts.items()), (0, 255, 255)))
+        y = graph_height + 8
+        for text, color in lines:
+            panel.blit(self.font.render(text, True, color), (4, y))
+            y += line_height
+        self.panel = panel
+
+    def trace_events(self):
+        """最近记录的帧转换为 Chrome trace-event 列表（时间单位微秒）"""
+        events = []
+        for frame_start, spans, counts in self.trace:
+            end = spans[-1][1] + spans[-1][2] if spans else frame_start
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": frame_start / 1000, "dur": (end - frame_start) / 1000})
+            for index, start, duration in spans:
+                events.append({"name": self.phases[index], "cat": "phase", "ph": "X", "pid": 1, "tid": 2,
+                               "ts": start / 1000, "dur": duration / 1000})
+            if counts:
+                events.append({"name": "entities", "ph": "C", "pid": 1, "ts": frame_start / 1000,
+                               "args": counts})
+        return events
+
+    def save_trace(self, path=None):
+        """写入 Chrome trace-event JSON（未开启 trace 时什么都不做）"""
+        path = path or self.trace_path
+        if not path or not self.trace:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
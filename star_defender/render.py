@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+脏矩形渲染
+记录每帧绘制过的矩形，下一帧只在这些矩形下恢复背景色，
+并用 pygame.display.update(rects) 只推送变化的区域；
+变化区域过大时退回整屏重绘 + flip
+"""
+
+import pygame
+
+
+class DirtyRectRenderer:
+    """脏矩形渲染器
+
+    每帧的流程：
+        full = renderer.begin_frame()   # False 时已在上一帧的矩形下恢复背景
+        ...绘制，并把每次绘制返回的矩形交给 renderer.add()...
+        renderer.end_frame()            # 推送 上一帧矩形 ∪ 本帧矩形
+
+    begin_frame() 返回 True 时调用方需要整屏绘制背景（首帧、invalidate() 之后、
+    或未启用脏矩形模式）。背景必须是 background_color 纯色加上作为实体绘制的星星、行星。
+    """
+
+    def __init__(self, screen, background_color, enabled=True, max_dirty_ratio=0.5, present=True):
+        self.screen = screen
+        self.background_color = background_color
+        self.enabled = enabled
+        self.max_dirty_ratio = max_dirty_ratio  # 脏区域超过屏幕面积的这一比例时整屏 flip
+        self.present = present  # False 时只统计不推送（离屏 Surface，例如无头模式）
+        self.screen_rect = screen.get_rect()
+
+        self.previous = []  # 上一帧绘制过的矩形
+        self.current = []   # 本帧绘制过的矩形
+        self.full_redraw = True
+        self.frame_full = True
+
+        # 统计
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.last_dirty_ratio = 1.0
+
+    def invalidate(self):
+        """下一帧整屏重绘（例如菜单遮罩覆盖整屏、切换游戏状态后）"""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        """开始一帧，返回是否需要整屏绘制背景
+
+        上一帧脏区域超过阈值时也整屏清空：一次整屏填充比逐个矩形恢复更快。
+        """
+        self.current = []
+        self.frame_full = (not self.enabled or self.full_redraw or
+                           self.last_dirty_ratio > self.max_dirty_ratio)
+        if self.frame_full:
+            return True
+
+        fill = self.screen.fill
+        color = self.background_color
+        for rect in self.previous:
+            fill(color, rect)
+        return False
+
+    def add(self, rects):
+        """登记本帧绘制过的区域：Rect、Rect 列表或 None"""
+        if rects is None:
+            return
+        if isinstance(rects, pygame.Rect):
+            self.current.append(rects)
+        else:
+            self.current.extend(rects)
+
+    def end_frame(self):
+        """把本帧的变化推送到显示器"""
+        rects = self.previous + self.current
+        self.previous = self.current
+        self.full_redraw = False
+
+        if self.enabled:
+            # 绘制调用返回的矩形已裁剪到屏幕内；重叠部分会重复计入，估算偏保守
+            dirty_area = sum([rect.width * rect.height for rect in rects])
+            self.last_dirty_ratio = dirty_area / (self.screen_rect.width * self.screen_rect.height)
+        else:
+            self.last_dirty_ratio = 1.0
+
+        if self.frame_full or self.last_dirty_ratio > self.max_dirty_ratio:
+            self.full_frames += 1
+            if self.present:
+                pygame.display.flip()
+        else:
+            self.partial_frames += 1
+            if self.present:
+                pygame.display.update(rects)
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "enabled": self.enabled,
+            "full_frames": self.full_frames,
+            "partial_frames": self.partial_frames,
+            "last_dirty_ratio": self.last_dirty_ratio,
+            "last_rects": len(self.previous),
+        }
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+输入回放
+录制一局游戏每个 tick 的输入，连同本局种子和起始 tick 写入紧凑的二进制文件；
+用同样的种子和输入重新模拟即可逐 tick 复现整局（与渲染帧率和播放速度无关）
+
+文件格式（小端）：
+    头部   "SDRP"  版本(u8)  种子(u64)  起始 tick(u64)  tick 数(u32)
+    记录   重复次数(u16)  标志(u8: bit0 按下, bit1 炸弹)  x(i16)
+连续相同的输入合并为一条记录，玩家不操作时一条记录可覆盖上千个 tick
+"""
+
+import struct
+
+from controls import ControlState, ScriptedControls
+
+
+MAGIC = b"SDRP"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBQQI")
+RECORD = struct.Struct("<HBh")
+
+FIRE = 0x01
+BOMB = 0x02
+
+
+class Replay:
+    """一局游戏的输入记录
+
+    录制时由游戏在每个 tick 调用 append()；回放时 controls() 返回逐 tick 重放的输入源。
+    """
+
+    def __init__(self, seed, start_tick=0, states=None):
+        self.seed = seed
+        self.start_tick = start_tick
+        self.states = list(states) if states is not None else []
+
+    def __len__(self):
+        return len(self.states)
+
+    def append(self, state):
+        """记录一个 tick 的输入"""
+        self.states.append(state)
+
+    def controls(self):
+        """逐 tick 重放本记录的输入源"""
+        return ScriptedControls(self.states)
+
+    def encode(self):
+        """编码为二进制"""
+        chunks = [HEADER.pack(MAGIC, VERSION, self.seed, self.start_tick, len(self.states))]
+        previous = None
+        count = 0
+        for state in self.states:
+            record = ((FIRE if state.fire else 0) | (BOMB if state.bomb else 0),
+                      max(-32768, min(32767, int(state.x))))
+            if record == previous and count < 0xFFFF:
+                count += 1
+                continue
+            if previous is not None:
+                chunks.append(RECORD.pack(count, *previous))
+            previous = record
+            count = 1
+        if previous is not None:
+            chunks.append(RECORD.pack(count, *previous))
+        return b"".join(chunks)
+
+    @classmethod
+    def decode(cls, data):
+        """从二进制解码"""
+        magic, version, seed, start_tick, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是支持的回放文件（{magic!r}, 版本 {version}）")
+
+        states = []
+        for count, flags, x in RECORD.iter_unpack(data[HEADER.size:]):
+            states.extend([ControlState(bool(flags & FIRE), x, bool(flags & BOMB))] * count)
+        if len(states) != ticks:
+            raise ValueError(f"回放文件已损坏：应有 {ticks} 个 tick，实际 {len(states)} 个")
+        return cls(seed, start_tick, states)
+
+    def save(self, path):
+        """写入回放文件"""
+        with open(path, "wb") as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        """读取回放文件"""
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+随机数流
+每局游戏由一个种子派生出按子系统拆分的独立随机数流（敌人生成、敌机行为、特效、背景），
+某个子系统多取或少取随机数不会影响其它子系统，同一种子加同样的输入即可复现整局
+"""
+
+import random
+import zlib
+
+import numpy as np
+
+
+class RandomStreams:
+    """由一个种子派生的命名随机数流
+
+    stream(name) 返回 random.Random，generator(name) 返回 numpy Generator；
+    同名的流只创建一次。reseed() 原地重新播种所有已创建的流，
+    持有流引用的对象（粒子系统、背景等）不需要更新引用。
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.streams = {}
+        self.generators = {}
+
+    def stream(self, name):
+        """名为 name 的 random.Random 流"""
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = random.Random(self.stream_seed(name))
+        return stream
+
+    def generator(self, name):
+        """名为 name 的 numpy 随机数生成器"""
+        generator = self.generators.get(name)
+        if generator is None:
+            generator = self.generators[name] = np.random.Generator(self.bit_generator(name))
+        return generator
+
+    def reseed(self, seed):
+        """用新种子原地重新播种所有流"""
+        self.seed = seed
+        for name, stream in self.streams.items():
+            stream.seed(self.stream_seed(name))
+        for name, generator in self.generators.items():
+            generator.bit_generator.state = self.bit_generator(name).state
+
+    def stream_seed(self, name):
+        """子流的种子（字符串种子在不同进程和平台上结果一致）"""
+        return f"{self.seed}:{name}"
+
+    def bit_generator(self, name):
+        return np.random.PCG64([self.seed, zlib.crc32(name.encode())])
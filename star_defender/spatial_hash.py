@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+空间哈希（均匀网格）粗筛
+用于碰撞检测，避免子弹 × 敌人的全量两两比较
+"""
+
+import pygame
+
+
+# 被移除对象在格子中的占位矩形，永远不会与任何矩形相交
+_EMPTY_RECT = pygame.Rect(0, 0, 0, 0)
+
+
+class SpatialHash:
+    """均匀网格空间哈希
+
+    每帧用 rebuild() 重建，格子中保存对象在原列表中的下标及其矩形，
+    下标在每个格子内保持升序，因此"列表中最靠前的命中对象"与逐个比较的结果一致。
+
+    rebuild() 的 reach 参数为查询矩形的最大宽高：对象会额外登记到
+    向左上方扩展 reach 的格子里，这样不超过 reach 的查询矩形（子弹）
+    只需查看其左上角所在的一个格子，并直接交给 Rect.collidelist 在C层完成精确判定。
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.rects = []
+        self.reach = (0, 0)
+
+        # 复用的查询矩形，查询 (left, top, width, height) 元组时不必分配新 Rect
+        self._probe = pygame.Rect(0, 0, 0, 0)
+
+    def clear(self):
+        """清空网格"""
+        self.cells.clear()
+        self.rects = []
+
+    def _cell_range(self, left, top, right, bottom):
+        """矩形覆盖的格子坐标范围"""
+        cs = self.cell_size
+        return left // cs, (right - 1) // cs, top // cs, (bottom - 1) // cs
+
+    def rebuild(self, rects, reach=(0, 0)):
+        """根据矩形列表重建网格，下标即矩形在列表中的位置"""
+        self.cells.clear()
+        self.rects = rects
+        self.reach = reach
+        reach_w, reach_h = reach
+        cs = self.cell_size
+        cells = self.cells
+
+        for index, rect in enumerate(rects):
+            left, top, width, height = rect
+            x0 = (left - reach_w) // cs
+            x1 = (left + width - 1) // cs
+            y0 = (top - reach_h) // cs
+            y1 = (top + height - 1) // cs
+
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is None:
+                        cells[(cx, cy)] = ([index], [rect])
+                    else:
+                        cell[0].append(index)
+                        cell[1].append(rect)
+
+    def remove(self, index):
+        """把对象从网格中移除（用空矩形占位，保持格子内的下标顺序）"""
+        rect = self.rects[index]
+        reach_w, reach_h = self.reach
+        x0, x1, y0, y1 = self._cell_range(rect.left - reach_w, rect.top - reach_h,
+                                          rect.right, rect.bottom)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                indices, rects = self.cells[(cx, cy)]
+                rects[indices.index(index)] = _EMPTY_RECT
+
+    def first_hit(self, rect):
+        """返回与 rect 相交的最小下标，没有则返回 -1"""
+        reach_w, reach_h = self.reach
+        if rect.width > reach_w or rect.height > reach_h:
+            hits = self.query_colliding(rect)
+            return hits[0] if hits else -1
+
+        cs = self.cell_size
+        cell = self.cells.get((rect.left // cs, rect.top // cs))
+        if cell is None:
+            return -1
+
+        hit = rect.collidelist(cell[1])
+        return -1 if hit < 0 else cell[0][hit]
+
+    def iter_first_hits(self, boxes):
+        """依次对每个查询矩形求 first_hit，只产出命中的 (查询下标, 对象下标)
+
+        boxes 为 Rect 或 (left, top, width, height) 序列。
+        生成器在两次产出之间读取的是格子的当前状态，
+        调用方可以在循环体中 remove() 被击毁的对象，影响后续查询。
+        """
+        cs = self.cell_size
+        get_cell = self.cells.get
+        reach_w, reach_h = self.reach
+        probe = self._probe
+
+        for query_index, (left, top, width, height) in enumerate(boxes):
+            if width > reach_w or height > reach_h:
+                hits = self.query_colliding(pygame.Rect(left, top, width, height))
+                if hits:
+                    yield query_index, hits[0]
+                continue
+
+            cell = get_cell((left // cs, top // cs))
+            if cell is not None:
+                probe.update(left, top, width, height)
+                hit = probe.collidelist(cell[1])
+                if hit >= 0:
+                    yield query_index, cell[0][hit]
+
+    def query(self, rect):
+        """返回候选下标（升序），只做格子级别的粗筛"""
+        x0, x1, y0, y1 = self._cell_range(rect.left, rect.top, rect.right, rect.bottom)
+        cells = self.cells
+
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell[0])
+        return sorted(found)
+
+    def query_colliding(self, rect):
+        """返回与 rect 实际相交的下标（升序），已移除的对象不会返回"""
+        x0, x1, y0, y1 = self._cell_range(rect.left, rect.top, rect.right, rect.bottom)
+        cells = self.cells
+
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    indices = cell[0]
+                    found.update(indices[i] for i in rect.collidelistall(cell[1]))
+        return sorted(found)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+精灵缓存
+程序化绘制的战机、道具只在第一次用到时画进一张透明 Surface，
+之后每帧一次 blit；按 (类型, 状态) 缓存，带失效与内存统计
+"""
+
+import pygame
+
+
+# 不透明精灵的透明色键（品红，游戏中没有使用这个颜色）
+COLORKEY = (255, 0, 255)
+
+
+class SpriteCache:
+    """按键缓存预渲染的精灵
+
+    键通常是 (类型名, 状态...) 元组，例如 ("PowerUp", "bullet", 0)。
+    每个精灵记录一个绘制偏移：绘制内容可以超出实体矩形（机翼、引擎火焰），
+    blit 位置 = 实体坐标 + 偏移。
+
+    max_bytes 为缓存占用的内存上限，超出后按插入顺序淘汰最早的精灵。
+
+    没有半透明像素的精灵可以用 opaque=True 创建：画布改用色键透明，
+    blit 时不做逐像素混合，大约比 convert_alpha 的精灵快一倍。
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.sprites = {}  # 键 -> (surface, (offset_x, offset_y))
+        self.bytes = 0
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def __contains__(self, key):
+        return key in self.sprites
+
+    @staticmethod
+    def surface_bytes(surface):
+        """Surface 像素数据占用的字节数"""
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get(self, key, size, offset, paint, opaque=False):
+        """获取精灵，不存在时创建
+
+        size 为精灵画布大小，offset 为实体坐标到画布左上角的偏移（通常为负），
+        paint(surface, x, y) 在画布上以 (x, y) 为实体左上角绘制一次。
+        """
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        if opaque:
+            surface = pygame.Surface(size)
+            surface.fill(COLORKEY)
+        else:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+        paint(surface, -offset[0], -offset[1])
+
+        # 与显示格式一致的像素格式 blit 最快；没有显示窗口时保持原样
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert() if opaque else surface.convert_alpha()
+        if opaque:
+            surface.set_colorkey(COLORKEY)
+
+        sprite = (surface, offset)
+        self.sprites[key] = sprite
+        self.bytes += self.surface_bytes(surface)
+        self._evict()
+        return sprite
+
+    def _evict(self):
+        """超出内存上限时淘汰最早创建的精灵（至少保留刚加入的一个）"""
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            key = next(iter(self.sprites))
+            surface, _ = self.sprites.pop(key)
+            self.bytes -= self.surface_bytes(surface)
+            self.evictions += 1
+
+    def blit(self, screen, key, x, y, size, offset, paint, opaque=False):
+        """把精灵绘制到 screen 上 (x, y) 处的实体位置，返回绘制区域"""
+        surface, (offset_x, offset_y) = self.get(key, size, offset, paint, opaque)
+        return screen.blit(surface, (x + offset_x, y + offset_y))
+
+    def invalidate(self, kind=None):
+        """使缓存失效
+
+        kind 为 None 时清空全部；否则只清除键的第一项等于 kind 的精灵，
+        例如某个类型的外观改变后调用 invalidate("Boss")。
+        """
+        if kind is None:
+            self.sprites.clear()
+            self.bytes = 0
+            return
+
+        for key in [key for key in self.sprites if key[0] == kind]:
+            surface, _ = self.sprites.pop(key)
+            self.bytes -= self.surface_bytes(surface)
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "sprites": len(self.sprites),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+视差星空
+星星按速度分桶，每一层预先画进一张两倍屏高的透明贴图，
+每帧只需把贴图按滚动偏移 blit 两次；星星数量增加到上千颗也不影响每帧开销
+"""
+
+import random
+
+import numpy as np
+import pygame
+
+
+class StarLayer:
+    """一层匀速滚动的星星贴图
+
+    贴图高度为 tile_height，纵向首尾相接循环滚动。星星不跨越贴图上下边缘，
+    因此每颗星在贴图中的矩形就是它在屏幕上的完整外观。
+    """
+
+    def __init__(self, width, tile_height, speed, stars):
+        self.width = width
+        self.tile_height = tile_height
+        self.speed = speed
+        self.offset = 0.0
+
+        # stars 为 (x, y, 半径, 颜色) 列表，坐标为贴图内的圆心
+        self.x = np.array([star[0] for star in stars], dtype=np.int32)
+        self.y = np.array([star[1] for star in stars], dtype=np.int32)
+        self.radius = np.array([star[2] for star in stars], dtype=np.int32)
+
+        self.tile = pygame.Surface((width, tile_height))
+        for x, y, radius, color in stars:
+            pygame.draw.circle(self.tile, color, (x, y), radius)
+        if pygame.display.get_surface() is not None:
+            self.tile = self.tile.convert()
+
+        # 逐颗截取用普通色键副本（RLE 贴图截取局部区域很慢）
+        self.star_tile = self.tile.copy()
+        self.star_tile.set_colorkey((0, 0, 0))
+
+        # 整层绘制的稀疏贴图用 RLE 色键，blit 时直接跳过大段透明像素
+        self.tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+
+    def update(self):
+        """滚动一帧"""
+        self.offset = (self.offset + self.speed) % self.tile_height
+
+    def scroll(self, alpha=1.0):
+        """绘制用的整数偏移，alpha < 1 时在上一 tick 与当前 tick 之间插值"""
+        return int((self.offset - self.speed * (1 - alpha)) % self.tile_height)
+
+    def draw(self, screen, alpha=1.0):
+        """整层绘制：贴图按偏移 blit 两次覆盖屏幕"""
+        offset = self.scroll(alpha)
+        screen.blit(self.tile, (0, offset))
+        screen.blit(self.tile, (0, offset - self.tile_height))
+
+    def draw_stars(self, screen, alpha=1.0):
+        """逐颗绘制屏幕内的星星（从贴图中截取），返回各自的绘制区域
+
+        与 draw() 的画面一致，供脏矩形模式记录每颗星的位置。
+        """
+        offset = self.scroll(alpha)
+        screen_height = screen.get_height()
+        radius = self.radius
+
+        # 每颗星在屏幕上的圆心 y，取两次 blit 中落在屏幕附近的那一个
+        y = self.y + offset
+        y = np.where(y - radius >= screen_height, y - self.tile_height, y)
+        visible = np.flatnonzero((y + radius >= 0) & (y - radius < screen_height))
+        if not visible.size:
+            return []
+
+        left = (self.x[visible] - radius[visible]).tolist()
+        tile_top = (self.y[visible] - radius[visible]).tolist()
+        top = (y[visible] - radius[visible]).tolist()
+        sizes = (radius[visible] * 2 + 1).tolist()
+        tile = self.star_tile
+        return screen.blits([
+            (tile, (sx, sy), (sx, ty, size, size))
+            for sx, sy, ty, size in zip(left, top, tile_top, sizes)
+        ])
+
+
+class Starfield:
+    """多层视差星空
+
+    速度在 speed_range 内均匀分布的星星按速度分到 layers 个桶里，
+    每个桶以桶内平均速度整体滚动。
+    """
+
+    def __init__(self, width, height, star_count=100, layers=3, speed_range=(0.5, 2.0),
+                 size_range=(1, 3), rng=random):
+        self.width = width
+        self.height = height
+        tile_height = height * 2
+
+        low, high = speed_range
+        buckets = [[] for _ in range(layers)]
+        for _ in range(star_count):
+            speed = rng.uniform(low, high)
+            radius = rng.randint(*size_range)
+            star = (rng.randint(0, width), rng.randint(radius, tile_height - radius - 1), radius,
+                    (rng.randint(100, 255), rng.randint(100, 255), rng.randint(100, 255)))
+            bucket = min(int((speed - low) / (high - low) * layers), layers - 1)
+            buckets[bucket].append((speed, star))
+
+        # 远处（慢）的层先画
+        self.layers = []
+        for bucket in buckets:
+            if bucket:
+                speed = sum(speed for speed, _ in bucket) / len(bucket)
+                self.layers.append(StarLayer(width, tile_height, speed, [star for _, star in bucket]))
+
+    def update(self):
+        """滚动所有层"""
+        for layer in self.layers:
+            layer.update()
+
+    def draw(self, screen, track=False, alpha=1.0):
+        """绘制所有层
+
+        track=True 时逐颗绘制并返回每颗星的绘制区域（脏矩形模式），
+        否则整层 blit 并返回整个屏幕区域。
+        """
+        if track:
+            rects = []
+            for layer in self.layers:
+                rects += layer.draw_stars(screen, alpha)
+            return rects
+
+        for layer in self.layers:
+            layer.draw(screen, alpha)
+        return [screen.get_rect()]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Surface 资源管理
+菜单遮罩、子弹发光层、粒子圆盘等临时 Surface 按尺寸和颜色只创建一次，
+之后共享同一个只读 Surface，并统计每帧避免的分配次数
+"""
+
+import pygame
+
+
+def paint_disc(radius, color):
+    """创建 2*radius 见方的透明画布并画上圆盘"""
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (radius, radius), radius)
+    return surface
+
+
+class SurfaceManager:
+    """按键共享的只读 Surface
+
+    调用方拿到的 Surface 被所有使用者共享，不能修改（包括 set_alpha）。
+    缓存条目超过 max_entries 时整体清空重建，防止颜色/尺寸组合无限增长。
+    """
+
+    def __init__(self, max_entries=8192):
+        self.max_entries = max_entries
+        self.surfaces = {}
+
+        # 累计统计
+        self.built = 0    # 实际创建的 Surface
+        self.reused = 0   # 复用已有 Surface，即避免的分配
+
+        # 上一帧的统计（end_frame() 时更新）
+        self.frame_start = (0, 0)
+        self.last_frame = {"built": 0, "avoided": 0}
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(self, key, build, *args):
+        """获取 key 对应的 Surface，不存在时调用 build(*args) 创建"""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.reused += 1
+            return surface
+
+        if len(self.surfaces) >= self.max_entries:
+            self.surfaces.clear()
+        surface = self.surfaces[key] = build(*args)
+        self.built += 1
+        return surface
+
+    def overlay(self, size, color, alpha):
+        """整体半透明的纯色遮罩"""
+        def build():
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill(color)
+            surface.set_alpha(alpha)
+            return surface
+
+        return self.get(("overlay", size, tuple(color), alpha), build)
+
+    def glow(self, width, height, color, pad=3):
+        """矩形发光层：四周各扩出 pad 像素的半透明矩形画布"""
+        def build():
+            surface = pygame.Surface((width + pad * 2, height + pad * 2), pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, (pad, pad, width, height))
+            return surface
+
+        return self.get(("glow", width, height, tuple(color), pad), build)
+
+    def disc(self, radius, r, g, b, alpha):
+        """半透明圆盘（尺寸为 2*radius）
+
+        每帧为每个粒子调用，绘制函数在模块级定义，命中缓存时不创建闭包。
+        """
+        return self.get(("disc", radius, r, g, b, alpha), paint_disc, radius, (r, g, b, alpha))
+
+    def end_frame(self):
+        """结束一帧，记录这一帧创建和避免的分配次数"""
+        built, reused = self.frame_start
+        self.last_frame = {"built": self.built - built, "avoided": self.reused - reused}
+        self.frame_start = (self.built, self.reused)
+        return self.last_frame
+
+    def stats(self):
+        """统计信息"""
+        return {
+            "entries": len(self.surfaces),
+            "built": self.built,
+            "avoided": self.reused,
+            "last_frame_built": self.last_frame["built"],
+            "last_frame_avoided": self.last_frame["avoided"],
+        }
@@ -53,6 +53,829 @@ def test_game_class():
         print(f"✗ 游戏主类导入失败: {e}")
         return False
 
+def test_collision_broadphase():
+    """测试空间哈希碰撞检测与逐对比较结果一致"""
+    from benchmark import build_collision_scene, check_collisions_naive, collision_outcome
+    from main import StarDefender
+    
+    game = StarDefender()
+    for seed in range(20):
+        build_collision_scene(game, 300, 60, seed)
+        check_collisions_naive(game)
+        expected = collision_outcome(game)
+        
+        build_collision_scene(game, 300, 60, seed)
+        game.check_collisions()
+        assert collision_outcome(game) == expected, f"空间哈希碰撞结果不一致 (seed={seed})"
+    
+    # 重叠的敌人中先命中最早出场的，与表的顺序无关
+    from bullets import PLAYER_OWNER
+    from enemies import MEDIUM, SMALL
+    game.reset_game()
+    medium = game.enemies.spawn(MEDIUM, 100, 100, health=3)
+    small = game.enemies.spawn(SMALL, 100, 100, health=3)
+    game.bullets.spawn(110, 110, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)
+    game.check_collisions()
+    health = [int(table.health[row]) for table, row in map(game.enemies.locate, (medium, small))]
+    assert health == [2, 3], "子弹没有命中最早出场的敌人"
+    
+    print("✓ 空间哈希碰撞检测结果一致")
+
+def test_object_pools():
+    """测试子弹、粒子和原型表的槽位复用、容量上限与统计"""
+    from bullets import BulletEngine, PLAYER_OWNER
+    from enemies import MEDIUM, SMALL, EnemyWorld
+    from particles import ParticleSystem
+    
+    bullets = BulletEngine(capacity=2, max_capacity=4)
+    bullets.spawn([0, 10], 0, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)
+    bullets.spawn(20, 0, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)  # 扩容到上限
+    bullets.spawn([30, 40], 0, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)  # 超出上限，整排丢弃
+    bullets.remove([0, 1])
+    bullets.spawn(50, 0, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)  # 原地复用移除后空出的槽位
+    stats = bullets.stats()
+    assert bullets.pos[:len(bullets), 0].tolist() == [20, 50], f"子弹上限或复用不正确: {bullets.pos[:len(bullets)]}"
+    assert (stats["hits"], stats["misses"], stats["dropped"], stats["high_water"], stats["capacity"]) == \
+            (3, 1, 2, 3, 4), f"子弹槽位统计不正确: {stats}"
+    
+    particles = ParticleSystem(capacity=8, max_capacity=4)
+    particles.emit([0, 1, 2], 0, 3, (255, 255, 255), 0, 0, 10)
+    particles.emit([3, 4], 0, 3, (255, 255, 255), 0, 0, 10)
+    stats = particles.stats()
+    assert len(particles) == 3 and stats["capacity"] == 4 and stats["dropped"] == 2, f"粒子上限不正确: {stats}"
+    
+    # 原型表：达到上限后不再生成也不扩容，其他类型不受影响
+    enemies = EnemyWorld(capacity=1, limits={SMALL: 2})
+    scouts = [enemies.spawn(SMALL, 100, 0) for _ in range(3)]
+    assert scouts[2] is None and enemies.spawn(MEDIUM, 100, 0) is not None, "原型表上限不正确"
+    assert not enemies[SMALL].reserve(10), "预留容量超过了原型表上限"
+    stats = enemies.stats()[SMALL]
+    assert (stats["hits"], stats["misses"], stats["dropped"], stats["high_water"], stats["capacity"]) == \
+            (1, 1, 1, 2, 2), f"原型表槽位统计不正确: {stats}"
+    
+    print("✓ 槽位复用、容量上限与统计正常")
+
+def test_entity_list():
+    """测试实体容器的标记删除与压缩"""
+    from entities import EntityList
+    from main import PowerUp
+    
+    items = [PowerUp(i, 0, "bullet") for i in range(6)]
+    entities = EntityList()
+    for item in items:
+        entities.append(item)
+    
+    # 迭代中删除当前元素和尚未访问的元素
+    visited = []
+    for item in entities:
+        visited.append(item.x)
+        if item.x == 1:
+            entities.remove(item)
+            entities.remove(items[3])
+    entities.remove(items[1])  # 重复删除应被忽略
+    
+    assert visited == [0, 1, 2, 4, 5] and len(entities) == 4, f"实体容器迭代结果不正确: {visited}"
+    
+    entities.compact()
+    assert [item.x for item in entities.live()] == [0, 2, 4, 5], "实体容器压缩后顺序不正确"
+    
+    print("✓ 实体容器标记删除正常")
+
+def test_ecs_world():
+    """测试 ECS：按组件查询原型表，批量移除保持顺序，拼接整体读写和定位，敌机系统"""
+    import numpy as np
+    from ecs import World
+    from enemies import BOSS, MEDIUM, SMALL, EnemyWorld
+    
+    world = World({"position": {"pos": (np.float64, 2)}, "health": {"health": (np.int32, 0)},
+                   "tag": {"owner": (object, 0)}})
+    world.add_archetype("rock", ("position",), capacity=2)
+    world.add_archetype("ship", ("position", "health", "tag"), capacity=2)
+    rocks = world.spawn("rock", 3, pos=[(0, 0), (1, 1), (2, 2)])
+    ships = world.spawn("ship", 2, pos=(5, 5), health=[1, 2], owner="fleet")
+    assert world["rock"].resizes == 1 and world["rock"].capacity == 4 and len(world) == 5, \
+            f"原型表扩容不正确: {world.stats()}"
+    assert [table.name for table in world.query("position")] == ["rock", "ship"] and \
+            [table.name for table in world.query("health")] == ["ship"], "按组件查询原型表不正确"
+    
+    world["rock"].remove([1])
+    assert world["rock"]["entity"].tolist() == [rocks[0], rocks[2]] and world.locate(rocks[1]) == (None, -1), \
+            "移除后剩余行的顺序或定位不正确"
+    
+    everything = world.select("position")
+    pos = everything["pos"]
+    pos[:, 1] += 10
+    everything["pos"] = pos
+    table, row = everything.locate(3)
+    assert (table.name, row) == ("ship", 1) and world["ship"].pos[1].tolist() == [5, 15] and \
+            world["rock"].pos[1].tolist() == [2, 12], "整体读写或下标定位不正确"
+    everything.remove([0, 2])
+    assert world["ship"]["entity"].tolist() == [ships[1]] and world["ship"].owner[1] is None, "整体移除不正确，或对象列没有清空"
+    
+    # 敌机系统：正弦移动、出界剔除、Boss 不参与碰撞
+    enemies = EnemyWorld()
+    scout = enemies.spawn(SMALL, 100, 590)
+    enemies.spawn(MEDIUM, 200, 100)
+    enemies.spawn(BOSS, 300, -150, health=50)
+    enemies.move()
+    scouts = enemies[SMALL]
+    assert abs(scouts.pos[0, 0] - (100 + np.sin(0.02) * 8)) <= 0.01 and scouts.pos[0, 1] == 594 and \
+            scouts.prev[0].tolist() == [100, 590], f"正弦移动不正确: {scouts.pos[0]}"
+    enemies.cull(592)
+    assert enemies.locate(scout) == (None, -1) and len(enemies.select("collider")) == 1 and len(enemies) == 2, \
+            "出界剔除或碰撞查询不正确"
+    
+    print("✓ ECS 查询、移除、整体读写与敌机系统正常")
+
+def test_enemy_motion():
+    """测试移动系统：正弦查表，同一张表中不同移动方式分组推进，俯冲、参数化路径与自定义移动方式"""
+    import math
+    import random
+    import numpy as np
+    from enemies import SMALL, EnemyWorld
+    from motion import MOTIONS, Motion, SINE_TABLE_SIZE, parametric, register_motion, sine
+    from waves import compile_level, load_levels
+    
+    angles = np.linspace(-20, 20, 1001)
+    assert np.abs(sine(angles) - np.sin(angles)).max() <= math.pi / SINE_TABLE_SIZE + 1e-9, "正弦查表误差过大"
+    
+    # 同一张表中：默认正弦、直线、俯冲、S 形路径、自定义路径，各组结果与单独推进一致
+    register_motion("test_zigzag", parametric(lambda t: (np.abs(t - 0.5) * 40, t * 100), 20))
+    register_motion("test_hover", Motion(lambda table, rows: None))
+    motions = [None, "straight", "dive", "swoop", "test_zigzag", "test_hover"]
+    mixed = EnemyWorld()
+    alone = []
+    for i, motion in enumerate(motions):
+        mixed.spawn(SMALL, 100 + i, 0, motion=motion)
+        world = EnemyWorld()
+        world.spawn(SMALL, 100 + i, 0, motion=motion)
+        alone.append(world)
+    for _ in range(120):
+        mixed.move()
+        for world in alone:
+            world.move()
+    scouts = mixed[SMALL]
+    expected = np.array([world[SMALL].pos[0] for world in alone])
+    assert np.array_equal(scouts.pos[:len(motions)], expected), "分组推进与单独推进的结果不一致"
+    
+    # 俯冲：延迟过后加速到上限；直线速度不变；悬停不动
+    assert scouts.vel[2, 1] == MOTIONS[2].params[2] and scouts.pos[1].tolist() == [101, 480] and \
+            scouts.pos[5].tolist() == [105, 0], f"俯冲、直线或自定义移动不正确: {scouts.pos[:len(motions)].tolist()}"
+    
+    # 参数化路径：走完后沿最后一段方向匀速离开，速度列为实际位移
+    assert np.allclose(scouts.pos[4], [104 + 20 + 100 * 2, 100 + 100 * 5]) and \
+            np.allclose(scouts.vel[4], [2, 5]), f"参数化路径不正确: {scouts.pos[4].tolist()} {scouts.vel[4].tolist()}"
+    
+    # 整表都是俯冲时再生成默认移动的侦察机：表要标记为混合，新行按自己的方式移动
+    world = EnemyWorld()
+    world.spawn(SMALL, 100, -50, motion="dive")
+    world.move()
+    world.spawn(SMALL, 200, -50)
+    world.move()
+    assert world[SMALL].pos[1, 1] != -50, "整表同为俯冲后生成的默认移动敌机没有移动"
+    
+    # 关卡中的波次可以指定移动方式
+    levels = load_levels()
+    definition = {"waves": [{"type": "line", "at": 0, "enemy": "small", "count": 2, "motion": "dive"}],
+                  "boss": {"at": 1000}}
+    events = compile_level(definition, levels["enemies"], random.Random(0), 60, 480, 1000)
+    assert [event.motion for event in events] == ["dive", "dive", None], "波次的移动方式没有编进时间线"
+    
+    print("✓ 移动系统分组推进与参数化路径正常")
+
+def test_particle_system():
+    """测试粒子系统的积分与剔除"""
+    from particles import ParticleSystem
+    
+    particles = ParticleSystem(capacity=2)
+    particles.emit([0, 10, 20], [0, 0, 0], 2, (255, 0, 0), 1, [0, 1, 2], [1, 2, 3])
+    particles.update()
+    
+    # 第一颗粒子寿命耗尽被剔除，剩余粒子按重力积分
+    assert len(particles) == 2, f"粒子剔除数量不正确: {len(particles)}"
+    assert particles.pos[:2].tolist() == [[11, 1], [21, 2]] and abs(particles.vel[0, 1] - 1.1) <= 1e-6, \
+            "粒子积分结果不正确"
+    
+    particles.burst(100, 100, 8, (1, 5), ((200, 255), (50, 150), (0, 0)), (-5, 5), 60)
+    sizes = particles.size[2:10]
+    assert len(particles) == 10 and sizes.min() >= 1 and sizes.max() <= 5, "粒子批量发射不正确"
+    
+    print("✓ 粒子系统积分与剔除正常")
+
+def test_bullet_engine():
+    """测试子弹引擎的速度积分、出界剔除和批量重叠查询"""
+    from bullets import BulletEngine, PLAYER_OWNER, HOSTILE_OWNER
+    
+    bullets = BulletEngine(capacity=2)
+    bullets.spawn(100, 100, (-3, 0, 3), 6, 4, 8, (255, 0, 0), 1, HOSTILE_OWNER)
+    bullets.spawn(100, 0, 0, -10, 4, 8, (255, 255, 255), 1, PLAYER_OWNER)
+    bullets.spawn(100, -50, 0, 5, 4, 8, (255, 0, 0), 1, HOSTILE_OWNER)  # 从画面上方射入
+    bullets.update(480, 800)
+    
+    # 扇形子弹沿各自的 x 速度散开，飞出顶部的玩家子弹被剔除，射入的子弹保留
+    assert bullets.pos[:len(bullets)].tolist() == [[97, 106], [100, 106], [103, 106], [100, -45]], \
+            f"子弹积分或剔除不正确: {bullets.pos[:len(bullets)].tolist()}"
+    
+    hits = bullets.overlapping(pygame.Rect(99, 100, 4, 10), HOSTILE_OWNER).tolist()
+    assert hits == [0, 1], f"子弹批量重叠查询不正确: {hits}"
+    
+    bullets.remove(hits)
+    assert len(bullets) == 2 and bullets.indices_of(PLAYER_OWNER).size == 0, "子弹批量移除不正确"
+    
+    print("✓ 子弹引擎积分、剔除与查询正常")
+
+def test_sprite_cache():
+    """测试精灵缓存与程序化绘制结果一致，以及失效和内存上限"""
+    from main import PowerUp, SPRITE_CACHE
+    from enemies import SMALL, EnemyWorld, paint_small_scout
+    from sprites import SpriteCache
+    
+    pygame.init()
+    power_up = PowerUp(100, 100, "bomb")
+    world = EnemyWorld()
+    world.spawn(SMALL, 100, 100)
+    for name, paint, draw in (("SmallScout", paint_small_scout, lambda screen: world.draw(screen, SPRITE_CACHE)),
+                              ("PowerUp", power_up.paint, power_up.draw)):
+        painted = pygame.Surface((240, 240))
+        cached = pygame.Surface((240, 240))
+        paint(painted, 100, 100)
+        draw(cached)
+        assert pygame.image.tobytes(painted, "RGB") == pygame.image.tobytes(cached, "RGB"), \
+                f"{name} 精灵与程序化绘制结果不一致"
+    
+    # 每张 10×10 的精灵占 400 字节，上限只够放两张
+    cache = SpriteCache(max_bytes=800)
+    paint = lambda surface, x, y: surface.fill((255, 0, 0), (x, y, 4, 4))
+    for kind in ("a", "b", "c"):
+        cache.get((kind, 0), (10, 10), (0, 0), paint)
+    cache.get(("c", 0), (10, 10), (0, 0), paint)
+    stats = cache.stats()
+    assert ("a", 0) not in cache and stats["bytes"] == 800 and stats["evictions"] == 1 and stats["hits"] == 1, \
+            f"精灵缓存的内存统计或淘汰不正确: {stats}"
+    
+    cache.invalidate("b")
+    assert ("b", 0) not in cache and cache.stats()["bytes"] == 400, "精灵缓存按类型失效不正确"
+    
+    print("✓ 精灵缓存绘制、失效与内存统计正常")
+
+def test_meteor_atlas():
+    """测试陨石旋转帧图集：同一形状种子共享图集，纹理不再逐帧闪烁"""
+    import random
+    from main import SPRITE_CACHE
+    from enemies import METEOR, METEOR_FRAMES, EnemyWorld, MeteorShape
+    
+    pygame.init()
+    assert MeteorShape(3).__dict__ == MeteorShape(3).__dict__, "同一形状种子的陨石外观不一致"
+    
+    # 同一形状、同样的旋转角取同一帧，转过一帧的角度后画面改变
+    rng = random.Random(3)
+    shape = MeteorShape(3)
+    frames = []
+    for rotation in (40, 40, 40 + 360 // METEOR_FRAMES):
+        world = EnemyWorld()
+        world.spawn(METEOR, 100, 100, rng, sprite=shape.seed, size=(shape.width, shape.height), rotation=rotation)
+        screen = pygame.Surface((240, 240))
+        world.draw(screen, SPRITE_CACHE)
+        frames.append(pygame.image.tobytes(screen, "RGB"))
+    
+    assert frames[0] == frames[1] and frames[0] != frames[2], "陨石旋转帧选择不正确"
+    assert ("Meteor", shape.seed) in SPRITE_CACHE, "陨石图集没有进入精灵缓存"
+    
+    print("✓ 陨石旋转帧图集正常")
+
+def test_text_cache():
+    """测试文字缓存的 LRU 淘汰与 HUD 图层的脏标记重绘"""
+    from text import HudLayer, TextCache
+    
+    pygame.init()
+    font = pygame.font.Font(None, 24)
+    cache = TextCache(capacity=2)
+    first = cache.render(font, "A", (255, 255, 255))
+    cache.render(font, "B", (255, 255, 255))
+    assert cache.render(font, "A", (255, 255, 255)) is first, "文字缓存没有复用已渲染的 Surface"
+    
+    cache.render(font, "C", (255, 255, 255))  # 淘汰最久未使用的 "B"
+    stats = cache.stats()
+    assert (font, "B", (255, 255, 255), True) not in cache.surfaces and stats["evictions"] == 1 and \
+            stats["hits"] == 1, f"文字缓存 LRU 淘汰不正确: {stats}"
+    
+    painted = []
+    hud = HudLayer((100, 40), lambda surface, score: painted.append(score))
+    screen = pygame.Surface((100, 40))
+    for score in (0, 0, 100, 100, 100):
+        hud.draw(screen, (score,))
+    assert painted == [0, 100] and hud.redraws == 2, f"HUD 图层在数值未变化时重绘: {painted}"
+    
+    print("✓ 文字缓存与 HUD 图层正常")
+
+def test_surface_manager():
+    """测试共享 Surface 的复用与每帧避免分配的统计"""
+    from surfaces import SurfaceManager
+    from particles import ParticleSystem
+    
+    pygame.init()
+    surfaces = SurfaceManager()
+    overlay = surfaces.overlay((48, 80), (0, 0, 0), 180)
+    assert surfaces.overlay((48, 80), (0, 0, 0), 180) is overlay and \
+            surfaces.overlay((48, 80), (0, 0, 0), 200) is not overlay, "遮罩没有按尺寸和透明度共享"
+    surfaces.end_frame()
+    
+    # 同一帧内相同尺寸、颜色的粒子只创建一次圆盘
+    particles = ParticleSystem(surfaces=surfaces)
+    particles.emit([10, 20, 30], 10, 3, (255, 255, 255), 0, 0, 10)
+    particles.draw(pygame.Surface((48, 80)))
+    frame = surfaces.end_frame()
+    assert frame == {"built": 1, "avoided": 2}, f"每帧分配统计不正确: {frame}"
+    
+    # 圆盘与其他 Surface 共用同一套上限
+    small = SurfaceManager(max_entries=2)
+    for radius in (1, 2, 3):
+        small.disc(radius, 255, 255, 255, 128)
+    assert len(small) == 1 and small.disc(3, 255, 255, 255, 128).get_size() == (6, 6) and \
+            small.stats()["avoided"] == 1, f"圆盘缓存没有遵守条目上限: {small.stats()}"
+    
+    print("✓ 共享 Surface 复用与统计正常")
+
+def test_dirty_rect_renderer():
+    """测试脏矩形渲染的画面与整屏重绘一致"""
+    import random
+    from main import StarDefender
+    
+    pygame.init()
+    random.seed(5)
+    game = StarDefender(dirty_rects=True)
+    game.start_game()
+    game.enemies.spawn("medium", 200, 100)
+    
+    for _ in range(30):
+        game.update()
+        game.player.invulnerable = False
+        game.player.shoot()
+        game.draw()
+    
+    incremental = pygame.image.tobytes(game.screen, "RGB")
+    game.renderer.invalidate()
+    game.draw()
+    assert pygame.image.tobytes(game.screen, "RGB") == incremental, "脏矩形渲染的画面与整屏重绘不一致"
+    assert game.renderer.partial_frames != 0, "脏矩形模式没有进行局部更新"
+    
+    print("✓ 脏矩形渲染正常")
+
+def test_starfield():
+    """测试分层星空整层绘制与逐颗绘制的画面一致"""
+    import random
+    from starfield import Starfield
+    
+    pygame.init()
+    random.seed(11)
+    starfield = Starfield(480, 800, star_count=1000, layers=3)
+    assert len(starfield.layers) == 3 and sum(layer.x.size for layer in starfield.layers) == 1000, "星星没有按速度分层"
+    
+    for _ in range(700):  # 滚过贴图接缝
+        starfield.update()
+    
+    tiled = pygame.Surface((480, 800))
+    tracked = pygame.Surface((480, 800))
+    starfield.draw(tiled)
+    rects = starfield.draw(tracked, track=True)
+    assert pygame.image.tobytes(tiled, "RGB") == pygame.image.tobytes(tracked, "RGB"), "星空整层绘制与逐颗绘制不一致"
+    assert 0 < len(rects) < 1000, f"逐颗绘制返回的星星矩形数量不正确: {len(rects)}"
+    
+    print("✓ 分层星空绘制正常")
+
+def test_fixed_timestep():
+    """测试固定步长：帧率不同，模拟结果相同"""
+    import random
+    from timestep import FixedTimestep
+    from main import StarDefender
+    
+    timestep = FixedTimestep(tick_rate=60, max_ticks_per_frame=5)
+    assert timestep.advance(1 / 30) == 2 and timestep.advance(1 / 120) == 0 and timestep.advance(1 / 120) == 1, \
+            "固定步长累加器的 tick 数不正确"
+    assert timestep.advance(1.0) == 5 and timestep.dropped_seconds >= 0.9, "固定步长没有限制单帧补跑的 tick 数"
+    
+    # 同样 2 秒的真实时间，分别以 20 / 60 / 144 fps 渲染
+    outcomes = []
+    for fps in (20, 60, 144):
+        game = StarDefender(seed=7)
+        game.start_game()
+        for _ in range(fps * 2):
+            game.advance(1 / fps)
+        outcomes.append((game.sim_ticks, game.player.x, len(game.enemies), len(game.bullets),
+                         game.enemies.snapshot()))
+    
+    assert outcomes[0] == outcomes[1] and outcomes[1] == outcomes[2] and abs(outcomes[0][0] - 120) <= 1, \
+            f"不同帧率下的模拟结果不一致: {[outcome[:4] for outcome in outcomes]}"
+    
+    # 重新开始或从暂停恢复时，不把累加器里剩余的时间带过去
+    game.advance(0.5 / 60)
+    game.restart_game()
+    restarted = game.timestep.accumulator
+    game.advance(0.5 / 60)
+    game.pause_game()
+    game.resume_game()
+    assert restarted == 0 and game.timestep.accumulator == 0, "重新开始或恢复时没有清空固定步长累加器"
+    
+    print("✓ 固定步长模拟与帧率无关")
+
+def test_headless_simulation():
+    """测试无头模拟：注入输入源、不绘制、结果可复现"""
+    import random
+    from controls import Controls, ScriptedControls
+    from main import StarDefender
+    
+    # 输入源必须实现 poll()
+    class Silent(Controls):
+        pass
+    try:
+        Silent()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("没有实现 poll() 的输入源可以实例化")
+    
+    # 脚本输入：按住鼠标移到左侧
+    game = StarDefender(headless=True, controls=ScriptedControls([(True, 60, False)] * 120))
+    result = game.simulate(max_ticks=120)
+    target = 60 - game.player.width // 2
+    assert abs(game.player.x - target) <= game.player.speed and result["ticks"] == 120 and \
+            game.get_ticks() == 2000, f"脚本输入或模拟时钟不正确: x={game.player.x}, {result}"
+    
+    # 自动驾驶：同样的随机种子得到同样的结果
+    results = []
+    for _ in range(2):
+        result = StarDefender(headless=True, seed=3).simulate(max_ticks=1800)
+        results.append((result["outcome"], result["score"], result["lives"], result["ticks"]))
+    assert results[0] == results[1], f"无头模拟结果不可复现: {results}"
+    
+    print(f"✓ 无头模拟正常（{result['ticks_per_second']:.0f} tick/s）")
+
+def test_batch_runner():
+    """测试批量模拟：参数扫描生成任务，单局结果包含统计指标"""
+    from batch import make_jobs, parse_args, run_one
+    
+    args = parse_args(["--runs", "3", "--seed", "10", "--max-ticks", "600",
+                       "--boss-health-growth", "1.1", "1.2"])
+    jobs = make_jobs(args)
+    assert len(jobs) == 6 and sorted({job[0] for job in jobs}) == [10, 11, 12], f"批量模拟任务生成不正确: {len(jobs)}"
+    
+    row = run_one(jobs[0])
+    assert row["boss_health_growth"] == 1.1 and row["ticks"] <= 600 and row["peak_enemies"] > 0, \
+            f"批量模拟结果不正确: {row}"
+    assert row == run_one(jobs[0]) | {"wall_seconds": row["wall_seconds"]}, "同一种子的批量模拟结果不可复现"
+    
+    print("✓ 批量模拟正常")
+
+def test_replay():
+    """测试输入录制与回放：同样的种子和输入逐 tick 复现整局"""
+    import tempfile
+    import numpy as np
+    from main import StarDefender
+    from replay import Replay
+    
+    def snapshot(game):
+        return (game.sim_ticks, game.score, game.player.lives, game.player.x, game.bomb_count,
+                game.enemies.snapshot(),
+                game.bullets.pos[:len(game.bullets)].tobytes(),
+                game.particles.pos[:len(game.particles)].tobytes())
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.sdr")
+        
+        game = StarDefender(headless=True, seed=21, record_path=path)
+        game.simulate(max_ticks=1500)
+        game.save_replay()
+        recorded = snapshot(game)
+        
+        replay = Replay.load(path)
+        assert replay.states == game.replay.states and replay.seed == 21 and os.path.getsize(path) <= 1500 * 5, \
+                f"回放文件编码不正确（{os.path.getsize(path)} 字节）"
+        
+        replayed = StarDefender.from_replay(replay, headless=True)
+        replayed.simulate(max_ticks=len(replay))
+        assert snapshot(replayed) == recorded, "回放结果与录制时不一致"
+    
+    # 子系统随机数流互不影响：特效多取随机数不改变敌人生成
+    first = StarDefender(headless=True, seed=21)
+    second = StarDefender(headless=True, seed=21)
+    second.particles.rng.random(1000)
+    first.simulate(max_ticks=600)
+    second.simulate(max_ticks=600)
+    assert first.enemies.snapshot() == second.enemies.snapshot(), "特效随机数影响了敌人生成"
+    
+    print("✓ 输入录制与回放正常")
+
+def test_frame_profiler():
+    """测试帧分析器：按阶段计时、百分位、浮层和 Chrome trace 导出"""
+    import json
+    import tempfile
+    from main import StarDefender
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "frames.json")
+        game = StarDefender(headless=True, seed=5, trace_path=path)
+        game.simulate(max_ticks=120)
+        profiler = game.profiler
+        
+        stats = profiler.percentiles()
+        assert profiler.frames == 120 and all(name in stats for name in ("frame", "enemies", "collisions")), \
+                f"分析器没有记录每个 tick（{profiler.frames} 帧）"
+        p50, p95, p99 = stats["frame"]
+        assert 0 < p50 <= p95 <= p99, f"整帧百分位不正确: {stats['frame']}"
+        assert set(profiler.counts) == {"enemies", "bullets", "particles", "power_ups"}, \
+                f"实体数量统计不正确: {profiler.counts}"
+        
+        rect = profiler.draw(game.screen)
+        assert rect is not None and rect.width != 0, "性能浮层没有绘制"
+        
+        profiler.save_trace()
+        with open(path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        frames = [event for event in events if event["name"] == "frame"]
+        phases = {event["name"] for event in events if event.get("cat") == "phase"}
+        assert len(frames) == 120 and "collisions" in phases, \
+                f"trace 内容不正确（{len(frames)} 帧, 阶段 {sorted(phases)}）"
+        
+        # F3 隐藏浮层后 trace 继续记录；没有 trace 时隐藏浮层即停止计时
+        profiler.toggle()
+        game.simulate(max_ticks=30)
+        assert profiler.draw(game.screen) is None and len(profiler.trace) == 150, \
+                f"隐藏浮层影响了 trace 记录（{len(profiler.trace)} 帧）"
+        profiler.toggle()
+        assert profiler.draw(game.screen) is not None, "重新打开后浮层没有绘制"
+    
+    # 关闭时不记录，也不绘制浮层
+    game = StarDefender(headless=True, seed=5)
+    game.simulate(max_ticks=30)
+    assert game.profiler.frames == 0 and game.profiler.draw(game.screen) is None, "关闭的分析器仍在记录"
+    game.profiler.toggle()
+    game.simulate(max_ticks=30)
+    game.profiler.toggle()
+    game.simulate(max_ticks=30)
+    assert game.profiler.frames == 30, f"浮层开关没有控制计时（{game.profiler.frames} 帧）"
+    
+    print("✓ 帧分析器正常")
+
+def test_bench_suite():
+    """测试基准套件：场景结果结构与基线回退判断"""
+    import copy
+    from bench_suite import run_suite, compare
+    
+    results = run_suite(["empty", "bomb"], frames=3, repeats=1)
+    for name in ("empty", "bomb"):
+        scenario = results["scenarios"][name]
+        assert all(scenario[metric]["median"] > 0 for metric in ("update", "collisions", "draw")), \
+                f"场景 {name} 的计时不完整: {scenario}"
+    
+    # 与自身比较没有回退；把基线改快一倍后全部判为回退
+    assert not any(row[-1] for row in compare(results, results, threshold=0.1, min_delta=0)), "与自身比较出现了回退"
+    baseline = copy.deepcopy(results)
+    for scenario in baseline["scenarios"].values():
+        for metric in ("update", "collisions", "draw"):
+            scenario[metric]["median"] /= 2
+    rows = compare(results, baseline, threshold=0.1, min_delta=0)
+    assert len(rows) == 6 and all(row[-1] for row in rows), f"没有检测出回退: {rows}"
+    
+    print("✓ 基准套件正常")
+
+def test_asset_manager():
+    """测试资源管理：按需加载、SVG 按尺寸栅格化、缓存上限与后台预加载"""
+    from assets import AssetManager
+    
+    assets = AssetManager()
+    player = assets.image("images/player-1.png")
+    assert assets.image("images/player-1.png") is player and assets.stats()["hits"] == 1, "图片没有被缓存"
+    
+    boss = assets.image("images/boss_ship.svg", (64, 64))
+    assert boss.get_size() == (64, 64) and boss.get_at((32, 40)).a != 0, f"SVG 没有按尺寸栅格化: {boss.get_size()}"
+    assert assets.image("images/boss_ship.svg").get_size() == (128, 128), "SVG 原尺寸版本不正确"
+    
+    # 超出内存上限时淘汰最久没有使用的资源
+    small = AssetManager(max_bytes=64 * 64 * 4 + 1)
+    small.image("images/boss_ship.svg", (64, 64))
+    small.image("images/enemy_ship.svg", (64, 64))
+    assert len(small) == 1 and small.stats()["evictions"] == 1, f"缓存上限没有生效: {small.stats()}"
+    
+    # 后台预加载后取用不算同步加载
+    preloaded = AssetManager()
+    preloaded.preload(images=["images/explosion.svg", ("images/powerup_bomb.svg", (24, 24))],
+                      sounds=["music/子弹.wav"])
+    preloaded.wait()
+    preloaded.image("images/explosion.svg")
+    preloaded.image("images/powerup_bomb.svg", (24, 24))
+    assert preloaded.stats()["misses"] == 0 and preloaded.stats()["preloaded"] == 2, \
+            f"预加载结果没有被使用: {preloaded.stats()}"
+    
+    print("✓ 资源管理正常")
+
+def test_audio_mixer():
+    """测试音效混音：同帧请求合并、最小间隔、声道上限与优先级抢占"""
+    initialized = pygame.mixer.get_init() is None
+    try:
+        from assets import AssetManager
+        from audio import AudioMixer
+        
+        # 没有声卡的环境用 dummy 音频驱动
+        if initialized:
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+            pygame.mixer.init()
+        
+        mixer = AudioMixer(AssetManager(pcm_cache=None), channels=3)
+        for _ in range(50):
+            mixer.play("explosion")
+        mixer.end_frame(0)
+        assert mixer.played == 1 and mixer.merged == 49, f"同一帧的请求没有合并: {mixer.stats()}"
+        
+        mixer.play("explosion")
+        mixer.end_frame(16)
+        assert mixer.played == 1 and mixer.throttled == 1, f"最小间隔没有生效: {mixer.stats()}"
+        
+        # 声道占满后，高优先级的音效抢占优先级最低的声音
+        mixer.play("shoot")
+        mixer.play("bomb")
+        mixer.end_frame(200)
+        mixer.play("game_over")
+        mixer.end_frame(216)
+        playing = sorted(voice[0] for voice in mixer.voices)
+        assert playing == ["bomb", "explosion", "game_over"] and mixer.stolen == 1, \
+                f"优先级抢占不正确: {playing} {mixer.stats()}"
+        
+        # 无头模式不发声
+        from main import StarDefender
+        game = StarDefender(headless=True, seed=3)
+        game.simulate(max_ticks=120)
+        assert not game.audio.enabled and not game.audio.pending, "无头模式仍在登记音效"
+        
+        print("✓ 音效混音正常")
+    finally:
+        if initialized:
+            pygame.mixer.quit()
+
+def test_pcm_cache():
+    """测试音效 PCM 磁盘缓存：第二次加载直接读取缓存，内容与解码结果一致"""
+    initialized = pygame.mixer.get_init() is None
+    try:
+        import tempfile
+        from assets import AssetManager
+        
+        if initialized:
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+            pygame.mixer.init()
+        
+        with tempfile.TemporaryDirectory() as directory:
+            first = AssetManager(pcm_cache=directory)
+            decoded = first.sound("music/爆炸1.mp3")
+            assert first.stats()["pcm_writes"] == 1 and len(os.listdir(directory)) == 1, \
+                    f"没有写入 PCM 缓存: {first.stats()}"
+            
+            second = AssetManager(pcm_cache=directory)
+            cached = second.sound("music/爆炸1.mp3")
+            assert second.stats()["pcm_hits"] == 1 and cached.get_raw() == decoded.get_raw(), \
+                    f"PCM 缓存读取不正确: {second.stats()}"
+            
+            # 缓存文件名包含混音器格式，格式变化后不会误用旧缓存
+            frequency, size, channels = pygame.mixer.get_init()
+            pygame.mixer.quit()
+            pygame.mixer.init(22050, size, channels)
+            third = AssetManager(pcm_cache=directory)
+            third.sound("music/爆炸1.mp3")
+            pygame.mixer.quit()
+            pygame.mixer.init(frequency, size, channels)
+            assert third.stats()["pcm_hits"] == 0 and len(os.listdir(directory)) == 2, \
+                    f"混音器格式变化后仍使用了旧缓存: {third.stats()}"
+        
+        print("✓ 音效 PCM 缓存正常")
+    finally:
+        if initialized:
+            pygame.mixer.quit()
+
+def test_wave_scheduler():
+    """测试波次调度：关卡定义编译成有序时间线，按时出场，Boss 按定义出场，敌机表提前扩容"""
+    import json
+    import random
+    import tempfile
+    from main import StarDefender, TICK_RATE, SCREEN_WIDTH
+    from waves import BOSS, compile_level, load_levels
+    
+    levels = load_levels()
+    enemies = levels["enemies"]
+    first = compile_level(levels["levels"][0], enemies, random.Random(1), TICK_RATE, SCREEN_WIDTH, 1000)
+    second = compile_level(levels["levels"][0], enemies, random.Random(1), TICK_RATE, SCREEN_WIDTH, 1000)
+    assert first == second and [event.tick for event in first] == sorted(event.tick for event in first), \
+            "时间线不确定或没有排序"
+    assert first[-1].kind == BOSS and first[-1].tick == 30 * TICK_RATE, f"Boss 出场时间不正确: {first[-1]}"
+    
+    # 编队：同一 tick 出场，横向间距一致
+    definition = {"waves": [{"type": "line", "at": 1000, "enemy": "small", "count": 3, "spacing": 60, "x": 0.5}],
+                  "boss": {"at": 5000}}
+    line = compile_level(definition, enemies, random.Random(1), TICK_RATE, SCREEN_WIDTH, 1000)[:3]
+    assert [event.x for event in line] == [180, 240, 300] and len({event.tick for event in line}) == 1, \
+            f"横排编队位置不正确: {line}"
+    
+    # 自定义关卡：编队按时出场，出场前敌机表已经扩容，出场时不再扩容
+    definition["waves"][0]["count"] = 40
+    definition["waves"][0]["spacing"] = 5
+    game = StarDefender(headless=True, seed=2, levels={"enemies": enemies, "levels": [definition]})
+    game.simulate(max_ticks=TICK_RATE - 1)
+    scouts = game.enemies["small"]
+    assert len(game.enemies) == 0, "编队提前出场"
+    assert scouts.capacity >= 40, f"编队出场前敌机表没有预先扩容（容量 {scouts.capacity}）"
+    resizes = scouts.resizes
+    game.simulate(max_ticks=1)
+    assert len(game.enemies) == 40 and scouts.resizes == resizes, f"编队没有按时在预留的容量中出场（{len(game.enemies)} 架）"
+    game.simulate(max_ticks=4 * TICK_RATE)
+    assert game.boss_spawned and len(game.waves) == 0, "Boss 没有按定义出场"
+    
+    # 未知的波次类型在读取时报错
+    bad = {"enemies": enemies, "levels": [{"waves": [{"type": "spiral"}], "boss": {"at": 0}}]}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(bad, f)
+    try:
+        load_levels(f.name)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("未知的波次类型没有报错")
+    finally:
+        os.remove(f.name)
+    
+    print("✓ 波次调度正常")
+
+def test_timer_queue():
+    """测试定时器队列：按截止时间触发、取消与重置，以及游戏中由定时器驱动的冷却和过期"""
+    from timers import TimerQueue
+    from main import StarDefender
+    
+    timers = TimerQueue()
+    fired = []
+    timers.at(100, fired.append, "b")
+    timers.at(50, fired.append, "a")
+    cancelled = timers.at(60, fired.append, "x")
+    timers.at(100, lambda: timers.after(0, fired.append, "c"))
+    timers.cancel(cancelled)
+    timers.advance(100)
+    assert fired == ["a"], f"定时器触发时机或取消不正确: {fired}"
+    timers.advance(101)
+    assert fired == ["a", "b"] and len(timers) == 1, f"定时器没有按截止时间和登记顺序触发: {fired}"
+    timers.advance(102)
+    timers.at(200, fired.append, "d")
+    timers.reset(150)
+    timers.advance(1000)
+    assert fired == ["a", "b", "c"] and timers.stats()["cancelled"] == 1, f"回调中登记的定时器或重置不正确: {fired}"
+    
+    # 游戏：射击冷却、无敌时间和子弹增强都由定时器结束
+    game = StarDefender(headless=True, seed=4)
+    game.start_game()
+    game.simulate(max_ticks=30)
+    player = game.player
+    player.take_damage()
+    lives = player.lives
+    game.activate_bullet_power_up()
+    game.simulate(max_ticks=60)
+    assert player.lives == lives and player.invulnerable and game.bullet_power_up_active, "无敌或子弹增强提前结束"
+    game.simulate(max_ticks=1)
+    assert not player.invulnerable, "无敌时间没有按时结束"
+    game.activate_bullet_power_up()  # 持续期间再次拾取重新计时
+    game.simulate(max_ticks=5000 * 60 // 1000)
+    assert game.bullet_power_up_active, "重新拾取子弹增强后没有重新计时"
+    game.simulate(max_ticks=1)
+    assert not game.bullet_power_up_active, "子弹增强没有按时结束"
+    
+    print("✓ 定时器队列与定时器驱动的冷却、过期正常")
+
+def test_bullet_patterns():
+    """测试弹幕模式：预计算方向表、整轮发射、螺旋旋转与自机狙"""
+    import math
+    import numpy as np
+    from bullets import BulletEngine
+    from patterns import build_pattern, build_patterns
+    
+    # 默认扇形与原先逐发计算的结果一致
+    fan = build_patterns()[0]
+    rad = np.radians(np.arange(-45, 46, 15))
+    vx, vy = fan.emitter.velocities(0)
+    assert np.allclose(vx, np.sin(rad) * 6, atol=1e-5) and np.allclose(vy, np.cos(rad) * 6, atol=1e-5), \
+            "扇形方向表不正确"
+    
+    # 一整轮写进子弹引擎
+    bullets = BulletEngine()
+    ring = build_pattern({"emitter": "ring", "count": 24, "speed": 3})
+    ring.emitter.fire(bullets, 100, 100, 0, ring)
+    speeds = np.hypot(bullets.vel[:24, 0], bullets.vel[:24, 1])
+    assert len(bullets) == 24 and np.allclose(speeds, 3, atol=1e-5), f"环形弹幕发射不正确（{len(bullets)} 发）"
+    
+    # 螺旋每轮旋转 spin 度
+    spiral = build_pattern({"emitter": "spiral", "arms": 4, "speed": 2, "spin": 10}).emitter
+    vx, vy = spiral.velocities(3)
+    assert math.isclose(math.degrees(math.atan2(vx[0], vy[0])), 30, abs_tol=1e-3), "螺旋没有按轮次旋转"
+    
+    # 自机狙的中心弹朝向目标
+    aimed = build_pattern({"emitter": "aimed", "count": 3, "spread": 20, "speed": 5}).emitter
+    vx, vy = aimed.velocities(0, math.atan2(-100, 100))
+    assert vx[1] < 0 and math.isclose(vx[1], -vy[1], rel_tol=1e-5), "自机狙方向不正确"
+    
+    print("✓ 弹幕模式正常")
+
 if __name__ == "__main__":
     print("=== 星际捍卫者于闻言游戏测试 ===")
     
@@ -60,14 +883,47 @@ if __name__ == "__main__":
     tests = [
         test_pygame_init,
         test_game_import,
-        test_game_class
+        test_game_class,
+        test_collision_broadphase,
+        test_object_pools,
+        test_entity_list,
+        test_ecs_world,
+        test_enemy_motion,
+        test_particle_system,
+        test_bullet_engine,
+        test_sprite_cache,
+        test_meteor_atlas,
+        test_text_cache,
+        test_surface_manager,
+        test_dirty_rect_renderer,
+        test_starfield,
+        test_fixed_timestep,
+        test_headless_simulation,
+        test_batch_runner,
+        test_replay,
+        test_frame_profiler,
+        test_bench_suite,
+        test_asset_manager,
+        test_audio_mixer,
+        test_pcm_cache,
+        test_wave_scheduler,
+        test_timer_queue,
+        test_bullet_patterns
     ]
     
     passed = 0
     total = len(tests)
     
     for test in tests:
-        if test():
+        try:
+            result = test()
+        except AssertionError as e:
+            print(f"✗ {test.__name__}: {e}")
+            result = False
+        except Exception as e:
+            print(f"✗ {test.__name__} 出错: {e!r}")
+            result = False
+        if result is not False:  # 用 assert 检查的测试不返回值，没有抛出异常即通过
             passed += 1
         print()
     
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+文字渲染缓存
+font.render 结果按 (字体, 文字, 颜色, 抗锯齿) 缓存并按 LRU 淘汰；
+HudLayer 把 HUD 画在一张图层上，只有显示的数值变化时才重新绘制
+"""
+
+import time
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """font.render 的 LRU 缓存
+
+    同时统计未命中时 font.render 的实际耗时，
+    并按平均渲染耗时估算缓存命中节省的时间。
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.render_seconds = 0.0  # 未命中时 font.render 的累计耗时
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """与 font.render(text, antialias, color) 相同，但复用已渲染的 Surface
+
+        返回的 Surface 被缓存共享，调用方不应修改它。
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        start = time.perf_counter()
+        surface = font.render(text, antialias, color)
+        self.render_seconds += time.perf_counter() - start
+        self.misses += 1
+
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """清空缓存（例如更换字体后）"""
+        self.surfaces.clear()
+
+    def stats(self):
+        """统计信息，saved_ms 为按平均渲染耗时估算的命中节省时间"""
+        average = self.render_seconds / self.misses if self.misses else 0.0
+        return {
+            "entries": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "render_ms": self.render_seconds * 1000,
+            "saved_ms": self.hits * average * 1000,
+        }
+
+
+class HudLayer:
+    """脏标记 HUD 图层
+
+    paint(surface, *values) 负责把 HUD 画到透明图层上；
+    draw() 只在 values 与上一次不同时才清空图层并调用 paint，否则直接 blit。
+    """
+
+    def __init__(self, size, paint, pos=(0, 0)):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.paint = paint
+        self.pos = pos
+        self.values = None
+        self.redraws = 0
+
+    def invalidate(self):
+        """强制下一次 draw() 重新绘制"""
+        self.values = None
+
+    def draw(self, screen, values):
+        """绘制图层，values 为决定 HUD 内容的数值元组，返回绘制区域"""
+        if values != self.values:
+            self.values = values
+            self.surface.fill((0, 0, 0, 0))
+            self.paint(self.surface, *values)
+            self.redraws += 1
+        return screen.blit(self.surface, self.pos)
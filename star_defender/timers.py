@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+定时器队列
+按模拟时钟（毫秒）登记回调，每个 tick 只弹出已到期的定时器，
+不再由各处每帧读取时钟、逐个比较自己的截止时间；每帧的工作量与实际触发的事件数成正比
+"""
+
+import heapq
+
+
+class Timer:
+    """登记在队列中的一个定时器（cancel() 后到期也不再调用）"""
+
+    __slots__ = ("deadline", "callback", "args", "active")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.active = True
+
+    def cancel(self):
+        """取消定时器（惰性删除：留在堆里，到期弹出时跳过）"""
+        self.active = False
+
+
+class TimerQueue:
+    """最小堆定时器队列
+
+    at(deadline, callback, *args) 在模拟时钟超过 deadline 的第一个 tick 调用回调（与游戏中
+    now - start > interval 的判定一致），after(delay, ...) 以当前时间为起点；advance(now) 每个 tick
+    调用一次，按截止时间（相同时按登记顺序）依次触发。回调中可以再登记定时器，已经到期的在同一次
+    advance() 中触发。
+    """
+
+    def __init__(self):
+        self.heap = []  # (截止时间, 登记序号, Timer)
+        self.now = 0
+        self.sequence = 0
+
+        # 统计
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def at(self, deadline, callback, *args):
+        """登记在 deadline（毫秒）触发的回调，返回 Timer"""
+        timer = Timer(deadline, callback, args)
+        heapq.heappush(self.heap, (deadline, self.sequence, timer))
+        self.sequence += 1
+        self.scheduled += 1
+        return timer
+
+    def after(self, delay, callback, *args):
+        """登记 delay 毫秒后触发的回调，返回 Timer"""
+        return self.at(self.now + delay, callback, *args)
+
+    def cancel(self, timer):
+        """取消定时器（timer 可以为 None 或已经触发）"""
+        if timer is not None and timer.active:
+            timer.cancel()
+            self.cancelled += 1
+
+    def advance(self, now):
+        """把时钟推进到 now，触发所有已到期的定时器，返回触发的个数"""
+        self.now = now
+        heap = self.heap
+        fired = 0
+        while heap and heap[0][0] < now:
+            timer = heapq.heappop(heap)[2]
+            if timer.active:
+                timer.active = False
+                timer.callback(*timer.args)
+                fired += 1
+        self.fired += fired
+        return fired
+
+    def reset(self, now=0):
+        """丢弃所有定时器，时钟设为 now（新一局开始时调用）"""
+        for _, _, timer in self.heap:
+            timer.active = False
+        self.heap.clear()
+        self.now = now
+
+    def stats(self):
+        """堆中的定时器数（含已取消未弹出的）和累计登记、触发、取消次数"""
+        return {"pending": len(self.heap), "scheduled": self.scheduled, "fired": self.fired,
+                "cancelled": self.cancelled}
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+固定步长
+模拟以固定的 tick 频率推进，与渲染帧率解耦：
+渲染慢时一帧内补跑多个 tick（掉帧而不是变慢），渲染快时按剩余时间插值绘制
+"""
+
+
+class FixedTimestep:
+    """固定步长累加器
+
+    每帧把真实经过的时间交给 advance()，得到这一帧应运行的 tick 数；
+    剩余不足一个 tick 的时间留在累加器中，alpha 为其占一个 tick 的比例，
+    可用于在上一 tick 与当前 tick 的状态之间插值绘制。
+
+    单帧最多补跑 max_ticks_per_frame 个 tick，超出的积压时间直接丢弃，
+    避免机器跟不上时越补越慢（"死亡螺旋"）。
+    """
+
+    def __init__(self, tick_rate=60, max_ticks_per_frame=5):
+        self.tick_rate = tick_rate
+        self.tick_seconds = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+
+        # 统计
+        self.ticks = 0              # 累计运行的 tick 数
+        self.dropped_seconds = 0.0  # 因积压过多而丢弃的时间
+
+    def advance(self, elapsed):
+        """累加经过的秒数，返回这一帧需要运行的 tick 数"""
+        self.accumulator += elapsed
+        # 容差吸收浮点累加误差：恰好凑满一个 tick 的时间不应因舍入少跑一次
+        ticks = int(self.accumulator / self.tick_seconds + 1e-6)
+
+        if ticks > self.max_ticks_per_frame:
+            dropped = (ticks - self.max_ticks_per_frame) * self.tick_seconds
+            self.dropped_seconds += dropped
+            self.accumulator -= dropped
+            ticks = self.max_ticks_per_frame
+
+        self.accumulator -= ticks * self.tick_seconds
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def alpha(self):
+        """累加器中剩余时间占一个 tick 的比例（0 ~ 1）"""
+        return min(max(self.accumulator / self.tick_seconds, 0.0), 1.0)
+
+    def reset(self):
+        """清空累加器（例如从暂停恢复时不补跑暂停期间的时间）"""
+        self.accumulator = 0.0
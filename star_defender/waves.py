@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+波次调度
+关卡定义（波次、编队、出场时间、敌人配比、Boss 出场时间）从 levels.json 读取，
+每关开始时用本局的生成随机数流一次性编译成按 tick 排序的出场时间线；
+每个 tick 只比较时间线队首，并提前为即将出场的敌机预留实体表容量，大编队出场时不必当场扩容
+
+levels.json 格式（时间单位毫秒，相对本关开始）：
+    "enemies"  敌机类型 -> {"margin": 生成时左边 x 距屏幕两侧的最小距离, "y": 生成时的 y}
+    "levels"   每关一项：{"waves": [...], "boss": {"at": Boss 出场时间, "patterns": [弹幕模式...]}}
+               Boss 弹幕模式的格式见 patterns.py，省略时使用默认的三种
+波次类型：
+    stream   从 start 到 end 每隔 interval 出场一架，类型按 mix 中的权重随机；
+             省略 interval 时使用游戏数值平衡参数给出的本关生成间隔
+    line     at 时刻 count 架 enemy 横排出场，间距 spacing 像素，x 为编队中心占屏宽的比例（省略时随机）
+    v        同 line，两翼每向外一架后移 rise 像素，形成 V 字
+    column   同一 x 上 count 架 enemy 依次出场，间隔 stagger 毫秒
+每种波次都可以加 "motion": 移动方式名（见 motion.py，如 dive、swoop），省略时使用敌机类型的默认移动
+"""
+
+import json
+import os
+from collections import Counter, namedtuple
+
+from motion import MOTION_IDS
+from patterns import EMITTERS, build_patterns
+
+
+LEVELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels.json")
+
+BOSS = "boss"
+
+# 时间线上的一次出场：tick 为绝对模拟 tick，kind 为敌机类型名或 BOSS，motion 为移动方式名（None 为默认）
+SpawnEvent = namedtuple("SpawnEvent", "tick kind x y motion", defaults=(None,))
+
+WAVE_TYPES = ("stream", "line", "v", "column")
+
+
+def load_levels(path=LEVELS_PATH):
+    """读取并检查关卡定义"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    enemies = data["enemies"]
+    if not data["levels"]:
+        raise ValueError(f"{path} 中没有关卡")
+    for number, level in enumerate(data["levels"], 1):
+        for wave in level["waves"]:
+            if wave["type"] not in WAVE_TYPES:
+                raise ValueError(f"第 {number} 关的波次类型 {wave['type']!r} 不存在")
+            kinds = wave["mix"] if wave["type"] == "stream" else [wave["enemy"]]
+            for kind in kinds:
+                if kind not in enemies:
+                    raise ValueError(f"第 {number} 关使用了未定义的敌机类型 {kind!r}")
+            if wave.get("motion", "straight") not in MOTION_IDS:
+                raise ValueError(f"第 {number} 关的移动方式 {wave['motion']!r} 不存在")
+        for pattern in level["boss"].get("patterns", ()):
+            if pattern["emitter"] not in EMITTERS:
+                raise ValueError(f"第 {number} 关的弹幕发射器类型 {pattern['emitter']!r} 不存在")
+    return data
+
+
+def compile_level(definition, enemies, rng, tick_rate, width, stream_interval):
+    """把一关的定义编译成按 tick 排序的出场列表（tick 相对本关开始）
+
+    随机的类型和位置都在这里一次决定，rng 固定时时间线完全确定。
+    stream_interval 为省略 interval 的 stream 波次使用的生成间隔（毫秒）。
+    """
+    def ticks(ms):
+        return round(ms * tick_rate / 1000)
+
+    def clamp_x(kind, x):
+        margin = enemies[kind]["margin"]
+        return min(max(int(x), margin), width - margin)
+
+    events = []
+    for wave in definition["waves"]:
+        wave_type = wave["type"]
+        motion = wave.get("motion")
+        if wave_type == "stream":
+            kinds = list(wave["mix"])
+            weights = list(wave["mix"].values())
+            interval = wave.get("interval") or stream_interval
+            time = wave.get("start", 0) + interval
+            while time < wave["end"]:
+                kind = rng.choices(kinds, weights)[0]
+                margin = enemies[kind]["margin"]
+                events.append(SpawnEvent(ticks(time), kind, rng.randint(margin, width - margin),
+                                         enemies[kind]["y"], motion))
+                time += interval
+            continue
+
+        kind = wave["enemy"]
+        count = wave["count"]
+        margin = enemies[kind]["margin"]
+        y = enemies[kind]["y"]
+        center = wave["x"] * width if "x" in wave else rng.randint(margin, width - margin)
+        if wave_type == "column":
+            stagger = wave.get("stagger", 300)
+            events += [SpawnEvent(ticks(wave["at"] + i * stagger), kind, clamp_x(kind, center), y, motion)
+                       for i in range(count)]
+            continue
+
+        spacing = wave.get("spacing", 50)
+        rise = wave.get("rise", 30) if wave_type == "v" else 0
+        middle = (count - 1) / 2
+        events += [SpawnEvent(ticks(wave["at"]), kind, clamp_x(kind, center + (i - middle) * spacing),
+                              y - int(abs(i - middle) * rise), motion)
+                   for i in range(count)]
+
+    events.append(SpawnEvent(ticks(definition["boss"]["at"]), BOSS, None, None))
+    events.sort(key=lambda event: event.tick)  # 稳定排序：同一 tick 保持定义中的顺序
+    return events
+
+
+class WaveScheduler:
+    """按时间线出场的波次调度器
+
+    每关开始时 start_level() 编译时间线；之后每个 tick：
+        for event in scheduler.due(tick): ...    # 出场时间已到的事件，通常为空
+        scheduler.prefetch(tick)                 # 为 lookahead 内即将出场的敌机预留容量
+
+    world 为敌机的实体表（ecs.World），表名即敌机类型名；预留只扩容数组，不生成实体，
+    不消耗游戏的随机数流。
+    """
+
+    def __init__(self, levels, world, tick_rate, width, lookahead=None):
+        self.levels = levels
+        self.world = world
+        self.tick_rate = tick_rate
+        self.width = width
+        self.lookahead = tick_rate * 2 if lookahead is None else lookahead  # 提前预留的 tick 数
+
+        self.timeline = []
+        self.next = 0       # 下一个出场事件
+        self.ahead = 0      # 下一个尚未计入预建的事件
+        self.reserved = Counter()  # 已进入预留窗口、尚未出场的各类型数量
+        self.patterns = {}  # 关卡序号 -> 构造好的 Boss 攻击模式（方向表只算一次）
+
+        # 统计
+        self.prefetched = 0  # 提前扩容的次数
+
+    def __len__(self):
+        """剩余的出场事件数"""
+        return len(self.timeline) - self.next
+
+    def definition(self, level):
+        """某一关的定义（超出定义的关卡沿用最后一关）"""
+        levels = self.levels["levels"]
+        return levels[min(level, len(levels)) - 1]
+
+    def boss_patterns(self, level):
+        """某一关 Boss 的攻击模式列表"""
+        index = min(level, len(self.levels["levels"]))
+        patterns = self.patterns.get(index)
+        if patterns is None:
+            patterns = self.patterns[index] = build_patterns(self.definition(level)["boss"].get("patterns"))
+        return patterns
+
+    def start_level(self, level, start_tick, rng, stream_interval):
+        """编译第 level 关的时间线，从 start_tick 开始计时"""
+        events = compile_level(self.definition(level), self.levels["enemies"], rng, self.tick_rate, self.width,
+                               stream_interval)
+        self.timeline = [event._replace(tick=event.tick + start_tick) for event in events]
+        self.next = self.ahead = 0
+        self.reserved.clear()
+
+    def clear(self):
+        """丢弃剩余的时间线"""
+        self.timeline = []
+        self.next = self.ahead = 0
+        self.reserved.clear()
+
+    def due(self, tick):
+        """弹出出场时间已到的事件"""
+        timeline = self.timeline
+        if self.next >= len(timeline) or timeline[self.next].tick > tick:
+            return ()
+
+        start = self.next
+        end = start
+        while end < len(timeline) and timeline[end].tick <= tick:
+            kind = timeline[end].kind
+            if end < self.ahead and kind != BOSS:
+                self.reserved[kind] -= 1
+            end += 1
+        self.next = end
+        self.ahead = max(self.ahead, end)
+        return timeline[start:end]
+
+    def prefetch(self, tick):
+        """把 lookahead 内即将出场的敌机计入预留窗口，并保证各类型的表放得下它们"""
+        timeline = self.timeline
+        horizon = tick + self.lookahead
+        while self.ahead < len(timeline) and timeline[self.ahead].tick <= horizon:
+            kind = timeline[self.ahead].kind
+            if kind != BOSS:
+                self.reserved[kind] += 1
+            self.ahead += 1
+
+        for kind, count in self.reserved.items():
+            if count > 0 and self.world[kind].reserve(count):
+                self.prefetched += 1